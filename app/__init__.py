@@ -1,6 +1,7 @@
 # app/__init__.py
 # --- VERSÃO CORRIGIDA DO WHITENOISE COM PERMISSÕES ---
 
+import logging
 import os
 from flask import Flask
 from markupsafe import Markup
@@ -8,7 +9,7 @@ from . import commands
 from whitenoise import WhiteNoise
 
 # Importando as extensões
-from .extensions import db, migrate, login_manager
+from .extensions import db, migrate, login_manager, request_metrics
 from config import config_by_name
 
 def create_app(config_name=None):
@@ -27,6 +28,19 @@ def create_app(config_name=None):
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
+    request_metrics.init_app(app)
+
+    # --- LOG DAS REQUISIÇÕES (app/instrumentation.py) ---
+    # Uma linha JSON por requisição no stderr, também fora do modo debug.
+    # Um handler já configurado (ex: pelo gunicorn) é mantido.
+    if app.config.get('INSTRUMENTATION_ENABLED') and app.config.get('INSTRUMENTATION_LOG'):
+        request_logger = logging.getLogger('app.requests')
+        request_logger.setLevel(logging.INFO)
+        if not request_logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            request_logger.addHandler(handler)
+            request_logger.propagate = False
 
     # Registra os comandos
     commands.register_commands(app)
@@ -34,12 +48,27 @@ def create_app(config_name=None):
     # --- Blueprints e Componentes ---
     with app.app_context():
         from . import models
+        from . import stats  # Registra os eventos que mantêm os contadores
+        from . import feeds  # Registra os eventos que invalidam sitemap/feed
+        from . import fragments  # Registra os eventos que versionam a seção do blog
+        from .analytics import event_buffer  # Contagens de popups e landing pages
+        event_buffer.init_app(app)
+        from .login_throttle import login_throttle  # Limite de tentativas de login
+        login_throttle.init_app(app)
+        from . import freeze  # Registra os eventos que recongelam as páginas públicas
+        from . import media  # Registra as tarefas de mídia executadas pelo 'flask worker'
+        from . import exports  # Registra a tarefa da central de exportações
+        from . import client_activity  # Mantém o resumo de serviços de cada cliente
+        from . import reports  # Registra os eventos que versionam as tabelas dos relatórios
+        from . import matching  # Mantém o índice de clientes usado na listagem de leads
         from .main import bp as main_bp
         app.register_blueprint(main_bp)
         from .auth import bp as auth_bp
         app.register_blueprint(auth_bp, url_prefix='/auth')
         from .dashboard import bp as dashboard_bp
         app.register_blueprint(dashboard_bp, url_prefix='/dashboard')
+        from .api import bp as api_bp
+        app.register_blueprint(api_bp, url_prefix='/api/v1')
 
         @app.template_filter('nl2br')
         def nl2br_filter(s):
@@ -74,6 +103,20 @@ def create_app(config_name=None):
             else:
                 print(f"✅ Pasta {upload_path} é gravável")
 
+    # --- PROXY REVERSO ---
+    # O IP do visitante (limite de tentativas de login) vem do X-Forwarded-For
+    if app.config.get('PROXY_COUNT'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_COUNT'], x_proto=app.config['PROXY_COUNT'])
+
+    # --- PÁGINAS CONGELADAS (flask freeze) ---
+    if app.config.get('FREEZE_SERVE'):
+        app.wsgi_app = freeze.FrozenSite(
+            app.wsgi_app, freeze.freeze_folder(app),
+            cookie_names=(app.config.get('SESSION_COOKIE_NAME', 'session'),
+                          app.config.get('REMEMBER_COOKIE_NAME', 'remember_token')),
+        )
+
     # --- CONFIGURAÇÃO WHITENOISE OTIMIZADA ---
     if not app.debug:  # Só usar WhiteNoise em produção
         try:
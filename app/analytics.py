@@ -0,0 +1,244 @@
+# app/analytics.py
+"""
+Contagem de impressões e cliques de popups e de visitas de landing pages.
+
+As requisições públicas só somam 1 em um dicionário em memória
+{(tipo, id, dia): contagem}; nenhuma escrita no banco acontece no caminho da
+página. Uma thread por processo grava o acumulado a cada
+ANALYTICS_FLUSH_SECONDS em DailyEventCount, em lote (um UPDATE e um INSERT
+com executemany), e devolve as contagens ao buffer se a gravação falhar.
+
+Com vários workers do gunicorn, cada processo tem o seu buffer e a sua thread
+(iniciada na primeira contagem, já depois do fork).
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from flask import current_app
+from sqlalchemy import bindparam, delete, event, func, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import DailyEventCount, Popup, LandingPage
+
+logger = logging.getLogger('app.analytics')
+
+POPUP_IMPRESSION = 'popup_impression'
+POPUP_CLICK = 'popup_click'
+LANDING_PAGE_VIEW = 'landing_page_view'
+
+# Janela (em dias) da coluna "recentes" dos relatórios do dashboard
+REPORT_DAYS = 30
+
+# Modelo ao qual o object_id de cada tipo se refere
+EVENT_MODELS = {
+    POPUP_IMPRESSION: Popup,
+    POPUP_CLICK: Popup,
+    LANDING_PAGE_VIEW: LandingPage,
+}
+
+
+class EventBuffer:
+    """Buffer de contagens em memória com gravação periódica em lote."""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._buckets = Counter()
+        self._app = None
+        self._flusher_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ANALYTICS_ENABLED', True)
+        # 0 desliga a thread (a gravação fica para flush() e para a saída do processo)
+        app.config.setdefault('ANALYTICS_FLUSH_SECONDS', 60)
+        # Teto de chaves distintas em memória, contra ids inventados em massa
+        app.config.setdefault('ANALYTICS_MAX_KEYS', 10_000)
+        self._app = app
+        app.extensions['analytics'] = self
+
+    # --- Contagem (caminho público) ---
+
+    def record(self, kind, object_id, day=None):
+        """Soma 1 ao evento do dia. Não acessa o banco."""
+        config = self._app.config
+        if not config['ANALYTICS_ENABLED']:
+            return
+        key = (kind, object_id, day or date.today())
+        with self._lock:
+            if key not in self._buckets and len(self._buckets) >= config['ANALYTICS_MAX_KEYS']:
+                return
+            self._buckets[key] += 1
+        if self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def pending(self):
+        with self._lock:
+            return dict(self._buckets)
+
+    # --- Gravação ---
+
+    def flush(self):
+        """
+        Grava o acumulado (requer contexto da aplicação). Retorna quantos
+        eventos foram gravados; em caso de erro eles voltam para o buffer.
+        """
+        with self._lock:
+            buckets, self._buckets = self._buckets, Counter()
+        if not buckets:
+            return 0
+        try:
+            return _upsert(buckets)
+        except SQLAlchemyError:
+            db.session.rollback()
+            with self._lock:
+                self._buckets.update(buckets)
+            logger.exception('Falha ao gravar %d contagem(ns) de eventos; nova tentativa no próximo ciclo.', len(buckets))
+            return 0
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        interval = self._app.config['ANALYTICS_FLUSH_SECONDS']
+        if interval:
+            threading.Thread(target=self._run, args=(interval,), name='analytics-flush', daemon=True).start()
+        atexit.register(self._flush_in_context)
+
+    def _run(self, interval):
+        while True:
+            time.sleep(interval)
+            self._flush_in_context()
+
+    def _flush_in_context(self):
+        with self._app.app_context():
+            try:
+                self.flush()
+            finally:
+                db.session.remove()
+
+
+def _upsert(buckets):
+    """Soma as contagens em DailyEventCount: um UPDATE e um INSERT em lote."""
+    # Descarta ids que não existem (ex: popup excluído ou id inventado)
+    valid = {}
+    for kind in {kind for kind, _, _ in buckets}:
+        model = EVENT_MODELS.get(kind)
+        ids = [object_id for event_kind, object_id, _ in buckets if event_kind == kind]
+        valid[kind] = set(db.session.scalars(select(model.id).where(model.id.in_(ids)))) if model else set()
+    rows = [
+        {'b_kind': kind, 'b_object_id': object_id, 'b_day': day, 'b_count': count}
+        for (kind, object_id, day), count in buckets.items() if object_id in valid[kind]
+    ]
+    if not rows:
+        return 0
+
+    table = DailyEventCount.__table__
+    for attempt in (1, 2):
+        existing = set(db.session.execute(
+            select(table.c.kind, table.c.object_id, table.c.day).where(
+                table.c.kind.in_({row['b_kind'] for row in rows}),
+                table.c.object_id.in_({row['b_object_id'] for row in rows}),
+                table.c.day.in_({row['b_day'] for row in rows}),
+            )
+        ))
+        to_update = [row for row in rows if (row['b_kind'], row['b_object_id'], row['b_day']) in existing]
+        to_insert = [row for row in rows if (row['b_kind'], row['b_object_id'], row['b_day']) not in existing]
+        try:
+            if to_update:
+                db.session.execute(
+                    update(table)
+                    .where(table.c.kind == bindparam('b_kind'), table.c.object_id == bindparam('b_object_id'),
+                           table.c.day == bindparam('b_day'))
+                    .values(count=table.c.count + bindparam('b_count')),
+                    to_update,
+                )
+            if to_insert:
+                db.session.execute(
+                    insert(table).values(kind=bindparam('b_kind'), object_id=bindparam('b_object_id'),
+                                         day=bindparam('b_day'), count=bindparam('b_count')),
+                    to_insert,
+                )
+            db.session.commit()
+            break
+        except IntegrityError:
+            # Outro worker criou a mesma linha entre a leitura e o INSERT: lê de novo
+            db.session.rollback()
+            if attempt == 2:
+                raise
+    return sum(row['b_count'] for row in rows)
+
+
+# --- Relatórios ---
+
+def totals(kinds, object_ids, since=None):
+    """
+    {(tipo, id): total} dos tipos e objetos informados, a partir do dia 'since'
+    (todo o histórico se None). Inclui o que ainda está no buffer deste processo.
+    """
+    object_ids = set(object_ids)
+    stmt = (select(DailyEventCount.kind, DailyEventCount.object_id, func.sum(DailyEventCount.count))
+            .where(DailyEventCount.kind.in_(kinds), DailyEventCount.object_id.in_(object_ids))
+            .group_by(DailyEventCount.kind, DailyEventCount.object_id))
+    if since:
+        stmt = stmt.where(DailyEventCount.day >= since)
+    result = Counter({(kind, object_id): total for kind, object_id, total in db.session.execute(stmt)})
+    buffer = current_app.extensions.get('analytics')
+    if buffer:
+        for (kind, object_id, day), count in buffer.pending().items():
+            if kind in kinds and object_id in object_ids and (since is None or day >= since):
+                result[(kind, object_id)] += count
+    return result
+
+
+def report(kinds, object_ids, days=REPORT_DAYS):
+    """
+    {id: {tipo: {'recent': total dos últimos 'days' dias, 'total': histórico}}}
+    para cada objeto informado (zeros quando não há eventos).
+    """
+    object_ids = list(object_ids)
+    recent = totals(kinds, object_ids, since=date.today() - timedelta(days=days - 1))
+    overall = totals(kinds, object_ids)
+    return {
+        object_id: {kind: {'recent': recent.get((kind, object_id), 0), 'total': overall.get((kind, object_id), 0)}
+                    for kind in kinds}
+        for object_id in object_ids
+    }
+
+
+
+# --- Limpeza: contagens de popups/landing pages excluídos ---
+# (o SQLite pode reaproveitar o id de um registro excluído)
+
+@event.listens_for(Session, 'before_flush')
+def _collect_deleted_objects(session, flush_context, instances):
+    for obj in session.deleted:
+        kinds = [kind for kind, model in EVENT_MODELS.items() if isinstance(obj, model)]
+        if kinds:
+            session.info.setdefault('analytics_deleted', []).append((kinds, obj.id))
+
+
+@event.listens_for(Session, 'after_flush')
+def _delete_event_counts(session, flush_context):
+    for kinds, object_id in session.info.pop('analytics_deleted', []):
+        session.connection().execute(
+            delete(DailyEventCount.__table__).where(
+                DailyEventCount.kind.in_(kinds), DailyEventCount.object_id == object_id
+            )
+        )
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_deleted_objects(session):
+    session.info.pop('analytics_deleted', None)
+
+
+event_buffer = EventBuffer()
@@ -0,0 +1,6 @@
+# app/api/__init__.py
+from flask import Blueprint
+
+bp = Blueprint('api', __name__)
+
+from app.api import routes
@@ -0,0 +1,89 @@
+# app/api/cache.py
+"""
+Cache das respostas da API pública (app/api/routes.py).
+
+Cada resposta é serializada em JSON uma vez por versão do conteúdo e fica em
+memória, por processo, já como bytes e com o ETag (hash do corpo). A versão
+vem de contadores 'version:api:<conteúdo>' mantidos por track_versions
+(app/stats.py) para posts (e suas categorias, imagens e vídeos), landing
+pages, configurações e popups. Os contadores de todos os conteúdos são lidos
+em uma consulta por requisição; com a resposta em cache, é a única.
+
+O cache é um VersionedCache com idade máxima API_CACHE_SECONDS e no máximo
+API_CACHE_MAX_ENTRIES respostas (cada página da listagem de posts é uma).
+"""
+import hashlib
+import json
+from datetime import date
+
+from flask import current_app, request
+
+from app.extensions import db
+from app.models import Post, Category, Image, Video, LandingPage, Settings, Popup
+from app.stats import VERSION_PREFIX, VersionedCache, read_counters, track_versions
+
+API_VERSION_PREFIX = f'{VERSION_PREFIX}api:'
+
+DEFAULT_CACHE_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 1000
+
+# Modelos que aparecem nas respostas e o conteúdo (contador) que versionam
+TRACKED_MODELS = {
+    Post: 'posts', Category: 'posts', Image: 'posts', Video: 'posts',
+    LandingPage: 'landing_pages', Settings: 'settings', Popup: 'popup',
+}
+
+# {chave: (etag, corpo)}
+_cache = VersionedCache('API_CACHE_SECONDS', DEFAULT_CACHE_SECONDS, 'API_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)
+
+# Invalida as respostas dos conteúdos, para escritas feitas fora do ORM
+bump_content_versions = track_versions(API_VERSION_PREFIX, TRACKED_MODELS)
+
+
+# --- Versões e cache ---
+
+def content_versions():
+    """{conteúdo: versão} (ausente vale 0)."""
+    return read_counters(db.session.connection(), API_VERSION_PREFIX)
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} não é serializável em JSON')
+
+
+def serialize(payload):
+    """JSON compacto, em UTF-8 (sem escapar acentos)."""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=_default).encode()
+
+
+def cached_json(key, version, compute):
+    """
+    (etag, corpo) da resposta, do cache se a versão bate e ainda não expirou;
+    senão chama 'compute' e guarda o resultado. Se 'compute' devolver None
+    (ex: slug inexistente), devolve None e não guarda nada.
+    """
+    def compute_response():
+        payload = compute()
+        if payload is None:
+            return None
+        body = serialize(payload)
+        return hashlib.sha1(body).hexdigest(), body
+
+    return _cache.get(key, version, compute_response)
+
+
+def json_response(etag, body):
+    """Resposta com ETag e Cache-Control; 304 sem corpo se o cliente já tem essa versão."""
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    policy = current_app.config.get('CACHE_CONTROL', {}).get(request.endpoint)
+    if policy:
+        response.headers['Cache-Control'] = policy
+    return response.make_conditional(request)
+
+
+def clear_cache():
+    _cache.clear()
+
@@ -0,0 +1,277 @@
+# app/api/routes.py
+"""
+API pública somente leitura (/api/v1) com o conteúdo do site, para páginas
+de parceiros e aplicativos: posts publicados, landing pages, dados do rodapé
+e o popup ativo.
+
+As consultas trazem só as colunas usadas (nada de objetos do ORM) e as
+respostas passam pelo cache de app/api/cache.py, com ETag. Os endereços
+(páginas e mídia) são absolutos, montados a partir de SITE_URL; sem ele, do
+host da requisição (e o cache guarda uma resposta por host).
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from urllib.parse import urljoin
+
+from flask import current_app, jsonify, request, url_for
+from sqlalchemy import select, tuple_
+
+from app.api import bp
+from app.api.cache import cached_json, content_versions, json_response
+from app.extensions import db
+from app.models import Post, Category, Image, Video, LandingPage, Settings, Popup, post_categories
+
+# Posts por página da listagem (padrão e máximo aceito em ?limit=)
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+
+# Imagem de capa usada quando o post não tem uma (não é exposta)
+DEFAULT_COVER = 'default.jpg'
+
+
+# --- Auxiliares ---
+
+def _error(message, status):
+    response = jsonify(error=message)
+    response.status_code = status
+    return response
+
+
+def _base_url():
+    """
+    Endereço base dos links. Com SITE_URL, um Host forjado não vai parar em
+    respostas que os CDNs guardam (como nos links do sitemap, app/feeds.py).
+    """
+    site_url = current_app.config.get('SITE_URL')
+    return site_url.rstrip('/') + '/' if site_url else request.host_url
+
+
+def _media_url(filename):
+    return f'{_base_url()}media/{filename}' if filename else None
+
+
+def _page_url(endpoint, **values):
+    return urljoin(_base_url(), url_for(endpoint, **values).lstrip('/'))
+
+
+def _cached(key, content, compute, not_found=None):
+    """Resposta do cache para a versão atual do conteúdo (ou 404 se 'compute' não achar nada)."""
+    # Sem SITE_URL os links dependem do host: uma resposta por host
+    host = None if current_app.config.get('SITE_URL') else request.host_url
+    result = cached_json((host, *key), content_versions().get(content, 0), compute)
+    if result is None:
+        return _error(not_found or 'Não encontrado.', 404)
+    return json_response(*result)
+
+
+def encode_cursor(created_at, post_id):
+    """Cursor opaco com a posição do último post da página."""
+    return base64.urlsafe_b64encode(f'{created_at.isoformat()}|{post_id}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, id) do cursor, ou None se ele for inválido."""
+    try:
+        value = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, post_id = value.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+@bp.after_request
+def _allow_cross_origin(response):
+    origin = current_app.config.get('API_CORS_ORIGIN')
+    if origin:
+        response.headers['Access-Control-Allow-Origin'] = origin
+    return response
+
+
+# --- Posts ---
+
+def _post_summary(row):
+    return {
+        'slug': row.slug,
+        'title': row.title,
+        'summary': row.meta_description,
+        'cover_image': _media_url(row.cover_image if row.cover_image != DEFAULT_COVER else None),
+        'url': _page_url('main.post_detail', slug=row.slug),
+        'created_at': row.created_at,
+        'updated_at': row.updated_at,
+    }
+
+
+@bp.route('/posts')
+def list_posts():
+    """Posts publicados, do mais novo ao mais antigo, paginados por cursor (?cursor=, ?limit=)."""
+    limit = min(max(request.args.get('limit', PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    cursor = request.args.get('cursor') or None
+    position = decode_cursor(cursor) if cursor else None
+    if cursor and position is None:
+        return _error('Cursor inválido.', 400)
+
+    def compute():
+        # Uma linha a mais indica que existe a próxima página
+        stmt = (
+            select(Post.id, Post.slug, Post.title, Post.meta_description, Post.cover_image,
+                   Post.created_at, Post.updated_at)
+            .where(Post.is_published.is_(True), Post.created_at.isnot(None))
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit + 1)
+        )
+        if position:
+            stmt = stmt.where(tuple_(Post.created_at, Post.id) < tuple_(*position))
+        rows = db.session.execute(stmt).all()
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+        return {'data': [_post_summary(row) for row in page], 'next_cursor': next_cursor}
+
+    return _cached(('posts', limit, cursor), 'posts', compute)
+
+
+@bp.route('/posts/<slug>')
+def get_post(slug):
+    """Post publicado completo: conteúdo, categorias e galeria."""
+    def compute():
+        row = db.session.execute(
+            select(Post.id, Post.slug, Post.title, Post.content, Post.meta_description, Post.cover_image,
+                   Post.video_filename, Post.created_at, Post.updated_at)
+            .where(Post.slug == slug, Post.is_published.is_(True))
+        ).first()
+        if row is None:
+            return None
+        categories = db.session.execute(
+            select(Category.name, Category.slug).join(post_categories)
+            .where(post_categories.c.post_id == row.id).order_by(Category.name)
+        ).all()
+        images = db.session.execute(
+            select(Image.filename, Image.caption).where(Image.post_id == row.id).order_by(Image.id)
+        ).all()
+        videos = db.session.execute(
+            select(Video.filename, Video.caption).where(Video.post_id == row.id).order_by(Video.id)
+        ).all()
+        return {'data': {
+            **_post_summary(row),
+            'content': row.content,
+            'video': _media_url(row.video_filename),
+            'categories': [{'name': name, 'slug': category_slug} for name, category_slug in categories],
+            'images': [{'url': _media_url(filename), 'caption': caption} for filename, caption in images],
+            'videos': [{'url': _media_url(filename), 'caption': caption} for filename, caption in videos],
+        }}
+
+    return _cached(('post', slug), 'posts', compute, not_found='Post não encontrado.')
+
+
+# --- Landing pages ---
+
+@bp.route('/landing-pages')
+def list_landing_pages():
+    """Landing pages publicadas, em ordem de título (como no menu do site)."""
+    def compute():
+        rows = db.session.execute(
+            select(LandingPage.slug, LandingPage.title, LandingPage.hero_title, LandingPage.hero_subtitle,
+                   LandingPage.hero_image, LandingPage.updated_at)
+            .where(LandingPage.is_published.is_(True)).order_by(LandingPage.title)
+        ).all()
+        return {'data': [{
+            'slug': row.slug,
+            'title': row.title,
+            'hero_title': row.hero_title,
+            'hero_subtitle': row.hero_subtitle,
+            'hero_image': _media_url(row.hero_image),
+            'url': _page_url('main.view_landing_page', slug=row.slug),
+            'updated_at': row.updated_at,
+        } for row in rows]}
+
+    return _cached(('landing_pages',), 'landing_pages', compute)
+
+
+@bp.route('/landing-pages/<slug>')
+def get_landing_page(slug):
+    """Landing page publicada completa."""
+    def compute():
+        row = db.session.execute(
+            select(LandingPage.slug, LandingPage.title, LandingPage.hero_title, LandingPage.hero_subtitle,
+                   LandingPage.hero_image, LandingPage.hero_cta_text, LandingPage.hero_cta_link,
+                   LandingPage.content_title, LandingPage.content_body, LandingPage.content_image,
+                   LandingPage.updated_at)
+            .where(LandingPage.slug == slug, LandingPage.is_published.is_(True))
+        ).first()
+        if row is None:
+            return None
+        return {'data': {
+            'slug': row.slug,
+            'title': row.title,
+            'url': _page_url('main.view_landing_page', slug=row.slug),
+            'hero': {
+                'title': row.hero_title,
+                'subtitle': row.hero_subtitle,
+                'image': _media_url(row.hero_image),
+                'cta_text': row.hero_cta_text,
+                'cta_link': row.hero_cta_link,
+            },
+            'content': {
+                'title': row.content_title,
+                'body': row.content_body,
+                'image': _media_url(row.content_image),
+            },
+            'updated_at': row.updated_at,
+        }}
+
+    return _cached(('landing_page', slug), 'landing_pages', compute, not_found='Landing page não encontrada.')
+
+
+# --- Configurações e popup ---
+
+@bp.route('/settings')
+def get_settings():
+    """Nome, descrição e dados do rodapé do site (sem as mensagens internas)."""
+    def compute():
+        row = db.session.execute(
+            select(Settings.business_name, Settings.site_description, Settings.footer_address,
+                   Settings.footer_phone, Settings.footer_email, Settings.footer_instagram_link,
+                   Settings.footer_facebook_link, Settings.footer_whatsapp_link, Settings.footer_copyright_text)
+            .order_by(Settings.id).limit(1)
+        ).first()
+        if row is None:
+            return {'data': None}
+        return {'data': {
+            'business_name': row.business_name,
+            'site_description': row.site_description,
+            'footer': {
+                'address': row.footer_address,
+                'phone': row.footer_phone,
+                'email': row.footer_email,
+                'instagram': row.footer_instagram_link,
+                'facebook': row.footer_facebook_link,
+                'whatsapp': row.footer_whatsapp_link,
+                'copyright': row.footer_copyright_text,
+            },
+        }}
+
+    return _cached(('settings',), 'settings', compute)
+
+
+@bp.route('/popup')
+def get_popup():
+    """Popup ativo ('data' nulo se não houver nenhum)."""
+    def compute():
+        row = db.session.execute(
+            select(Popup.id, Popup.title, Popup.image_filename, Popup.target_url, Popup.display_mode)
+            .where(Popup.is_active.is_(True)).order_by(Popup.id).limit(1)
+        ).first()
+        if row is None:
+            return {'data': None}
+        return {'data': {
+            'id': row.id,
+            'title': row.title,
+            'image': _media_url(row.image_filename),
+            'target_url': row.target_url,
+            # Redireciona para target_url contando o clique (app/analytics.py)
+            'click_url': _page_url('main.popup_click', popup_id=row.id),
+            'display_mode': row.display_mode,
+        }}
+
+    return _cached(('popup',), 'popup', compute)
@@ -1,11 +1,13 @@
 # app/auth/routes.py
-from flask import render_template, flash, redirect, url_for
+import math
+from flask import render_template, flash, redirect, url_for, request, make_response
 from flask_login import login_user, logout_user, current_user
 from app.auth import bp
 from app.forms import LoginForm, RegistrationForm
 from app.models import User
 
 from app.extensions import db
+from app.login_throttle import login_throttle
 
 
 @bp.route('/login', methods=['GET', 'POST'])
@@ -16,12 +18,27 @@ def login():
 
     form = LoginForm()
     if form.validate_on_submit():
+        # Muitas falhas recentes da conta ou do IP: recusa antes de calcular o hash
+        retry_after = login_throttle.check(form.email.data, request.remote_addr)
+        if retry_after:
+            flash(f'Muitas tentativas de login. Tente novamente em {math.ceil(retry_after / 60)} minuto(s).')
+            response = make_response(render_template('auth/login.html', title='Entrar', form=form), 429)
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+
         user = User.query.filter_by(email=form.email.data).first()
         # Verifica se o usuário não existe OU se a senha está incorreta
         if user is None or not user.check_password(form.password.data):
+            login_throttle.failed(form.email.data, request.remote_addr)
             flash('Email ou senha inválidos')
             return redirect(url_for('auth.login'))
 
+        login_throttle.succeeded(form.email.data)
+        # Hash gerado com parâmetros antigos: refaz com os atuais, já que a senha é conhecida
+        if user.password_needs_rehash():
+            user.set_password(form.password.data)
+            db.session.commit()
+
         # Se deu tudo certo, faz o login
         login_user(user, remember=form.remember_me.data)
         return redirect(url_for('dashboard.index')) # Futuramente, 'dashboard.index'
@@ -0,0 +1,83 @@
+# app/birthdays.py
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import load_only
+
+from app.extensions import db
+from app.models import Client, Settings, BirthdayDigest
+from app.messages import compile_settings, client_values, next_service_dates
+from app.utils import build_whatsapp_url
+
+
+def _is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def birthday_window(start, days):
+    """
+    Mapeia cada dia de aniversário (MMDD) da janela [start, start + days]
+    para a data em que ele cai. Quem nasceu em 29/02 comemora em 28/02
+    nos anos não bissextos. Com uma janela de um ano ou mais, vale a
+    ocorrência mais próxima (os de hoje continuam sendo de hoje).
+    """
+    window = {}
+    for offset in range(days + 1):
+        day = start + timedelta(days=offset)
+        window.setdefault(day.month * 100 + day.day, day)
+        if day.month == 2 and day.day == 28 and not _is_leap(day.year):
+            window.setdefault(229, day)
+    return window
+
+
+def build_digest(day=None):
+    """
+    Gera a lista de aniversariantes do dia e da janela de notificação.
+
+    Os clientes são buscados com uma única consulta pelo índice de
+    'birthday_md', os links do WhatsApp são montados em lote e o resultado
+    substitui o digest anterior na tabela 'birthday_digest'.
+    Retorna a quantidade de aniversariantes gravados.
+    """
+    day = day or date.today()
+    settings = Settings.query.first()
+    notification_days = settings.birthday_notification_days if settings else 30
+    templates = compile_settings(settings)
+    birthday_message = templates['birthday_congrats_message']
+    client_message = templates['client_whatsapp_message']
+
+    window = birthday_window(day, notification_days)
+    clients = Client.query.options(load_only(
+        Client.id, Client.child_name, Client.child_date_of_birth,
+        Client.parent1_name, Client.contact_phone, Client.contact_phone_e164, Client.birthday_md
+    )).filter(Client.birthday_md.in_(list(window))).all()
+
+    next_services = {}
+    if 'next_service_date' in birthday_message.fields | client_message.fields:
+        next_services = next_service_dates([client.id for client in clients], day)
+
+    rows = []
+    for client in clients:
+        birthday = window[client.birthday_md]
+        is_today = birthday == day
+        # No dia: parabéns. Nos próximos dias: mensagem padrão para clientes.
+        template = birthday_message if is_today else client_message
+        message = template.render(client_values(client, next_services.get(client.id), day))
+        rows.append({
+            'digest_date': day,
+            'client_id': client.id,
+            'child_name': client.child_name,
+            'parent_name': client.parent1_name,
+            'contact_phone': client.contact_phone,
+            'birthday': birthday,
+            'days_until': (birthday - day).days,
+            'age_turning': birthday.year - client.child_date_of_birth.year,
+            'whatsapp_url': build_whatsapp_url(client.contact_phone_e164, message) if template else None,
+        })
+
+    # Substitui o digest do dia e descarta os dias anteriores
+    db.session.execute(delete(BirthdayDigest).where(BirthdayDigest.digest_date <= day))
+    if rows:
+        db.session.execute(insert(BirthdayDigest), rows)
+    db.session.commit()
+    return len(rows)
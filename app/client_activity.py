@@ -0,0 +1,160 @@
+# app/client_activity.py
+"""
+Resumo do histórico de serviços de cada cliente, guardado no próprio Client:
+data do último serviço, quantidade de serviços e serviço mais frequente.
+
+Os eventos da sessão anotam os clientes cujos ClientService foram criados,
+alterados ou excluídos e, após o flush, recalculam o resumo só desses
+clientes (pelo índice client_id + service_date), na mesma transação.
+Alterações feitas fora do ORM (UPDATE/DELETE em massa, SQL direto) não passam
+pelos eventos: 'flask clients reconcile' recalcula tudo e corrige a diferença.
+"""
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import bindparam, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import Client, ClientService
+from app.stats import load_previous_value
+
+# Clientes sem serviço há mais que isso aparecem no filtro "inativos"
+INACTIVE_MONTHS = 6
+
+SUMMARY_COLUMNS = ('last_service_date', 'service_count', 'top_service')
+EMPTY_SUMMARY = {'last_service_date': None, 'service_count': 0, 'top_service': None}
+
+
+def inactive_cutoff(today=None):
+    """Data limite do filtro de inativos: último serviço antes dela."""
+    return (today or date.today()) - relativedelta(months=INACTIVE_MONTHS)
+
+
+def _summaries(rows):
+    """
+    Resumos a partir de linhas (client_id, serviço, quantidade, data mais
+    recente). Empate no serviço mais frequente: vence o usado por último.
+    """
+    summaries, best = {}, {}
+    for client_id, service_name, count, last_date in rows:
+        summary = summaries.setdefault(client_id, dict(EMPTY_SUMMARY))
+        summary['service_count'] += count
+        if summary['last_service_date'] is None or last_date > summary['last_service_date']:
+            summary['last_service_date'] = last_date
+        rank = (count, last_date, service_name)
+        if client_id not in best or rank > best[client_id]:
+            best[client_id] = rank
+            summary['top_service'] = service_name
+    return summaries
+
+
+def _grouped_services(client_ids=None):
+    stmt = (
+        select(ClientService.client_id, ClientService.service_name,
+               func.count(ClientService.id), func.max(ClientService.service_date))
+        .group_by(ClientService.client_id, ClientService.service_name)
+    )
+    if client_ids is not None:
+        stmt = stmt.where(ClientService.client_id.in_(client_ids))
+    return stmt
+
+
+def _write_summaries(connection, summaries):
+    """Grava os resumos ({client_id: resumo}) com um UPDATE em lote."""
+    if not summaries:
+        return
+    table = Client.__table__
+    connection.execute(
+        update(table).where(table.c.id == bindparam('b_id'))
+        .values(**{column: bindparam(f'b_{column}') for column in SUMMARY_COLUMNS}),
+        [{'b_id': client_id, **{f'b_{column}': summary[column] for column in SUMMARY_COLUMNS}}
+         for client_id, summary in summaries.items()],
+    )
+
+
+def refresh_clients(session, client_ids):
+    """Recalcula e grava o resumo dos clientes informados."""
+    connection = session.connection()
+    summaries = _summaries(connection.execute(_grouped_services(client_ids)))
+    summaries = {client_id: summaries.get(client_id, dict(EMPTY_SUMMARY)) for client_id in client_ids}
+    _write_summaries(connection, summaries)
+
+    # Os objetos já carregados na sessão passam a refletir o que foi gravado
+    for client_id, summary in summaries.items():
+        client = session.identity_map.get(session.identity_key(Client, client_id))
+        if client is not None:
+            for column, value in summary.items():
+                set_committed_value(client, column, value)
+
+
+# --- Manutenção incremental via eventos da sessão ---
+
+# Carrega o cliente anterior mesmo com o objeto expirado (ex: após um commit),
+# para que um serviço trocado de cliente atualize os dois
+load_previous_value(ClientService.client_id)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_changed_clients(session, flush_context, instances):
+    client_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, ClientService):
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        # Serviço novo ligado pelo relacionamento: o id do cliente só existe após o flush
+        client_ids.add(obj.client_id if obj.client_id is not None else obj.client)
+        # Serviço movido para outro cliente: o anterior também muda
+        state = inspect(obj)
+        client_ids.update(state.attrs.client_id.history.deleted)
+        client_ids.update(state.attrs.client.history.deleted)
+    if client_ids:
+        session.info.setdefault('activity_clients', set()).update(client_ids - {None})
+
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_changed_clients(session, flush_context):
+    pending = session.info.pop('activity_clients', None)
+    if pending:
+        # Clientes novos entram pelo objeto (já com id); um cliente excluído
+        # neste flush não é encontrado pelo UPDATE
+        client_ids = {item.id if isinstance(item, Client) else item for item in pending}
+        refresh_clients(session, sorted(client_ids - {None}))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_clients(session):
+    session.info.pop('activity_clients', None)
+
+
+# --- Reconciliação completa ---
+
+def reconcile(session, batch_size=5000):
+    """
+    Recalcula o resumo de todos os clientes, em faixas de id, e grava só os
+    divergentes, numa única transação. Retorna quantos clientes foram corrigidos.
+    """
+    connection = session.connection()
+    table = Client.__table__
+    fixed, last_id = 0, 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, *(table.c[column] for column in SUMMARY_COLUMNS))
+            .where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        first_id, last_id = rows[0][0], rows[-1][0]
+        expected = _summaries(connection.execute(
+            _grouped_services().where(ClientService.client_id.between(first_id, last_id))
+        ))
+        drift = {}
+        for client_id, *values in rows:
+            summary = expected.get(client_id, EMPTY_SUMMARY)
+            if tuple(values) != tuple(summary[column] for column in SUMMARY_COLUMNS):
+                drift[client_id] = summary
+        _write_summaries(connection, drift)
+        fixed += len(drift)
+    session.commit()
+    return fixed
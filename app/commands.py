@@ -61,102 +61,487 @@ def db_drop_all():
 @click.command(name='seed-homepage')
 @with_appcontext
 def seed_homepage():
-    """Popula a tabela home_page_content com o conteúdo inicial."""
+    """Popula as seções da homepage (home_page_section) com o conteúdo inicial."""
     
     # Tenta encontrar o primeiro registro de conteúdo.
     # A rota da home já deve ter criado um, então ele deve existir.
+    from app.homepage import load_sections, apply_form_data
+
     content = HomePageContent.query.get(1)
 
     if not content:
         click.echo("Erro: Nenhum conteúdo da homepage encontrado para atualizar. Acesse a página inicial primeiro para criar o registro.")
         return
 
-    # Atualizando todos os campos com os valores fornecidos
-    content.hero_title='Diversão além da imaginação'
-    content.hero_subtitle='Festas de aniversário temáticas e passaportes de diversão em um universo onde a imaginação não tem limites.'
-    content.cta_title='Pronto para embarcar nessa aventura?'
-    content.cta_subtitle='Entre em contato e vamos criar juntos momentos inesquecíveis para sua criança!'
-    content.hero_badge_text='Planeta Imaginário - Jundiaí Shopping - Piso G3, Loja S113'
-    content.hero_whatsapp_button_text='Fale conosco'
-    content.hero_whatsapp_button_link='https://wa.me/5511950803725'
-    content.hero_highlight_text='Espaço seguro e monitorado por profissionais especializados'
-    content.services_section_tagline='O que oferecemos'
-    content.services_section_title='Experiências inesquecíveis'
-    content.services_section_subtitle='Criamos momentos mágicos que ficarão para sempre na memória das crianças e das famílias'
-    content.services_card1_icon='🎂'
-    content.services_card1_title='Festas de aniversário'
-    content.services_card1_text='Celebre de forma única e personalizada com nossas festas temáticas que transformam sonhos em realidade.'
-    content.services_card1_item1='Temas exclusivos e personalizados'
-    content.services_card1_item2='Decoração temática completa'
-    content.services_card1_item3='Recreação especializada'
-    content.services_card1_cta_text='Solicitar orçamento'
-    content.services_card1_cta_link='https://'
-    content.services_card2_icon='🪪'
-    content.services_card2_title='Passaporte de diversão'
-    content.services_card2_text='Deixe as crianças se divertirem em um ambiente seguro enquanto você aproveita o shopping com tranquilidade.'
-    content.services_card2_item1='Monitoramento por câmeras'
-    content.services_card2_item2='Equipe especializada em recreação'
-    content.services_card2_item3='Ambiente lúdico e seguro'
-    content.services_card2_cta_text='Saiba mais'
-    content.services_card2_cta_link='https://'
-    content.services_card3_icon='⏰'
-    content.services_card3_title='Tempo livre'
-    content.services_card3_text='Momentos de lazer garantidos para as crianças aproveitarem nosso espaço mágico de forma segura e divertida, com opção a partir de 30 minutos.'
-    content.services_card3_item1='Diversão monitorada por profissionais especializados'
-    content.services_card3_item2='Atividades lúdicas em um ambiente seguro'
-    content.services_card3_item3='Tranquilidade para os pais aproveitarem o shopping'
-    content.services_card3_cta_text='Saiba mais'
-    content.services_card3_cta_link='https://'
-    content.values_section_tagline='Por que nos escolher'
-    content.values_section_title='Missão, visão e valores'
-    content.values_section_subtitle='Nosso compromisso é criar experiências que vão além da diversão'
-    content.values_card1_icon='✨'
-    content.values_card1_title='Missão'
-    content.values_card1_text='Proporcionar experiências lúdicas e educativas que estimulem a criatividade e o desenvolvimento infantil em um ambiente seguro e mágico.'
-    content.values_card2_icon='🌠'
-    content.values_card2_title='Visão'
-    content.values_card2_text='Ser referência em entretenimento infantil, onde cada visita se transforma em uma aventura inesquecível no universo da imaginação.'
-    content.values_card3_icon='💖'
-    content.values_card3_title='Valores'
-    content.values_card3_text='Segurança, criatividade, inclusão e respeito pela individualidade de cada criança, criando memórias felizes para toda a família.'
-    content.structure_section_tagline='Infraestrutura'
-    content.structure_section_title='Um universo de possibilidades'
-    content.structure_section_subtitle='Nossas instalações foram cuidadosamente projetadas para oferecer diversão, segurança e conforto em cada detalhe.'
-    content.structure_feature1_title='Ambientes'
-    content.structure_feature1_text='⏺ Campo de futebol\n⏺ Área de games\n⏺ Brinquedoteca\n⏺ Espaço maquiagem\n⏺ e muito mais!'
-    content.structure_feature2_title='Benefícios'
-    content.structure_feature2_text='Ambiente Seguro: Monitoramento 360° e equipe treinada para garantir a segurança das crianças.\nEspaço Higienizado: Limpeza constante e protocolos rigorosos de higiene em todas as áreas.\nAcessibilidade: Espaço adaptado para garantir que todas as crianças possam brincar com conforto.'
-    content.blog_section_tagline='Nosso diário'
-    content.blog_section_title='Diário de bordo'
-    content.blog_section_subtitle='As últimas aventuras e novidades do nosso Planeta'
-    content.blog_cta_text='Ver todas as aventuras'
-    content.cta_whatsapp_button_text='Falar no WhatsApp'
-    content.cta_form_button_text='Preencher formulário'
-    content.location_section_tagline='Onde estamos'
-    content.location_section_title='Venha nos visitar!'
-    content.location_section_subtitle='Estamos localizados no Jundiaí Shopping, um ponto de fácil acesso no coração da cidade.'
-    content.location_card_title='Informações de contato'
-    content.location_address_title='📍 Endereço'
-    content.location_address_text='Jundiaí Shopping - Piso G3, Loja S113<br>Av. 9 de Julho, 3333 - Jundiaí/SP'
-    content.location_phone_title='📱 Telefone/WhatsApp'
-    content.location_phone_text='(11) 95080-3725'
-    content.location_hours_title='⏰ Funcionamento'
-    content.location_hours_text='Seg a Sáb: 10h às 22h<br>Dom e Feriados: 12h às 20h'
-    content.location_gmaps_button_text='Ver no Google Maps'
-    content.location_gmaps_link='https://www.google.com/maps/search/?api=1&query=Planeta+Imaginario+Jundiai+Shopping'
-    content.location_image_alt='Mapa da localização do Planeta Imaginário no Jundiaí Shopping'
-    content.show_hero_section=True
-    content.hero_background_color_from='#5448E2'
-    content.hero_background_color_to='#1F2937'
-    content.show_services_section=True
-    content.show_values_section=True
-    content.show_structure_section=True
-    content.show_blog_section=True
-    content.show_cta_section=True
-    content.show_location_section=True
+    # Valores com os nomes dos campos dos formulários de cada seção
+    values = {
+        'hero_title': 'Diversão além da imaginação',
+        'hero_subtitle': 'Festas de aniversário temáticas e passaportes de diversão em um universo onde a imaginação não tem limites.',
+        'cta_title': 'Pronto para embarcar nessa aventura?',
+        'cta_subtitle': 'Entre em contato e vamos criar juntos momentos inesquecíveis para sua criança!',
+        'hero_badge_text': 'Planeta Imaginário - Jundiaí Shopping - Piso G3, Loja S113',
+        'hero_whatsapp_button_text': 'Fale conosco',
+        'hero_whatsapp_button_link': 'https://wa.me/5511950803725',
+        'hero_highlight_text': 'Espaço seguro e monitorado por profissionais especializados',
+        'services_section_tagline': 'O que oferecemos',
+        'services_section_title': 'Experiências inesquecíveis',
+        'services_section_subtitle': 'Criamos momentos mágicos que ficarão para sempre na memória das crianças e das famílias',
+        'services_card1_icon': '🎂',
+        'services_card1_title': 'Festas de aniversário',
+        'services_card1_text': 'Celebre de forma única e personalizada com nossas festas temáticas que transformam sonhos em realidade.',
+        'services_card1_item1': 'Temas exclusivos e personalizados',
+        'services_card1_item2': 'Decoração temática completa',
+        'services_card1_item3': 'Recreação especializada',
+        'services_card1_cta_text': 'Solicitar orçamento',
+        'services_card1_cta_link': 'https://',
+        'services_card2_icon': '🪪',
+        'services_card2_title': 'Passaporte de diversão',
+        'services_card2_text': 'Deixe as crianças se divertirem em um ambiente seguro enquanto você aproveita o shopping com tranquilidade.',
+        'services_card2_item1': 'Monitoramento por câmeras',
+        'services_card2_item2': 'Equipe especializada em recreação',
+        'services_card2_item3': 'Ambiente lúdico e seguro',
+        'services_card2_cta_text': 'Saiba mais',
+        'services_card2_cta_link': 'https://',
+        'services_card3_icon': '⏰',
+        'services_card3_title': 'Tempo livre',
+        'services_card3_text': 'Momentos de lazer garantidos para as crianças aproveitarem nosso espaço mágico de forma segura e divertida, com opção a partir de 30 minutos.',
+        'services_card3_item1': 'Diversão monitorada por profissionais especializados',
+        'services_card3_item2': 'Atividades lúdicas em um ambiente seguro',
+        'services_card3_item3': 'Tranquilidade para os pais aproveitarem o shopping',
+        'services_card3_cta_text': 'Saiba mais',
+        'services_card3_cta_link': 'https://',
+        'values_section_tagline': 'Por que nos escolher',
+        'values_section_title': 'Missão, visão e valores',
+        'values_section_subtitle': 'Nosso compromisso é criar experiências que vão além da diversão',
+        'values_card1_icon': '✨',
+        'values_card1_title': 'Missão',
+        'values_card1_text': 'Proporcionar experiências lúdicas e educativas que estimulem a criatividade e o desenvolvimento infantil em um ambiente seguro e mágico.',
+        'values_card2_icon': '🌠',
+        'values_card2_title': 'Visão',
+        'values_card2_text': 'Ser referência em entretenimento infantil, onde cada visita se transforma em uma aventura inesquecível no universo da imaginação.',
+        'values_card3_icon': '💖',
+        'values_card3_title': 'Valores',
+        'values_card3_text': 'Segurança, criatividade, inclusão e respeito pela individualidade de cada criança, criando memórias felizes para toda a família.',
+        'structure_section_tagline': 'Infraestrutura',
+        'structure_section_title': 'Um universo de possibilidades',
+        'structure_section_subtitle': 'Nossas instalações foram cuidadosamente projetadas para oferecer diversão, segurança e conforto em cada detalhe.',
+        'structure_feature1_title': 'Ambientes',
+        'structure_feature1_text': '⏺ Campo de futebol\n⏺ Área de games\n⏺ Brinquedoteca\n⏺ Espaço maquiagem\n⏺ e muito mais!',
+        'structure_feature2_title': 'Benefícios',
+        'structure_feature2_text': 'Ambiente Seguro: Monitoramento 360° e equipe treinada para garantir a segurança das crianças.\nEspaço Higienizado: Limpeza constante e protocolos rigorosos de higiene em todas as áreas.\nAcessibilidade: Espaço adaptado para garantir que todas as crianças possam brincar com conforto.',
+        'blog_section_tagline': 'Nosso diário',
+        'blog_section_title': 'Diário de bordo',
+        'blog_section_subtitle': 'As últimas aventuras e novidades do nosso Planeta',
+        'blog_cta_text': 'Ver todas as aventuras',
+        'cta_whatsapp_button_text': 'Falar no WhatsApp',
+        'cta_form_button_text': 'Preencher formulário',
+        'location_section_tagline': 'Onde estamos',
+        'location_section_title': 'Venha nos visitar!',
+        'location_section_subtitle': 'Estamos localizados no Jundiaí Shopping, um ponto de fácil acesso no coração da cidade.',
+        'location_card_title': 'Informações de contato',
+        'location_address_title': '📍 Endereço',
+        'location_address_text': 'Jundiaí Shopping - Piso G3, Loja S113<br>Av. 9 de Julho, 3333 - Jundiaí/SP',
+        'location_phone_title': '📱 Telefone/WhatsApp',
+        'location_phone_text': '(11) 95080-3725',
+        'location_hours_title': '⏰ Funcionamento',
+        'location_hours_text': 'Seg a Sáb: 10h às 22h<br>Dom e Feriados: 12h às 20h',
+        'location_gmaps_button_text': 'Ver no Google Maps',
+        'location_gmaps_link': 'https://www.google.com/maps/search/?api=1&query=Planeta+Imaginario+Jundiai+Shopping',
+        'location_image_alt': 'Mapa da localização do Planeta Imaginário no Jundiaí Shopping',
+        'show_hero_section': True,
+        'hero_background_color_from': '#5448E2',
+        'hero_background_color_to': '#1F2937',
+        'show_services_section': True,
+        'show_values_section': True,
+        'show_structure_section': True,
+        'show_blog_section': True,
+        'show_cta_section': True,
+        'show_location_section': True,
+    }
 
+    for section in load_sections().values():
+        apply_form_data(section, values)
     db.session.commit()
-    click.echo("Conteúdo da Homepage populado com sucesso!")
+
+    if content.live_release_id is None:
+        from flask import current_app
+        from app.homepage import publish
+
+        with current_app.test_request_context(base_url=current_app.config.get('SITE_URL')):
+            publish(content, note='Primeira versão publicada')
+        click.echo("Conteúdo da Homepage populado e publicado com sucesso!")
+        return
+    click.echo("Conteúdo da Homepage populado com sucesso! Publique com 'flask homepage publish' ou pelo dashboard.")
+
+# --- CONTADORES DO DASHBOARD ---
+@click.group(name='stats')
+def stats_cli():
+    """Gerencia os contadores materializados do dashboard."""
+
+
+@stats_cli.command(name='rebuild')
+@with_appcontext
+def stats_rebuild():
+    """
+    Recalcula todos os contadores a partir das tabelas e corrige divergências.
+    Exemplo: flask stats rebuild
+    """
+    from app.stats import rebuild_counters
+
+    drift = rebuild_counters(db.session)
+    if not drift:
+        click.echo("✅ Contadores já estavam consistentes.")
+        return
+    for key, (old_value, new_value) in sorted(drift.items()):
+        click.echo(f"   {key}: {old_value} -> {new_value}")
+    click.echo(f"✅ {len(drift)} contador(es) corrigido(s).")
+
+
+# --- LISTA DIÁRIA DE ANIVERSARIANTES ---
+@click.group(name='birthdays')
+def birthdays_cli():
+    """Gera a lista diária de aniversariantes."""
+
+
+@birthdays_cli.command(name='build')
+@with_appcontext
+@click.option('--date', 'day', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Dia de referência (AAAA-MM-DD). Padrão: hoje.')
+def birthdays_build(day):
+    """
+    Gera o digest de aniversariantes do dia com os links de WhatsApp.
+    Deve ser agendado diariamente (ex: cron às 6h): flask birthdays build
+    """
+    from app.birthdays import build_digest
+
+    total = build_digest(day.date() if day else None)
+    click.echo(f"🎂 Digest gerado com {total} aniversariante(s).")
+
+
+# --- TELEFONES NORMALIZADOS ---
+@click.group(name='phones')
+def phones_cli():
+    """Gerencia os telefones normalizados (E.164) de clientes e leads."""
+
+
+@phones_cli.command(name='backfill')
+@with_appcontext
+@click.option('--batch-size', default=1000, show_default=True, help='Linhas lidas por lote.')
+def phones_backfill(batch_size):
+    """
+    Preenche/corrige as colunas *_e164 a partir dos telefones digitados.
+    A migração já preenche as linhas existentes; use após importações ou
+    alterações feitas direto no banco: flask phones backfill
+    """
+    from app.phones import backfill_phones
+
+    for table, total in backfill_phones(db.session, batch_size).items():
+        click.echo(f"   {table}: {total} linha(s) atualizada(s)")
+    click.echo("✅ Telefones normalizados.")
+
+
+# --- RESUMO DE ATIVIDADE DOS CLIENTES ---
+@click.group(name='clients')
+def clients_cli():
+    """Gerencia dados derivados dos clientes."""
+
+
+@clients_cli.command(name='reconcile')
+@with_appcontext
+@click.option('--batch-size', default=5000, show_default=True, help='Clientes verificados por lote.')
+def clients_reconcile(batch_size):
+    """
+    Recalcula o resumo de serviços (último serviço, quantidade, mais frequente)
+    e corrige divergências. A migração já preenche os clientes existentes; use
+    após alterações em massa no histórico: flask clients reconcile
+    """
+    from app.client_activity import reconcile
+
+    fixed = reconcile(db.session, batch_size)
+    click.echo(f"✅ {fixed} cliente(s) corrigido(s)." if fixed else "✅ Resumos já estavam consistentes.")
+
+
+# --- DADOS SINTÉTICOS ---
+@click.command(name='seed-synthetic')
+@with_appcontext
+@click.option('--clients', default=100_000, show_default=True, help='Clientes (cada um com histórico de serviços).')
+@click.option('--services-per-client', default=3, show_default=True, help='Média de serviços por cliente.')
+@click.option('--leads', default=50_000, show_default=True)
+@click.option('--posts', default=2_000, show_default=True)
+@click.option('--images-per-post', default=6, show_default=True)
+@click.option('--videos-per-post', default=1, show_default=True)
+@click.option('--categories', default=12, show_default=True)
+@click.option('--landing-pages', default=50, show_default=True)
+@click.option('--users', default=10, show_default=True)
+@click.option('--seed', default=42, show_default=True, help='Semente do gerador (mesma semente, mesmos dados).')
+@click.option('--batch-size', default=5000, show_default=True, help='Linhas por INSERT em lote.')
+@click.option('--media', 'media_count', default=0, show_default=True,
+              help='Quantidade de imagens de exemplo a gravar em UPLOAD_FOLDER (0 = usar default.jpg).')
+@click.option('--workers', default=8, show_default=True, help='Threads para gravar as imagens de exemplo.')
+@click.option('--yes', is_flag=True, help='Não pedir confirmação.')
+def seed_synthetic(clients, services_per_client, leads, posts, images_per_post, videos_per_post,
+                   categories, landing_pages, users, seed, batch_size, media_count, workers, yes):
+    """
+    Gera dados sintéticos em grande volume para testes de desempenho.
+    Exemplo: flask seed-synthetic --clients 1000000 --leads 200000 --media 200
+    """
+    import time
+    from flask import current_app
+    from app.synthetic import generate, generate_media
+
+    if not yes and not click.confirm('Os dados sintéticos serão ACRESCENTADOS ao banco atual. Continuar?'):
+        return
+
+    started = time.perf_counter()
+    media_files = None
+    if media_count:
+        click.echo(f"🖼️  Gravando {media_count} imagem(ns) de exemplo...")
+        media_files = generate_media(current_app.config['UPLOAD_FOLDER'], seed, media_count, workers)
+
+    click.echo("🌱 Gerando dados sintéticos...")
+    scale = {
+        'clients': clients, 'services_per_client': services_per_client, 'leads': leads,
+        'posts': posts, 'images_per_post': images_per_post, 'videos_per_post': videos_per_post,
+        'categories': categories, 'landing_pages': landing_pages, 'users': users,
+    }
+    totals = generate(scale, seed=seed, batch_size=batch_size, media_files=media_files, echo=click.echo)
+    for table, total in totals.items():
+        click.echo(f"   {table}: {total} linha(s)")
+    click.echo(f"✅ Concluído em {time.perf_counter() - started:.1f}s.")
+
+
+# --- MANUTENÇÃO DA PASTA DE MÍDIA ---
+@click.group(name='media')
+def media_cli():
+    """Manutenção dos arquivos de mídia (UPLOAD_FOLDER)."""
+
+
+def _format_size(size):
+    """Tamanho legível (ex: 3.2 MB)."""
+    if size < 1024:
+        return f"{size} B"
+    for unit in ('KB', 'MB', 'GB'):
+        size /= 1024
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}"
+
+
+@media_cli.command(name='gc')
+@with_appcontext
+@click.option('--dry-run', is_flag=True, help='Apenas lista os arquivos órfãos, sem mover nada.')
+@click.option('--grace-hours', default=24, show_default=True,
+              help='Ignora arquivos modificados há menos tempo (uploads em andamento).')
+@click.option('--delete', 'delete_now', is_flag=True, help='Apaga os órfãos em vez de movê-los para a quarentena.')
+@click.option('--purge-days', default=30, show_default=True,
+              help='Apaga lotes de quarentena mais antigos que isso (0 = não apagar).')
+@click.option('--verbose', '-v', is_flag=True, help='Lista cada arquivo órfão.')
+def media_gc(dry_run, grace_hours, delete_now, purge_days, verbose):
+    """
+    Recolhe arquivos de UPLOAD_FOLDER que nenhum registro referencia.
+    Por padrão eles vão para UPLOAD_FOLDER/.quarantine/<data-hora>/.
+    Exemplo: flask media gc --dry-run
+    """
+    from flask import current_app
+    from app.media import referenced_media, find_orphans, quarantine, delete_files, purge_quarantine
+
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    if not upload_folder or not os.path.isdir(upload_folder):
+        click.echo(f"❌ Pasta não encontrada: {upload_folder}")
+        return
+
+    # Marca: referências lidas ANTES da varredura; uploads feitos depois
+    # disso ficam protegidos pela carência.
+    referenced = referenced_media()
+    orphans, recent = find_orphans(upload_folder, referenced, grace_hours * 3600)
+    total_size = sum(size for _, size in orphans)
+
+    click.echo(f"📁 {upload_folder}")
+    click.echo(f"   {len(referenced)} arquivo(s) referenciado(s) no banco")
+    click.echo(f"   {len(orphans)} órfão(s), {_format_size(total_size)}")
+    if recent:
+        click.echo(f"   {len(recent)} não referenciado(s) dentro da carência de {grace_hours}h (mantidos)")
+    if verbose or dry_run:
+        for filename, size in sorted(orphans):
+            click.echo(f"   - {filename} ({_format_size(size)})")
+
+    if dry_run or not orphans:
+        click.echo("ℹ️  Nada foi alterado." if dry_run else "✅ Nenhum arquivo órfão.")
+    elif delete_now:
+        delete_files(upload_folder, [filename for filename, _ in orphans])
+        click.echo(f"🗑️  {len(orphans)} arquivo(s) apagado(s).")
+    else:
+        target = quarantine(upload_folder, [filename for filename, _ in orphans])
+        click.echo(f"📦 {len(orphans)} arquivo(s) movido(s) para {target}")
+
+    if purge_days and not dry_run:
+        purged = purge_quarantine(upload_folder, purge_days * 86400)
+        if purged:
+            click.echo(f"🧹 {purged} lote(s) de quarentena com mais de {purge_days} dias apagado(s).")
+
+
+# --- SITEMAP E FEED ---
+@click.group(name='feeds')
+def feeds_cli():
+    """Gera o sitemap.xml e o feed.xml em disco."""
+
+
+@feeds_cli.command(name='build')
+@with_appcontext
+@click.option('--base-url', default=None,
+              help='Endereço público do site (padrão: SITE_URL), usado nos links absolutos.')
+def feeds_build(base_url):
+    """
+    Regenera os arquivos (ex: após importações em lote, que não disparam a invalidação).
+    Exemplo: flask feeds build --base-url https://planetaimaginario.com.br
+    """
+    from flask import current_app
+    from app.feeds import build_feeds, feeds_folder, invalidate
+
+    base_url = base_url or current_app.config.get('SITE_URL')
+    if not base_url:
+        raise click.UsageError('Informe --base-url ou defina SITE_URL.')
+
+    folder = feeds_folder()
+    invalidate(folder)
+    with current_app.test_request_context(base_url=base_url):
+        names = build_feeds(folder)
+    click.echo(f"✅ {len(names)} arquivo(s) gerado(s) em {folder}: {', '.join(names)}")
+
+
+# --- PUBLICAÇÃO DA HOMEPAGE ---
+@click.group(name='homepage')
+def homepage_cli():
+    """Publica o rascunho da homepage ou volta para uma versão anterior."""
+
+
+@homepage_cli.command(name='publish')
+@with_appcontext
+@click.option('--note', default=None, help='Descrição da versão.')
+def homepage_publish(note):
+    """
+    Publica o rascunho atual (ex: após 'flask seed-homepage').
+    Exemplo: flask homepage publish --note "Horários de férias"
+    """
+    from flask import current_app
+    from app.homepage import publish
+
+    content = HomePageContent.query.first()
+    if not content:
+        raise click.ClickException('Nenhum conteúdo da homepage encontrado.')
+    with current_app.test_request_context(base_url=current_app.config.get('SITE_URL')):
+        release = publish(content, note=note)
+    click.echo(f"✅ Versão #{release.id} publicada.")
+
+
+@homepage_cli.command(name='rerender')
+@with_appcontext
+def homepage_rerender():
+    """
+    Publica uma cópia da versão no ar renderizada com os templates atuais.
+    Rode após um deploy que altere app/templates/public/sections/.
+    Exemplo: flask homepage rerender
+    """
+    from flask import current_app
+    from app.homepage import rerender
+
+    content = HomePageContent.query.first()
+    if not content or not content.live_release:
+        raise click.ClickException('Nenhuma versão publicada.')
+    with current_app.test_request_context(base_url=current_app.config.get('SITE_URL')):
+        release = rerender(content)
+    click.echo(f"✅ Versão #{release.id} publicada com o HTML atual.")
+
+
+@homepage_cli.command(name='rollback')
+@with_appcontext
+@click.argument('release_id', type=int)
+def homepage_rollback(release_id):
+    """
+    Coloca no ar uma versão publicada anteriormente.
+    Exemplo: flask homepage rollback 12
+    """
+    from app.models import HomePageRelease
+    from app.homepage import rollback
+
+    content = HomePageContent.query.first()
+    release = db.session.get(HomePageRelease, release_id)
+    if not content or not release:
+        raise click.ClickException(f'Versão #{release_id} não encontrada.')
+    rollback(content, release)
+    click.echo(f"✅ Versão #{release.id} no ar.")
+
+
+# --- EXPORTAÇÃO ESTÁTICA ---
+@click.command(name='freeze')
+@with_appcontext
+@click.option('--workers', default=8, show_default=True, help='Páginas renderizadas em paralelo.')
+@click.option('--base-url', default=None,
+              help='Endereço público do site (padrão: SITE_URL), usado nos links absolutos.')
+def freeze_site(workers, base_url):
+    """
+    Renderiza todas as páginas públicas em HTML estático (FREEZE_FOLDER).
+    Depois disso, os salvamentos do dashboard recongelam só as páginas afetadas.
+    Exemplo: flask freeze --workers 16
+    """
+    from app.freeze import freeze, freeze_folder, public_urls
+
+    total = len(public_urls())
+    with click.progressbar(length=total, label=f'Congelando {total} página(s)') as bar:
+        stats = freeze(workers=workers, base_url=base_url, progress=bar.update)
+    for url, status in stats['failed']:
+        click.echo(f"⚠️  {url}: HTTP {status}")
+    click.echo(f"✅ {stats['written']} página(s) gravada(s) e {stats['removed']} removida(s) em {freeze_folder()}")
+
+
+# --- TAREFAS EM SEGUNDO PLANO ---
+@click.command(name='worker')
+@with_appcontext
+@click.option('--concurrency', '-c', default=4, show_default=True, help='Tarefas executadas ao mesmo tempo.')
+@click.option('--mode', type=click.Choice(['thread', 'process']), default='thread', show_default=True,
+              help='Pool de threads (tarefas de E/S) ou de processos (tarefas de CPU).')
+def run_job_worker(concurrency, mode):
+    """
+    Executa as tarefas da fila (tabela 'job') até receber Ctrl+C/SIGTERM.
+    Exemplo: flask worker --concurrency 8
+    """
+    from flask import current_app
+    from app.jobs import run_worker
+
+    click.echo(f"👷 Worker iniciado: {concurrency} {'processo(s)' if mode == 'process' else 'thread(s)'}.")
+    run_worker(current_app._get_current_object(), concurrency=concurrency, mode=mode,
+               config_name=os.getenv('FLASK_ENV', 'default'))
+    click.echo("✅ Worker encerrado.")
+
+
+@click.command(name='jobs')
+@with_appcontext
+def jobs_status():
+    """Mostra quantas tarefas há em cada situação."""
+    from app.jobs import status_counts, oldest_ready_at
+
+    for status, count in status_counts().items():
+        click.echo(f"{status:>8}: {count}")
+    oldest = oldest_ready_at()
+    if oldest:
+        click.echo(f"Tarefa pronta mais antiga: {oldest:%d/%m/%Y %H:%M:%S} (UTC)")
+
+
+@click.group(name='exports')
+def exports_cli():
+    """Central de exportações do dashboard."""
+
+
+@exports_cli.command(name='cleanup')
+@with_appcontext
+def exports_cleanup():
+    """
+    Apaga as exportações vencidas (EXPORT_RETENTION_HOURS) e seus arquivos.
+    Exemplo (cron, de hora em hora): flask exports cleanup
+    """
+    from app.exports import purge_expired
+
+    click.echo(f"🧹 {purge_expired()} exportação(ões) apagada(s).")
+
 
 # ✅ ATUALIZE A FUNÇÃO DE REGISTRO
 def register_commands(app):
@@ -165,31 +550,49 @@ def register_commands(app):
     app.cli.add_command(db_reset_history)
     app.cli.add_command(db_drop_all) # Adiciona o novo comando de drop
     app.cli.add_command(seed_homepage) # Adiciona o novo comando
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(birthdays_cli)
+    app.cli.add_command(phones_cli)
+    app.cli.add_command(clients_cli)
+    app.cli.add_command(seed_synthetic)
+    app.cli.add_command(media_cli)
+    app.cli.add_command(feeds_cli)
+    app.cli.add_command(homepage_cli)
+    app.cli.add_command(freeze_site)
+    app.cli.add_command(run_job_worker)
+    app.cli.add_command(jobs_status)
+    app.cli.add_command(exports_cli)
 
     @app.cli.command('fix-media-permissions')
     @with_appcontext
-    def fix_media_permissions():
-        """Corrige permissões da pasta media e arquivos"""
-        import stat
+    @click.option('--workers', default=16, show_default=True, help='Threads usadas para varrer e aplicar chmod.')
+    def fix_media_permissions(workers):
+        """Corrige permissões da pasta media e arquivos (pastas 755, arquivos 644)"""
         from flask import current_app
-        
+        from app.media import walk_files, walk_dirs, run_parallel, fix_permissions
+
         media_path = current_app.config['UPLOAD_FOLDER']
-        
-        if os.path.exists(media_path):
-            # Corrige permissões da pasta
-            os.chmod(media_path, 0o755)
-            click.echo(f"✅ Permissões da pasta corrigidas: {media_path}")
-            
-            # Corrige permissões dos arquivos
-            for filename in os.listdir(media_path):
-                filepath = os.path.join(media_path, filename)
-                if os.path.isfile(filepath):
-                    os.chmod(filepath, 0o644)
-                    click.echo(f"✅ Permissões do arquivo corrigidas: {filename}")
-            
-            click.echo("🎉 Todas as permissões foram corrigidas!")
-        else:
+
+        if not os.path.exists(media_path):
             click.echo(f"❌ Pasta não encontrada: {media_path}")
+            return
+
+        dirs_changed = sum(fix_permissions(path, 0o755) for path in walk_dirs(media_path, skip_hidden=False))
+        files = walk_files(media_path, workers, skip_hidden=False)
+        click.echo(f"🔍 {len(files)} arquivo(s) em {media_path}")
+
+        with click.progressbar(length=len(files), label='Ajustando permissões') as bar:
+            outcomes = run_parallel(
+                lambda relative: fix_permissions(os.path.join(media_path, relative), 0o644),
+                [relative for relative, _ in files], workers, bar.update
+            )
+
+        errors = [(relative, result) for relative, result in outcomes if isinstance(result, OSError)]
+        files_changed = sum(1 for _, result in outcomes if result is True)
+        for relative, error in errors:
+            click.echo(f"⚠️  {relative}: {error}")
+        click.echo(f"✅ {dirs_changed} pasta(s) e {files_changed} arquivo(s) corrigidos; "
+                   f"{len(files) - files_changed - len(errors)} já estavam corretos.")
 
     @app.cli.command('check-config')
     @with_appcontext
@@ -214,40 +617,52 @@ def register_commands(app):
 
     @app.cli.command('migrate-to-media')
     @with_appcontext
-    def migrate_to_media():
-        """Migra arquivos de static/uploads para /app/media"""
-        import shutil
+    @click.option('--source', default='/app/app/static/uploads', show_default=True, help='Pasta de origem.')
+    @click.option('--target', default=None, help='Pasta de destino (padrão: UPLOAD_FOLDER).')
+    @click.option('--workers', default=8, show_default=True, help='Cópias simultâneas.')
+    @click.option('--verify', is_flag=True, help='Confere o SHA-256 de cada arquivo copiado.')
+    def migrate_to_media(source, target, workers, verify):
+        """
+        Migra arquivos de static/uploads para /app/media.
+        Arquivos com mesmo tamanho e data no destino são pulados, e o progresso
+        fica em <destino>/.migrate-manifest.jsonl: se a migração for
+        interrompida, basta rodar o comando de novo.
+        """
         from flask import current_app
+        from app.media import walk_files, run_parallel, copy_media_file, CopyManifest
 
-        source_dir = '/app/app/static/uploads'  # Caminho atual
-        target_dir = current_app.config['UPLOAD_FOLDER']  # Caminho configurado
+        source_dir = source
+        target_dir = target or current_app.config['UPLOAD_FOLDER']  # Caminho configurado
 
         click.echo(f"🔄 Migrando de: {source_dir}")
         click.echo(f"            para: {target_dir}")
 
-        if os.path.exists(source_dir):
-            # Cria pasta destino se não existir
-            os.makedirs(target_dir, exist_ok=True)
-
-            # Copia arquivos
-            files_copied = 0
-            for filename in os.listdir(source_dir):
-                source_path = os.path.join(source_dir, filename)
-                target_path = os.path.join(target_dir, filename)
-
-                if os.path.isfile(source_path):
-                    shutil.copy2(source_path, target_path)
-                    files_copied += 1
-                    click.echo(f"✅ Copiado: {filename}")
-
-            click.echo(f"🎉 Migração concluída! {files_copied} arquivos movidos.")
-
-            # Verifica se os arquivos estão acessíveis
-            if os.path.exists(target_dir):
-                media_files = len([f for f in os.listdir(target_dir) if os.path.isfile(os.path.join(target_dir, f))])
-                click.echo(f"📁 Agora temos {media_files} arquivos em {target_dir}")
-        else:
+        if not os.path.exists(source_dir):
             click.echo("❌ Pasta source não encontrada.")
+            return
+
+        os.makedirs(target_dir, exist_ok=True)
+        files = walk_files(source_dir, workers)
+        click.echo(f"🔍 {len(files)} arquivo(s) na origem")
+
+        manifest = CopyManifest(os.path.join(target_dir, '.migrate-manifest.jsonl'))
+        try:
+            with click.progressbar(length=len(files), label='Copiando') as bar:
+                outcomes = run_parallel(
+                    lambda item: copy_media_file(source_dir, target_dir, item[0], item[1], manifest, verify),
+                    files, workers, bar.update
+                )
+        finally:
+            manifest.close()
+
+        copied = sum(1 for _, result in outcomes if result == 'copied')
+        skipped = sum(1 for _, result in outcomes if result == 'skipped')
+        errors = [(item[0], result) for item, result in outcomes if isinstance(result, OSError)]
+        for relative, error in errors:
+            click.echo(f"⚠️  {relative}: {error}")
+        click.echo(f"🎉 Migração concluída! {copied} copiado(s), {skipped} já estavam no destino, {len(errors)} erro(s).")
+        if errors:
+            click.echo("   Rode o comando novamente para tentar de novo apenas os que falharam.")
 
     @app.cli.command('clean-orphaned-files')
     @with_appcontext
@@ -13,5 +13,8 @@ from app.dashboard.routes import (
     leads_routes,
     landingpage_routes,
     popup_routes,
-    general_routes
+    general_routes,
+    job_routes,
+    export_routes,
+    report_routes
 )
\ No newline at end of file
@@ -2,38 +2,45 @@
 
 # --- Imports Essenciais ---
 from datetime import date, timedelta
-from io import BytesIO
-from urllib.parse import quote
-import pandas as pd
-from flask import render_template, flash, redirect, url_for, request, Response
+from flask import render_template, flash, redirect, url_for, request, Response, stream_with_context
 from flask_login import login_required
-from sqlalchemy import or_, extract
+from sqlalchemy import or_
 
 # --- Imports do Projeto ---
 from app.dashboard import bp
 from app.extensions import db
-from app.models import Client, Settings, ClientService
+from app.models import Client, Lead, Settings, ClientService, BirthdayDigest
 from app.forms import ClientForm, ClientServiceForm
+from app.birthdays import build_digest
+from app.client_activity import INACTIVE_MONTHS, inactive_cutoff
+from app.messages import (
+    compile_settings, current_templates, client_values, client_whatsapp_links,
+    next_service_dates, iter_in_batches, broadcast_csv
+)
+from app.matching import client_form_data
+from app.phones import client_phone_filter, search_phone
+from app.utils import build_whatsapp_url
 
-# --- Rotas Principais de Clientes ---
-
-@bp.route('/clients')
-@login_required
-def list_clients():
-    """Lista todos os clientes com filtros e status de aniversário."""
-    # 1. Obter os parâmetros da URL para filtros e paginação
-    page = request.args.get('page', 1, type=int)
-    birthday_filter = request.args.get('birthday_filter')
-    search_filter = request.args.get('search', '')
+# --- Funções Auxiliares ---
 
-    # 2. Construir a query base
+def _filtered_clients_query(birthday_filter, search_filter, activity_filter=None):
+    """Aplica os filtros da listagem de clientes (aniversariantes, inatividade e busca)."""
     query = Client.query
 
+    # Inativos: último serviço há mais de INACTIVE_MONTHS (coluna indexada do resumo)
+    if activity_filter == 'inactive':
+        query = query.filter(Client.last_service_date < inactive_cutoff())
+
     # Aplica o filtro de aniversariantes do próximo mês
     if birthday_filter == 'true':
         today = date.today()
         next_month = today.month + 1 if today.month < 12 else 1
-        query = query.filter(extract('month', Client.child_date_of_birth) == next_month)
+        query = query.filter(Client.birthday_md.between(next_month * 100 + 1, next_month * 100 + 31))
+
+    # Busca por telefone: igualdade exata nas colunas E.164 indexadas
+    phone = search_phone(search_filter)
+    if phone:
+        return query.filter(client_phone_filter(phone))
 
     # Aplica o filtro de busca textual
     if search_filter:
@@ -47,9 +54,59 @@ def list_clients():
                 Client.email.ilike(search_term)
             )
         )
+    return query
+
+def _warn_duplicate_phone(client):
+    """Avisa se o telefone principal já pertence a outro cliente."""
+    if not client.contact_phone_e164:
+        return
+    duplicate = Client.query.with_entities(Client.id, Client.child_name).filter(
+        client_phone_filter(client.contact_phone_e164), Client.id != client.id
+    ).first()
+    if duplicate:
+        flash(f'Atenção: o telefone {client.contact_phone} também está no cadastro de {duplicate.child_name}.', 'warning')
+
+def _redirect_to_whatsapp(client_id, message_field, missing_message):
+    """
+    Redireciona para o wa.me de um cliente usando a mensagem compilada em cache.
+    A listagem já traz esses links prontos; esta rota atende links antigos.
+    """
+    client = Client.query.get_or_404(client_id)
+    template = current_templates()[message_field]
+
+    if not template:
+        flash(missing_message, 'warning')
+        return redirect(url_for('dashboard.list_clients'))
+
+    next_service = None
+    if 'next_service_date' in template.fields:
+        next_service = next_service_dates([client.id]).get(client.id)
+    message = template.render(client_values(client, next_service))
+    return redirect(build_whatsapp_url(client.contact_phone_e164, message))
+
+# --- Rotas Principais de Clientes ---
+
+@bp.route('/clients')
+@login_required
+def list_clients():
+    """Lista todos os clientes com filtros e status de aniversário."""
+    # 1. Obter os parâmetros da URL para filtros e paginação
+    page = request.args.get('page', 1, type=int)
+    birthday_filter = request.args.get('birthday_filter')
+    search_filter = request.args.get('search', '')
+    activity_filter = request.args.get('activity')
+    sort = request.args.get('sort')
+
+    # 2. Construir a query base
+    query = _filtered_clients_query(birthday_filter, search_filter, activity_filter)
 
     # 3. Executar a query e paginar os resultados
-    clients_pagination = query.order_by(Client.child_name).paginate(
+    if sort == 'last_service':
+        # Quem está há mais tempo sem serviço primeiro; sem nenhum serviço, no fim
+        order = (Client.last_service_date.is_(None), Client.last_service_date, Client.id)
+    else:
+        order = (Client.child_name,)
+    clients_pagination = query.order_by(*order).paginate(
         page=page, per_page=15, error_out=False
     )
 
@@ -76,31 +133,57 @@ def list_clients():
             if today < birthday_this_year <= today + timedelta(days=notification_days):
                 upcoming_birthday_ids.add(client.id)
 
-    # 5. Renderizar o template com todos os dados
+    # 5. Links de WhatsApp da página, renderizados em lote (sem consulta por clique)
+    templates = compile_settings(settings)
+    whatsapp_links = client_whatsapp_links(clients_pagination.items, templates['client_whatsapp_message'])
+    birthday_clients = [client for client in clients_pagination.items if client.id in birthday_today_ids]
+    birthday_links = client_whatsapp_links(birthday_clients, templates['birthday_congrats_message'])
+
+    # 6. Renderizar o template com todos os dados
     return render_template(
         'dashboard/clients.html',
         clients_pagination=clients_pagination,
         birthday_filter_active=(birthday_filter == 'true'),
         search=search_filter,
+        activity_filter=activity_filter,
+        sort=sort,
+        inactive_months=INACTIVE_MONTHS,
         birthday_today_ids=birthday_today_ids,
         upcoming_birthday_ids=upcoming_birthday_ids,
-        birthday_status_map=birthday_status_map
+        birthday_status_map=birthday_status_map,
+        whatsapp_links=whatsapp_links,
+        birthday_links=birthday_links
     )
 
 
 @bp.route('/clients/new', methods=['GET', 'POST'])
 @login_required
 def add_client():
-    """Formulário para adicionar um novo cliente."""
-    form = ClientForm()
+    """
+    Formulário para adicionar um novo cliente. Com ?lead_id, converte o lead:
+    o formulário vem preenchido com os dados dele e o lead fica vinculado.
+    """
+    lead = None
+    lead_id = request.args.get('lead_id', type=int)
+    if lead_id:
+        lead = Lead.query.get_or_404(lead_id)
+        if lead.client_id:
+            flash('Este lead já foi convertido em cliente.', 'info')
+            return redirect(url_for('dashboard.client_history', client_id=lead.client_id))
+
+    form = ClientForm(data=client_form_data(lead) if lead and request.method == 'GET' else None)
     if form.validate_on_submit():
         new_client = Client()
         form.populate_obj(new_client) # Popula o objeto com os dados do form
         db.session.add(new_client)
+        if lead:
+            lead.client = new_client
         db.session.commit()
         flash('Cliente cadastrado com sucesso!', 'success')
-        return redirect(url_for('dashboard.list_clients'))
-    return render_template('dashboard/manage_client.html', form=form, title="Novo Cliente")
+        _warn_duplicate_phone(new_client)
+        return redirect(url_for('dashboard.leads' if lead else 'dashboard.list_clients'))
+    return render_template('dashboard/manage_client.html', form=form, lead=lead,
+                           title=f'Novo Cliente (lead de {lead.parent_name})' if lead else "Novo Cliente")
 
 @bp.route('/clients/edit/<int:client_id>', methods=['GET', 'POST'])
 @login_required
@@ -112,6 +195,7 @@ def edit_client(client_id):
         form.populate_obj(client)
         db.session.commit()
         flash('Dados do cliente atualizados com sucesso!', 'success')
+        _warn_duplicate_phone(client)
         return redirect(url_for('dashboard.list_clients'))
     return render_template('dashboard/manage_client.html', form=form, title="Editar Cliente")
 
@@ -125,6 +209,30 @@ def delete_client(client_id):
     flash('Cliente excluído com sucesso!', 'success')
     return redirect(url_for('dashboard.list_clients'))
 
+# --- Lista Diária de Aniversariantes ---
+
+@bp.route('/clients/birthdays')
+@login_required
+def birthday_digest():
+    """
+    Lista de contatos de aniversário do dia, lida do digest gerado por
+    'flask birthdays build' (links de WhatsApp já montados).
+    """
+    entries = BirthdayDigest.query.filter_by(digest_date=date.today()).order_by(
+        BirthdayDigest.days_until, BirthdayDigest.child_name
+    ).all()
+    return render_template('dashboard/birthdays.html',
+                           title="Aniversariantes",
+                           entries=entries)
+
+@bp.route('/clients/birthdays/build', methods=['POST'])
+@login_required
+def build_birthday_digest():
+    """Gera o digest do dia sob demanda (quando o agendamento ainda não rodou)."""
+    total = build_digest()
+    flash(f'Lista de aniversariantes gerada com {total} cliente(s).', 'success')
+    return redirect(url_for('dashboard.birthday_digest'))
+
 # --- Rotas de Histórico de Serviço ---
 
 @bp.route('/clients/<int:client_id>/history', methods=['GET', 'POST'])
@@ -142,13 +250,21 @@ def client_history(client_id):
         flash('Novo serviço registrado com sucesso!', 'success')
         return redirect(url_for('dashboard.client_history', client_id=client.id))
 
-    services = ClientService.query.filter_by(client_id=client.id).order_by(ClientService.service_date.desc()).all()
-    
+    # Uma página do histórico pelo índice (client_id, service_date); a contagem
+    # da paginação é feita na tabela, não no resumo do cliente, que pode divergir
+    page = request.args.get('page', 1, type=int)
+    services_pagination = ClientService.query.filter_by(client_id=client.id).order_by(
+        ClientService.service_date.desc(), ClientService.id.desc()
+    ).paginate(page=page, per_page=20, error_out=False)
+
     return render_template('dashboard/client_history.html', 
                            title=f"Histórico de {client.child_name}", 
                            client=client, 
                            form=form,
-                           services=services)
+                           services=services_pagination.items,
+                           services_pagination=services_pagination,
+                           inactive=bool(client.last_service_date and client.last_service_date < inactive_cutoff()),
+                           inactive_months=INACTIVE_MONTHS)
 
 @bp.route('/clients/history/edit/<int:service_id>', methods=['GET', 'POST'])
 @login_required
@@ -184,58 +300,57 @@ def delete_service(service_id):
 @login_required
 def send_birthday_message(client_id):
     """Prepara e redireciona para o WhatsApp com a mensagem de aniversário."""
-    client = Client.query.get_or_404(client_id)
-    settings = Settings.query.first()
-    
-    if not settings or not settings.birthday_congrats_message:
-        flash('Configure a mensagem de aniversário primeiro nas Configurações.', 'warning')
-        return redirect(url_for('dashboard.list_clients'))
-
-    message = settings.birthday_congrats_message
-    message = message.replace('[NOME_CRIANCA]', client.child_name)
-    message = message.replace('[NOME_RESPONSAVEL]', client.parent1_name)
-    
-    phone_number = ''.join(filter(str.isdigit, client.contact_phone))
-    whatsapp_url = f"https://wa.me/55{phone_number}?text={quote(message)}"
-    
-    return redirect(whatsapp_url)
+    return _redirect_to_whatsapp(client_id, 'birthday_congrats_message',
+                                 'Configure a mensagem de aniversário primeiro nas Configurações.')
 
 @bp.route('/clients/<int:client_id>/send_whatsapp')
 @login_required
 def send_client_message(client_id):
     """Prepara e redireciona para o WhatsApp com a mensagem padrão para clientes."""
-    client = Client.query.get_or_404(client_id)
-    settings = Settings.query.first()
+    return _redirect_to_whatsapp(client_id, 'client_whatsapp_message',
+                                 'Configure a mensagem de WhatsApp para clientes nas Configurações.')
 
-    if not settings or not settings.client_whatsapp_message:
-        flash('Configure a mensagem de WhatsApp para clientes nas Configurações.', 'warning')
+@bp.route('/clients/broadcast.csv')
+@login_required
+def broadcast_clients_csv():
+    """
+    Exporta um CSV (nome, telefone, mensagem, link) para ferramentas de disparo
+    em massa, com os mesmos filtros da listagem. As mensagens são renderizadas
+    em lote, mil clientes por vez, enquanto o arquivo é transmitido.
+    """
+    message_field = 'birthday_congrats_message' if request.args.get('message') == 'birthday' else 'client_whatsapp_message'
+    template = current_templates()[message_field]
+    if not template:
+        flash('Configure a mensagem de WhatsApp nas Configurações antes de exportar.', 'warning')
         return redirect(url_for('dashboard.list_clients'))
 
-    message = settings.client_whatsapp_message
-    message = message.replace('[NOME_CRIANCA]', client.child_name)
-    message = message.replace('[NOME_RESPONSAVEL]', client.parent1_name)
-    
-    phone_number = ''.join(filter(str.isdigit, client.contact_phone))
-    whatsapp_url = f"https://wa.me/55{phone_number}?text={quote(message)}"
-    
-    return redirect(whatsapp_url)
+    query = _filtered_clients_query(request.args.get('birthday_filter'), request.args.get('search', ''))
+
+    def generate_rows():
+        today = date.today()
+        for batch in iter_in_batches(query, Client):
+            next_services = {}
+            if 'next_service_date' in template.fields:
+                next_services = next_service_dates([client.id for client in batch], today)
+            messages = template.render_many(
+                client_values(client, next_services.get(client.id), today) for client in batch
+            )
+            for client, message in zip(batch, messages):
+                yield (client.child_name, client.parent1_name, client.contact_phone,
+                       message, build_whatsapp_url(client.contact_phone_e164, message))
+
+    header = ('Criança', 'Responsável', 'Telefone', 'Mensagem', 'Link WhatsApp')
+    return Response(
+        stream_with_context(broadcast_csv(header, generate_rows())),
+        mimetype='text/csv',
+        headers={"Content-Disposition": "attachment;filename=disparo_clientes.csv"}
+    )
 
 @bp.route('/clients/export')
 @login_required
 def export_clients():
-    """Exporta todos os clientes para um arquivo Excel (.xlsx)."""
-    clients = Client.query.all()
-    data = [c.to_dict() for c in clients] # Supondo um método .to_dict() no modelo Client
-    df = pd.DataFrame(data)
-
-    output = BytesIO()
-    writer = pd.ExcelWriter(output, engine='openpyxl')
-    df.to_excel(writer, index=False, sheet_name='Clientes')
-    writer.close() # pd.__version__ < 1.4: writer.save()
-    output.seek(0)
-
-    return Response(
-        output,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment;filename=clientes.xlsx"}
-    )
\ No newline at end of file
+    """
+    A planilha de clientes é gerada em segundo plano pela central de
+    exportações (app/exports.py); este atalho abre o pedido já preenchido.
+    """
+    return redirect(url_for('dashboard.list_exports', kind='clients', format='xlsx'))
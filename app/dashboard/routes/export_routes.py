@@ -0,0 +1,83 @@
+# app/dashboard/routes/export_routes.py
+
+# --- Imports Essenciais ---
+import os
+from flask import render_template, flash, redirect, url_for, request, send_file, abort, jsonify
+from flask_login import login_required, current_user
+
+# --- Imports do Projeto ---
+from app.dashboard import bp
+from app.extensions import db
+from app.models import Export
+from app.forms import ExportForm
+from app.exports import EXPORT_KINDS, FORMATS, enqueue_export, delete_export, download_name, export_folder, retention_hours
+
+
+# --- Rotas da Central de Exportações ---
+
+@bp.route('/exports', methods=['GET', 'POST'])
+@login_required
+def list_exports():
+    """
+    Pede uma nova exportação (gerada pelo 'flask worker') e lista as
+    recentes com o progresso e o link para baixar.
+    """
+    form = ExportForm()
+    if form.validate_on_submit():
+        filters = {
+            'date_from': form.date_from.data.isoformat() if form.date_from.data else None,
+            'date_to': form.date_to.data.isoformat() if form.date_to.data else None,
+        }
+        if form.kind.data == 'leads':
+            filters['status'] = form.status.data or None
+        if form.kind.data == 'posts':
+            filters['published'] = form.published.data or None
+        enqueue_export(form.kind.data, form.format.data, {key: value for key, value in filters.items() if value},
+                       current_user)
+        db.session.commit()
+        flash('Exportação na fila. O arquivo aparece abaixo quando estiver pronto.', 'success')
+        return redirect(url_for('dashboard.list_exports'))
+
+    # Atalhos das outras telas (ex: ?kind=leads&status=Novo) pré-preenchem o formulário
+    if request.method == 'GET':
+        for field in ('kind', 'format', 'status', 'published'):
+            if request.args.get(field):
+                form[field].data = request.args[field]
+
+    exports = Export.query.order_by(Export.created_at.desc(), Export.id.desc()).limit(30).all()
+    return render_template('dashboard/exports.html', form=form, exports=exports, kinds=EXPORT_KINDS,
+                           formats=FORMATS, retention_hours=retention_hours(), title="Exportações")
+
+
+@bp.route('/exports/progress')
+@login_required
+def exports_progress():
+    """Situação das exportações informadas (?ids=1,2), consultada pela página enquanto há arquivos em geração."""
+    ids = [int(value) for value in request.args.get('ids', '').split(',') if value.isdigit()]
+    exports = Export.query.filter(Export.id.in_(ids)).all() if ids else []
+    return jsonify({export.id: {'status': export.status, 'progress': export.progress,
+                                'rows_done': export.rows_done, 'rows_total': export.rows_total}
+                    for export in exports})
+
+
+@bp.route('/exports/<int:export_id>/download')
+@login_required
+def download_export(export_id):
+    """Baixa o arquivo de uma exportação pronta."""
+    export = Export.query.get_or_404(export_id)
+    path = export.filename and os.path.join(export_folder(), export.filename)
+    if not path or not os.path.isfile(path):
+        abort(404)
+    return send_file(path, mimetype=FORMATS[export.format][2], as_attachment=True,
+                     download_name=download_name(export), max_age=0)
+
+
+@bp.route('/exports/<int:export_id>/delete', methods=['POST'])
+@login_required
+def delete_export_route(export_id):
+    """Exclui a exportação e o arquivo gerado."""
+    export = Export.query.get_or_404(export_id)
+    delete_export(export)
+    db.session.commit()
+    flash('Exportação excluída.', 'success')
+    return redirect(url_for('dashboard.list_exports'))
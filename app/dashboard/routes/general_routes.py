@@ -1,16 +1,16 @@
 # app/dashboard/routes/general_routes.py
 
 # --- Imports Essenciais ---
-from datetime import date, timedelta
-from flask import render_template, flash, redirect, url_for
+from flask import render_template, flash, redirect, url_for, current_app, Response
 from flask_login import login_required
-from sqlalchemy import func, extract, or_
 
 # --- Imports do Projeto ---
 from app.dashboard import bp
-from app.extensions import db
-from app.models import Post, Category, LandingPage, Lead, Client, Settings, Popup
+from app.extensions import db, request_metrics
+from app.models import Category, LandingPage, Settings, Popup
 from app.forms import SettingsForm
+from app.stats import read_keys, lead_funnel, count_upcoming_birthdays
+from app.dashboard.routes.user_routes import admin_required
 
 # --- ROTAS GERAIS DO DASHBOARD ---
 
@@ -18,41 +18,26 @@ from app.forms import SettingsForm
 @login_required
 def index():
     """Página principal do dashboard com estatísticas do sistema."""
+    connection = db.session.connection()
+    counters = read_keys(connection, [
+        'post:total', 'post:published', 'landing_page:total', 'client:total'
+    ])
+
     # Stats de Conteúdo
-    total_posts = Post.query.count()
-    posts_publicados = Post.query.filter_by(is_published=True).count()
+    total_posts = counters['post:total']
+    posts_publicados = counters['post:published']
     total_categories = Category.query.count()
-    total_landing_pages = LandingPage.query.count()
-
-    # Stats de Leads
-    total_leads = Lead.query.count()
-    leads_by_status = {
-        status: count for status, count in db.session.query(
-            Lead.status, func.count(Lead.id)
-        ).group_by(Lead.status).all()
-    }
+    total_landing_pages = counters['landing_page:total']
+
+    # Stats de Leads (lidos dos contadores do funil, sem GROUP BY)
+    leads_by_status = lead_funnel(connection)
+    total_leads = sum(leads_by_status.values())
 
     # Stats de Clientes e Aniversários
-    total_clients = Client.query.count()
+    total_clients = counters['client:total']
     settings = Settings.query.first()
     notification_days = settings.birthday_notification_days if settings else 30
-    today = date.today()
-    end_date = today + timedelta(days=notification_days)
-    
-    today_ordinal = today.timetuple().tm_yday
-    end_date_ordinal = end_date.timetuple().tm_yday
-    birthday_ordinal = extract('doy', Client.child_date_of_birth)
-
-    if today_ordinal <= end_date_ordinal:
-        # Intervalo não cruza a virada do ano
-        upcoming_birthdays_count = Client.query.filter(
-            birthday_ordinal.between(today_ordinal, end_date_ordinal)
-        ).count()
-    else:
-        # Intervalo cruza a virada do ano (ex: Dezembro-Janeiro)
-        upcoming_birthdays_count = Client.query.filter(
-            or_(birthday_ordinal >= today_ordinal, birthday_ordinal <= end_date_ordinal)
-        ).count()
+    upcoming_birthdays_count = count_upcoming_birthdays(connection, notification_days)
 
     # Dicionário final de estatísticas para o template
     stats = {
@@ -106,4 +91,14 @@ def inject_global_variables():
         )
     except Exception as e:
         print(f"Erro ao injetar variáveis globais: {e}")
-        return dict(nav_landing_pages=[], site_settings=None, active_popup=None)
\ No newline at end of file
+        return dict(nav_landing_pages=[], site_settings=None, active_popup=None)
+
+
+@bp.route('/metrics')
+@login_required
+@admin_required
+def metrics():
+    """Histogramas de desempenho por endpoint, no formato texto do Prometheus."""
+    prefix = current_app.config.get('INSTRUMENTATION_METRIC_PREFIX', 'planeta_')
+    return Response(request_metrics.prometheus_text(prefix),
+                    mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -3,54 +3,99 @@
 # --- Imports Essenciais ---
 import os
 from flask import render_template, flash, redirect, url_for, request
-from flask_login import login_required
+from markupsafe import Markup
+from flask_login import login_required, current_user
+from sqlalchemy import select
 
 # --- Imports do Projeto ---
 from app.dashboard import bp
 from app.extensions import db
-from app.models import HomePageContent, StructureImage, StructureVideo
+from app.models import HomePageContent, HomePageRelease, StructureImage, StructureVideo, Post, User
 from app.forms import (
     HeroSectionForm, ServicesSectionForm, ValuesSectionForm,
     StructureSectionForm, VideosSectionForm, BlogSectionForm,
-    CtaSectionForm, LocationSectionForm, SectionOrderForm
+    CtaSectionForm, LocationSectionForm, SectionOrderForm, PublishHomepageForm
 )
 # --- IMPORTAÇÃO CENTRALIZADA DAS FUNÇÕES DE UPLOAD ---
-from app.utils import save_picture, save_video, delete_file_from_uploads
+from app.utils import save_video, delete_file_from_uploads
+from app.media import ingest_uploads
+from app.homepage import (
+    load_sections, get_section, form_data, apply_form_data, snapshot_sections, draft_gallery,
+    visible_order, render_sections, publish, rollback, pending_changes
+)
 
+# Lembrete nas mensagens de sucesso: o dashboard grava só o rascunho
+DRAFT_NOTE = ' Publique para exibir no site.'
 
-# --- ROTA PRINCIPAL PARA EXIBIR A PÁGINA DE GERENCIAMENTO ---
 
-@bp.route('/homepage', methods=['GET'])
-@login_required
-def edit_homepage():
-    """
-    Exibe a página de gerenciamento da homepage, carregando todos os formulários.
-    """
-    content = HomePageContent.query.first_or_404()
-    
+# Formulário de cada seção (documento em HomePageSection, ver app/homepage.py)
+SECTION_FORMS = {
+    'hero': HeroSectionForm,
+    'services': ServicesSectionForm,
+    'values': ValuesSectionForm,
+    'structure': StructureSectionForm,
+    'videos': VideosSectionForm,
+    'blog': BlogSectionForm,
+    'cta': CtaSectionForm,
+    'location': LocationSectionForm,
+}
+
+
+def _render_manage_homepage(content, **form_overrides):
+    """Monta a página de gerenciamento; 'form_overrides' troca formulários (ex: com erros)."""
+    sections = load_sections()
+
     # Instancia todos os formulários com os dados atuais do banco
-    forms = {
-        'order': SectionOrderForm(),
-        'hero': HeroSectionForm(obj=content),
-        'services': ServicesSectionForm(obj=content),
-        'values': ValuesSectionForm(obj=content),
-        'structure': StructureSectionForm(obj=content),
-        'videos': VideosSectionForm(obj=content),
-        'blog': BlogSectionForm(obj=content),
-        'cta': CtaSectionForm(obj=content),
-        'location': LocationSectionForm(obj=content)
-    }
+    forms = {'order': SectionOrderForm()}
+    for name, form_class in SECTION_FORMS.items():
+        forms[name] = form_overrides.get(name) or form_class(data=form_data(sections[name]))
+
+    forms['publish'] = PublishHomepageForm()
 
     ordered_sections_admin = content.section_order.split(',') if content.section_order else []
-    
+    current_videos = (sections['videos'].data.get('videos') or []) + [None] * 3
+
+    # Histórico sem os documentos/HTML (colunas JSON grandes)
+    releases = db.session.execute(
+        select(HomePageRelease.id, HomePageRelease.note, HomePageRelease.created_at, User.username)
+        .outerjoin(User, HomePageRelease.published_by_id == User.id)
+        .order_by(HomePageRelease.id.desc())
+    ).all()
+
     return render_template(
         'dashboard/manage_homepage.html',
         title="Editar Página Inicial",
         content=content,
         forms=forms,
-        ordered_sections_admin=ordered_sections_admin
+        current_videos=current_videos[:3],
+        ordered_sections_admin=ordered_sections_admin,
+        releases=releases,
+        pending_changes=pending_changes(content, sections, content.live_release)
     )
 
+
+def _update_section(name, success_message):
+    """Valida o formulário da seção e grava no documento dela."""
+    section = get_section(name)
+    form = SECTION_FORMS[name]()
+    if form.validate_on_submit():
+        apply_form_data(section, form.data)
+        db.session.commit()
+        flash(success_message + DRAFT_NOTE, 'success')
+    return redirect(url_for('dashboard.edit_homepage'))
+
+
+# --- ROTA PRINCIPAL PARA EXIBIR A PÁGINA DE GERENCIAMENTO ---
+
+@bp.route('/homepage', methods=['GET'])
+@login_required
+def edit_homepage():
+    """
+    Exibe a página de gerenciamento da homepage, carregando todos os formulários.
+    """
+    content = HomePageContent.query.first_or_404()
+    return _render_manage_homepage(content)
+
 # --- ROTAS DE 'POST' PARA SALVAR CADA SEÇÃO INDIVIDUALMENTE ---
 
 @bp.route('/homepage/order', methods=['POST'])
@@ -62,41 +107,23 @@ def update_homepage_order():
     if new_order:
         content.section_order = new_order
         db.session.commit()
-        flash('Ordem das seções atualizada com sucesso!', 'success')
+        flash('Ordem das seções atualizada com sucesso!' + DRAFT_NOTE, 'success')
     return redirect(url_for('dashboard.edit_homepage'))
 
 @bp.route('/homepage/hero', methods=['POST'])
 @login_required
 def update_hero_section():
-    content = HomePageContent.query.first_or_404()
-    form = HeroSectionForm()
-    if form.validate_on_submit():
-        form.populate_obj(content)
-        db.session.commit()
-        flash('Seção "Topo da Página" atualizada com sucesso!', 'success')
-    return redirect(url_for('dashboard.edit_homepage'))
+    return _update_section('hero', 'Seção "Topo da Página" atualizada com sucesso!')
 
 @bp.route('/homepage/services', methods=['POST'])
 @login_required
 def update_services_section():
-    content = HomePageContent.query.first_or_404()
-    form = ServicesSectionForm()
-    if form.validate_on_submit():
-        form.populate_obj(content)
-        db.session.commit()
-        flash('Seção "O que oferecemos" atualizada com sucesso!', 'success')
-    return redirect(url_for('dashboard.edit_homepage'))
+    return _update_section('services', 'Seção "O que oferecemos" atualizada com sucesso!')
 
 @bp.route('/homepage/values', methods=['POST'])
 @login_required
 def update_values_section():
-    content = HomePageContent.query.first_or_404()
-    form = ValuesSectionForm()
-    if form.validate_on_submit():
-        form.populate_obj(content)
-        db.session.commit()
-        flash('Seção "Por que nos escolher" atualizada com sucesso!', 'success')
-    return redirect(url_for('dashboard.edit_homepage'))
+    return _update_section('values', 'Seção "Por que nos escolher" atualizada com sucesso!')
 
 @bp.route('/homepage/structure', methods=['POST'])
 @login_required
@@ -105,81 +132,55 @@ def update_structure_section():
     Processa o formulário da seção 'Infraestrutura'.
     """
     content = HomePageContent.query.first_or_404()
+    section = get_section('structure')
     form = StructureSectionForm()
 
     if form.validate_on_submit():
         # Atualiza campos de texto e booleanos
-        content.show_structure_section = form.show_structure_section.data
-        content.structure_section_tagline = form.structure_section_tagline.data
-        content.structure_section_title = form.structure_section_title.data
-        content.structure_section_subtitle = form.structure_section_subtitle.data
-        content.structure_feature1_title = form.structure_feature1_title.data
-        content.structure_feature1_text = form.structure_feature1_text.data
-        content.structure_feature2_title = form.structure_feature2_title.data
-        content.structure_feature2_text = form.structure_feature2_text.data
-
-        # Processa as novas imagens da galeria
-        if form.gallery_images.data:
-            for image_file in form.gallery_images.data:
-                if image_file:
-                    filename = save_picture(image_file)
-                    caption = os.path.splitext(image_file.filename)[0].replace('_', ' ').title()
-                    new_image = StructureImage(filename=filename, caption=caption, homepage_content_id=content.id)
-                    db.session.add(new_image)
-        
-        db.session.add(content)
+        apply_form_data(section, form.data)
+
+        # Processa as novas imagens da galeria (legenda a partir do nome do arquivo)
+        ingest_uploads(
+            form.gallery_images.data, StructureImage, homepage_content_id=content.id,
+            caption=lambda image_file: os.path.splitext(image_file.filename)[0].replace('_', ' ').title(),
+        )
+
         db.session.commit()
-        flash('Seção "Infraestrutura" atualizada com sucesso!', 'success')
+        flash('Seção "Infraestrutura" atualizada com sucesso!' + DRAFT_NOTE, 'success')
         return redirect(url_for('dashboard.edit_homepage'))
     
     else:
         # Em caso de falha na validação, recarrega a página com os erros
         flash('Erro de validação na Seção Infraestrutura. Verifique os campos.', 'danger')
-        forms = {
-            'order': SectionOrderForm(),
-            'hero': HeroSectionForm(obj=content),
-            'services': ServicesSectionForm(obj=content),
-            'values': ValuesSectionForm(obj=content),
-            'structure': form,  # Usa o formulário com erros
-            'videos': VideosSectionForm(obj=content),
-            'blog': BlogSectionForm(obj=content),
-            'cta': CtaSectionForm(obj=content),
-            'location': LocationSectionForm(obj=content)
-        }
-        ordered_sections_admin = content.section_order.split(',') if content.section_order else []
-        return render_template(
-            'dashboard/manage_homepage.html',
-            title="Editar Página Inicial",
-            content=content,
-            forms=forms,
-            ordered_sections_admin=ordered_sections_admin
-        )
+        return _render_manage_homepage(content, structure=form)  # Usa o formulário com erros
 
 @bp.route('/homepage/videos', methods=['POST'])
 @login_required
 def update_videos_section():
-    content = HomePageContent.query.first_or_404()
+    section = get_section('videos')
     form = VideosSectionForm()
     if form.validate_on_submit():
-        content.show_videos_section = form.show_videos_section.data
-        content.videos_section_title = form.videos_section_title.data
-        
-        # Processa os arquivos de vídeo
+        videos = list(section.data.get('videos') or [])
+        videos.extend([None] * (3 - len(videos)))
+
+        # Processa os arquivos de vídeo. O arquivo antigo não é apagado: pode
+        # estar na versão publicada (o 'flask media gc' recolhe os órfãos)
         for i in range(1, 4):
             video_field = getattr(form, f'videos_section_video{i}')
             remove_field = getattr(form, f'remove_videos_section_video{i}')
-            content_attr = f'videos_section_video{i}'
             
             if video_field.data:
-                delete_file_from_uploads(getattr(content, content_attr))
-                setattr(content, content_attr, save_video(video_field.data))
+                videos[i - 1] = save_video(video_field.data)
             elif remove_field.data:
-                delete_file_from_uploads(getattr(content, content_attr))
-                setattr(content, content_attr, None)
+                videos[i - 1] = None
 
-        db.session.add(content)
+        apply_form_data(section, {
+            'show_videos_section': form.show_videos_section.data,
+            'videos_section_title': form.videos_section_title.data,
+            **{f'videos_section_video{i}': filename for i, filename in enumerate(videos[:3], start=1)},
+        })
         db.session.commit()
-        flash('Seção "Nossos Vídeos" atualizada com sucesso!', 'success')
+        flash('Seção "Nossos Vídeos" atualizada com sucesso!' + DRAFT_NOTE, 'success')
     else:
         flash('Erro de validação na Seção Nossos Vídeos. Verifique os campos.', 'danger')
 
@@ -188,34 +189,58 @@ def update_videos_section():
 @bp.route('/homepage/blog', methods=['POST'])
 @login_required
 def update_blog_section():
-    content = HomePageContent.query.first_or_404()
-    form = BlogSectionForm()
-    if form.validate_on_submit():
-        form.populate_obj(content)
-        db.session.commit()
-        flash('Seção "Blog" atualizada com sucesso!', 'success')
-    return redirect(url_for('dashboard.edit_homepage'))
+    return _update_section('blog', 'Seção "Blog" atualizada com sucesso!')
 
 @bp.route('/homepage/cta', methods=['POST'])
 @login_required
 def update_cta_section():
-    content = HomePageContent.query.first_or_404()
-    form = CtaSectionForm()
-    if form.validate_on_submit():
-        form.populate_obj(content)
-        db.session.commit()
-        flash('Seção "CTA Final" atualizada com sucesso!', 'success')
-    return redirect(url_for('dashboard.edit_homepage'))
+    return _update_section('cta', 'Seção "CTA Final" atualizada com sucesso!')
 
 @bp.route('/homepage/location', methods=['POST'])
 @login_required
 def update_location_section():
+    return _update_section('location', 'Seção "Localização" atualizada com sucesso!')
+
+
+# --- PUBLICAÇÃO ---
+
+@bp.route('/homepage/preview', methods=['GET'])
+@login_required
+def preview_homepage():
+    """Mostra o rascunho como ficaria no site, sem publicar."""
+    content = HomePageContent.query.first_or_404()
+    sections = snapshot_sections(load_sections())
+    order = visible_order(content.section_order, sections)
+    latest_posts = Post.query.filter_by(is_published=True).order_by(Post.created_at.desc()).limit(3).all()
+    rendered = render_sections(order, sections, draft_gallery(content), latest_posts=latest_posts)
+    return render_template(
+        'public/index.html',
+        section_html=lambda name: Markup(rendered[name]),
+        ordered_sections=order
+    )
+
+@bp.route('/homepage/publish', methods=['POST'])
+@login_required
+def publish_homepage():
+    """Publica o rascunho: a nova versão entra no ar já renderizada."""
     content = HomePageContent.query.first_or_404()
-    form = LocationSectionForm()
+    form = PublishHomepageForm()
     if form.validate_on_submit():
-        form.populate_obj(content)
-        db.session.commit()
-        flash('Seção "Localização" atualizada com sucesso!', 'success')
+        release = publish(content, user=current_user, note=form.note.data or None)
+        flash(f'Página inicial publicada (versão #{release.id}).', 'success')
+    else:
+        flash('Não foi possível publicar. Tente novamente.', 'danger')
+    return redirect(url_for('dashboard.edit_homepage'))
+
+@bp.route('/homepage/rollback/<int:release_id>', methods=['POST'])
+@login_required
+def rollback_homepage(release_id):
+    """Coloca no ar uma versão publicada anteriormente."""
+    content = HomePageContent.query.first_or_404()
+    release = HomePageRelease.query.get_or_404(release_id)
+    if PublishHomepageForm().validate_on_submit():
+        rollback(content, release)
+        flash(f'A versão #{release.id} voltou a ser exibida no site.', 'success')
     return redirect(url_for('dashboard.edit_homepage'))
 
 
@@ -225,10 +250,10 @@ def update_location_section():
 @login_required
 def delete_structure_image(image_id):
     image = StructureImage.query.get_or_404(image_id)
-    delete_file_from_uploads(image.filename)
+    # O arquivo fica para as versões publicadas; o 'flask media gc' recolhe depois
     db.session.delete(image)
     db.session.commit()
-    flash('Imagem da galeria foi excluída.', 'success')
+    flash('Imagem da galeria foi excluída.' + DRAFT_NOTE, 'success')
     return redirect(url_for('dashboard.edit_homepage'))
 
 @bp.route('/homepage/video/delete/<int:video_id>', methods=['POST'])
@@ -0,0 +1,51 @@
+# app/dashboard/routes/job_routes.py
+
+# --- Imports Essenciais ---
+from datetime import datetime, timedelta
+from flask import render_template, flash, redirect, url_for, request
+from flask_login import login_required
+
+# --- Imports do Projeto ---
+from app.dashboard import bp
+from app.dashboard.routes.user_routes import admin_required
+from app.extensions import db
+from app.models import Job
+from app.jobs import STATUSES, FAILED, status_counts, oldest_ready_at, retry
+
+# Tarefa pronta há mais tempo que isso indica que nenhum 'flask worker' está rodando
+WORKER_ALERT_AFTER = timedelta(minutes=5)
+
+
+# --- Rotas da Fila de Tarefas ---
+
+@bp.route('/jobs')
+@login_required
+@admin_required
+def list_jobs():
+    """Situação da fila de tarefas em segundo plano."""
+    status = request.args.get('status')
+    query = Job.query
+    if status in STATUSES:
+        query = query.filter_by(status=status)
+    jobs = query.order_by(Job.created_at.desc(), Job.id.desc()).limit(50).all()
+
+    oldest = oldest_ready_at()
+    worker_idle = oldest is not None and datetime.utcnow() - oldest > WORKER_ALERT_AFTER
+    return render_template('dashboard/jobs.html', jobs=jobs, counts=status_counts(), status=status,
+                           statuses=STATUSES, worker_idle=worker_idle, oldest=oldest,
+                           title="Tarefas em Segundo Plano")
+
+
+@bp.route('/jobs/<int:job_id>/retry', methods=['POST'])
+@login_required
+@admin_required
+def retry_job(job_id):
+    """Coloca de volta na fila uma tarefa que falhou."""
+    job = Job.query.get_or_404(job_id)
+    if job.status != FAILED:
+        flash('Só tarefas com falha podem ser reenviadas.', 'warning')
+    else:
+        retry(job)
+        db.session.commit()
+        flash(f'Tarefa #{job.id} colocada de volta na fila.', 'success')
+    return redirect(url_for('dashboard.list_jobs', status=request.args.get('status')))
@@ -11,6 +11,7 @@ from app.dashboard import bp
 from app.extensions import db
 from app.models import LandingPage
 from app.forms import LandingPageForm
+from app.analytics import report, LANDING_PAGE_VIEW, REPORT_DAYS
 # --- IMPORTAÇÃO CENTRALIZADA DAS FUNÇÕES DE UPLOAD ---
 from app.utils import save_picture, delete_file_from_uploads
 
@@ -25,8 +26,10 @@ def list_landing_pages():
     landing_pages_pagination = LandingPage.query.order_by(LandingPage.created_at.desc()).paginate(
         page=page, per_page=10, error_out=False
     )
+    analytics = report((LANDING_PAGE_VIEW,), [lp.id for lp in landing_pages_pagination.items])
     return render_template('dashboard/list_landing_pages.html',
                            landing_pages_pagination=landing_pages_pagination,
+                           analytics=analytics, report_days=REPORT_DAYS,
                            title="Landing Pages")
 
 @bp.route('/landingpages/new', methods=['GET', 'POST'])
@@ -1,33 +1,36 @@
 # app/dashboard/routes/leads_routes.py
 
 # --- Imports Essenciais ---
-from urllib.parse import quote
-from flask import render_template, flash, redirect, url_for, request
+from flask import render_template, flash, redirect, url_for, request, jsonify, Response, stream_with_context
 from flask_login import login_required
 from sqlalchemy import or_
 
 # --- Imports do Projeto ---
 from app.dashboard import bp
 from app.extensions import db
-from app.models import Lead, Settings
+from app.models import Lead, Client, LEAD_STATUSES
+from app.stats import apply_deltas, lead_funnel, lead_status_key
+from app.reports import bump_table_versions
+from app.messages import current_templates, lead_values, lead_whatsapp_links, iter_in_batches, broadcast_csv
+from app.matching import matches_for
+from app.phones import search_phone
+from app.utils import build_whatsapp_url
 
-# --- Rotas de Gerenciamento de Leads ---
 
-@bp.route('/leads')
-@login_required
-def leads():
-    """
-    Exibe uma lista paginada e filtrável de todos os leads capturados.
-    """
-    page = request.args.get('page', 1, type=int)
-    status_filter = request.args.get('status', '', type=str)
-    search_filter = request.args.get('search', '', type=str)
+# --- Funções Auxiliares ---
 
+def _filtered_leads_query(status_filter, search_filter):
+    """Aplica os filtros da listagem de leads (status e busca por nome)."""
     query = Lead.query
 
     if status_filter:
         query = query.filter(Lead.status == status_filter)
     
+    # Busca por telefone: igualdade exata na coluna E.164 indexada
+    phone = search_phone(search_filter)
+    if phone:
+        return query.filter(Lead.whatsapp_e164 == phone)
+
     if search_filter:
         search_term = f'%{search_filter}%'
         # Procura no nome do responsável OU no nome da criança
@@ -37,20 +40,72 @@ def leads():
                 Lead.child_name.ilike(search_term)
             )
         )
+    return query
+
+def _set_leads_status(lead_ids, new_status):
+    """
+    Altera o status de vários leads com um único UPDATE ... WHERE id IN (...)
+    e ajusta os contadores do funil na mesma transação.
+    Retorna a quantidade de leads efetivamente alterados.
+    """
+    rows = db.session.query(Lead.id, Lead.status).filter(
+        Lead.id.in_(lead_ids), Lead.status != new_status
+    ).with_for_update().all()
+    if not rows:
+        return 0
+
+    changed_ids = [lead_id for lead_id, _ in rows]
+    Lead.query.filter(Lead.id.in_(changed_ids)).update(
+        {Lead.status: new_status}, synchronize_session=False
+    )
+
+    # O UPDATE em massa não passa pelos eventos da sessão, então os
+    # contadores do funil (e a versão dos relatórios) são ajustados aqui.
+    deltas = {lead_status_key(new_status): len(rows)}
+    for _, old_status in rows:
+        key = lead_status_key(old_status)
+        deltas[key] = deltas.get(key, 0) - 1
+    apply_deltas(db.session.connection(), deltas)
+    bump_table_versions(db.session.connection(), 'lead')
+
+    db.session.commit()
+    return len(rows)
+
+# --- Rotas de Gerenciamento de Leads ---
+
+@bp.route('/leads')
+@login_required
+def leads():
+    """
+    Exibe uma lista paginada e filtrável de todos os leads capturados.
+    """
+    page = request.args.get('page', 1, type=int)
+    status_filter = request.args.get('status', '', type=str)
+    search_filter = request.args.get('search', '', type=str)
+
+    query = _filtered_leads_query(status_filter, search_filter)
     
     leads_pagination = query.order_by(Lead.created_at.desc()).paginate(
         page=page, per_page=15, error_out=False
     )
     
-    # Lista de status para popular o dropdown de filtro no template
-    all_statuses = ['Novo', 'Contactado', 'Não Atendeu', 'Reagendar', 'Descartado']
-    
     filters = {'status': status_filter, 'search': search_filter}
 
+    # Links de WhatsApp da página, renderizados em lote com a mensagem em cache
+    whatsapp_links = lead_whatsapp_links(
+        leads_pagination.items, current_templates()['lead_whatsapp_message']
+    )
+
+    # Leads não vinculados que parecem ser clientes (telefone, e-mail ou nomes)
+    lead_matches = matches_for(leads_pagination.items)
+
     return render_template(
         'dashboard/leads.html', 
         leads_pagination=leads_pagination,
-        all_statuses=all_statuses,
+        whatsapp_links=whatsapp_links,
+        lead_matches=lead_matches,
+        all_statuses=LEAD_STATUSES,
+        funnel=lead_funnel(db.session.connection()),
         filters=filters,
         title="Dashboard de Leads"
     )
@@ -63,30 +118,111 @@ def update_lead_status(lead_id):
     """
     lead = Lead.query.get_or_404(lead_id)
     new_status = request.form.get('status')
-    valid_statuses = ['Novo', 'Contactado', 'Não Atendeu', 'Reagendar', 'Descartado']
     
-    if new_status and new_status in valid_statuses:
-        lead.status = new_status
-        db.session.commit()
+    if new_status in LEAD_STATUSES:
+        _set_leads_status([lead.id], new_status)
         flash(f'Status do lead "{lead.parent_name}" atualizado para "{new_status}".', 'success')
     else:
         flash('Status inválido selecionado.', 'danger')
         
-    return redirect(url_for('dashboard.leads'))
+    return redirect(url_for('dashboard.leads', **request.args))
+
+@bp.route('/leads/bulk_status', methods=['POST'])
+@login_required
+def bulk_update_lead_status():
+    """
+    Atualiza o status de todos os leads selecionados na listagem de uma só vez.
+    Os filtros e a página atual são preservados no redirecionamento.
+    """
+    lead_ids = request.form.getlist('lead_ids', type=int)
+    new_status = request.form.get('status')
+
+    if new_status not in LEAD_STATUSES:
+        flash('Status inválido selecionado.', 'danger')
+    elif not lead_ids:
+        flash('Selecione pelo menos um lead.', 'warning')
+    else:
+        updated = _set_leads_status(lead_ids, new_status)
+        flash(f'{updated} lead(s) atualizado(s) para "{new_status}".', 'success')
+
+    return redirect(url_for('dashboard.leads', **request.args))
+
+@bp.route('/leads/status', methods=['PATCH'])
+@login_required
+def patch_leads_status():
+    """
+    API JSON para alteração de status sem recarregar a página.
+    Corpo esperado: {"lead_ids": [1, 2, ...], "status": "Contactado"}
+    """
+    payload = request.get_json(silent=True) or {}
+    new_status = payload.get('status')
+    lead_ids = payload.get('lead_ids') or []
+
+    if new_status not in LEAD_STATUSES:
+        return jsonify(error='Status inválido.'), 400
+    try:
+        lead_ids = [int(lead_id) for lead_id in lead_ids]
+    except (TypeError, ValueError):
+        return jsonify(error='IDs de leads inválidos.'), 400
+    if not lead_ids:
+        return jsonify(error='Nenhum lead informado.'), 400
+
+    updated = _set_leads_status(lead_ids, new_status)
+    return jsonify(
+        updated=updated,
+        status=new_status,
+        funnel=lead_funnel(db.session.connection())
+    )
+
+@bp.route('/leads/<int:lead_id>/link', methods=['POST'])
+@login_required
+def link_lead_client(lead_id):
+    """Vincula o lead a um cliente já cadastrado (sugestão da listagem)."""
+    lead = Lead.query.get_or_404(lead_id)
+    client = Client.query.get_or_404(request.form.get('client_id', type=int))
+    lead.client = client
+    db.session.commit()
+    flash(f'Lead "{lead.parent_name}" vinculado ao cliente "{client.child_name}".', 'success')
+    return redirect(url_for('dashboard.leads', **request.args))
 
 @bp.route('/leads/<int:lead_id>/send_whatsapp')
 @login_required
 def send_lead_message(lead_id):
     """Prepara e redireciona para o WhatsApp com a mensagem padrão para leads."""
     lead = Lead.query.get_or_404(lead_id)
-    settings = Settings.query.first()
+    template = current_templates()['lead_whatsapp_message']
 
-    if not settings or not settings.lead_whatsapp_message:
+    if not template:
         flash('Configure a mensagem de WhatsApp para leads primeiro nas Configurações.', 'warning')
         return redirect(url_for('dashboard.leads'))
 
-    message = settings.lead_whatsapp_message.replace('[NOME_LEAD]', lead.parent_name)
-    phone_number = ''.join(filter(str.isdigit, lead.whatsapp))
-    whatsapp_url = f"https://wa.me/55{phone_number}?text={quote(message)}"
-    
-    return redirect(whatsapp_url)
\ No newline at end of file
+    message = template.render(lead_values(lead))
+    return redirect(build_whatsapp_url(lead.whatsapp_e164, message))
+
+@bp.route('/leads/broadcast.csv')
+@login_required
+def broadcast_leads_csv():
+    """
+    Exporta um CSV com a mensagem e o link de WhatsApp de cada lead filtrado,
+    para uso em ferramentas de disparo em massa.
+    """
+    template = current_templates()['lead_whatsapp_message']
+    if not template:
+        flash('Configure a mensagem de WhatsApp para leads primeiro nas Configurações.', 'warning')
+        return redirect(url_for('dashboard.leads'))
+
+    query = _filtered_leads_query(request.args.get('status', ''), request.args.get('search', ''))
+
+    def generate_rows():
+        for batch in iter_in_batches(query, Lead):
+            messages = template.render_many(lead_values(lead) for lead in batch)
+            for lead, message in zip(batch, messages):
+                yield (lead.parent_name, lead.whatsapp, lead.status,
+                       message, build_whatsapp_url(lead.whatsapp_e164, message))
+
+    header = ('Responsável', 'WhatsApp', 'Status', 'Mensagem', 'Link WhatsApp')
+    return Response(
+        stream_with_context(broadcast_csv(header, generate_rows())),
+        mimetype='text/csv',
+        headers={"Content-Disposition": "attachment;filename=disparo_leads.csv"}
+    )
@@ -9,6 +9,7 @@ from app.dashboard import bp
 from app.extensions import db
 from app.models import Popup
 from app.forms import PopupForm
+from app.analytics import report, POPUP_IMPRESSION, POPUP_CLICK, REPORT_DAYS
 # --- IMPORTAÇÃO CENTRALIZADA DAS FUNÇÕES DE UPLOAD ---
 from app.utils import save_picture, delete_file_from_uploads
 
@@ -20,7 +21,9 @@ from app.utils import save_picture, delete_file_from_uploads
 def list_popups():
     """Lista todos os popups criados."""
     popups = Popup.query.order_by(Popup.created_at.desc()).all()
-    return render_template('dashboard/popups.html', popups=popups, title="Gerenciar Popups")
+    analytics = report((POPUP_IMPRESSION, POPUP_CLICK), [popup.id for popup in popups])
+    return render_template('dashboard/popups.html', popups=popups, analytics=analytics,
+                           report_days=REPORT_DAYS, title="Gerenciar Popups")
 
 @bp.route('/popups/new', methods=['GET', 'POST'])
 @login_required
@@ -13,6 +13,7 @@ from app.models import Post, Category, Image, Video
 from app.forms import PostForm, CategoryForm
 # --- IMPORTAÇÃO CENTRALIZADA DAS FUNÇÕES DE UPLOAD ---
 from app.utils import save_picture, save_video, delete_file_from_uploads
+from app.media import ingest_uploads
 
 
 # --- ROTAS DE GERENCIAMENTO DE POSTS ---
@@ -72,20 +73,11 @@ def add_post():
             video_filename=video_filename
         )
         db.session.add(new_post)
-        
-        # Adiciona imagens da galeria
-        if form.gallery_images.data:
-            for image_file in form.gallery_images.data:
-                if isinstance(image_file, FileStorage):
-                    new_image = Image(filename=save_picture(image_file), post=new_post)
-                    db.session.add(new_image)
-        
-        # Adiciona vídeos da galeria
-        if form.gallery_videos.data:
-            for video_file in form.gallery_videos.data:
-                if isinstance(video_file, FileStorage):
-                    new_video = Video(filename=save_video(video_file), post=new_post)
-                    db.session.add(new_video)
+        db.session.flush()  # Gera o id usado pelas linhas da galeria
+
+        # Galeria: arquivos gravados em paralelo e linhas inseridas em lote
+        ingest_uploads(form.gallery_images.data, Image, post_id=new_post.id)
+        ingest_uploads(form.gallery_videos.data, Video, video=True, post_id=new_post.id)
 
         db.session.commit()
         flash('Postagem criada com sucesso!', 'success')
@@ -125,15 +117,8 @@ def edit_post(post_id):
         post.is_published = form.is_published.data
         
         # Adiciona novas imagens/vídeos à galeria
-        if form.gallery_images.data:
-            for image_file in form.gallery_images.data:
-                if isinstance(image_file, FileStorage):
-                    db.session.add(Image(filename=save_picture(image_file), post=post))
-        
-        if form.gallery_videos.data:
-            for video_file in form.gallery_videos.data:
-                if isinstance(video_file, FileStorage):
-                    db.session.add(Video(filename=save_video(video_file), post=post))
+        ingest_uploads(form.gallery_images.data, Image, post_id=post.id)
+        ingest_uploads(form.gallery_videos.data, Video, video=True, post_id=post.id)
 
         db.session.commit()
         flash('Postagem atualizada com sucesso!', 'success')
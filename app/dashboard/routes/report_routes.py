@@ -0,0 +1,38 @@
+# app/dashboard/routes/report_routes.py
+
+# --- Imports Essenciais ---
+from flask import render_template, request
+from flask_login import login_required
+
+# --- Imports do Projeto ---
+from app.dashboard import bp
+from app.reports import (
+    FREQUENCIES, LEAD_DIMENSIONS, PERIOD_DAYS, table_versions, leads_report, birthdays_report, services_report
+)
+
+
+# --- Rotas de Relatórios ---
+
+@bp.route('/reports')
+@login_required
+def reports():
+    """Leads por período, aniversariantes por mês e volume de serviços."""
+    frequency = request.args.get('frequency', 'day')
+    if frequency not in FREQUENCIES:
+        frequency = 'day'
+    by = request.args.get('by', 'status')
+    if by not in LEAD_DIMENSIONS:
+        by = 'status'
+    days = request.args.get('days', 90, type=int)
+    if days not in PERIOD_DAYS:
+        days = 90
+
+    # Uma leitura dos contadores de versão para os três relatórios
+    versions = table_versions()
+    return render_template('dashboard/reports.html',
+                           leads=leads_report(frequency, by, days, versions=versions),
+                           birthdays=birthdays_report(versions=versions),
+                           services=services_report(versions=versions),
+                           frequency=frequency, by=by, days=days, frequencies=FREQUENCIES,
+                           dimensions=LEAD_DIMENSIONS, period_days=PERIOD_DAYS,
+                           title="Relatórios")
@@ -0,0 +1,303 @@
+# app/exports.py
+"""
+Central de exportações do dashboard.
+
+O pedido só cria um Export e enfileira a tarefa 'exports.run' (app/jobs.py);
+o 'flask worker' percorre a tabela em lotes por chave (id > último), lendo só
+as colunas exportadas, e grava o arquivo em EXPORT_FOLDER (padrão:
+instance/exports, fora da pasta de mídia servida publicamente):
+
+- CSV compactado com gzip (.csv.gz), UTF-8 com BOM para abrir no Excel;
+- XLSX com o openpyxl em modo write_only (as linhas vão direto para o disco).
+
+O progresso (linhas gravadas / total) é salvo a cada lote. Os arquivos ficam
+disponíveis por EXPORT_RETENTION_HOURS e depois são apagados junto com o
+registro ('flask exports cleanup' e ao fim de cada exportação). O download
+passa sempre pelo dashboard, com login.
+
+Textos que começam como fórmula ('=', '+', '-', '@' ...) são gravados como
+texto nos dois formatos (app.utils.spreadsheet_safe): leads vêm do formulário
+público e a planilha é aberta pela equipe.
+"""
+import csv
+import gzip
+import os
+import secrets
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, func, or_, select
+
+from app.extensions import db
+from app.jobs import PermanentError, enqueue, heartbeat, task
+from app.models import Export, Job, Lead, Client, ClientService, Post, User, Category, post_categories
+from app.utils import spreadsheet_safe
+
+DEFAULT_BATCH_SIZE = 2000
+DEFAULT_RETENTION_HOURS = 72
+
+# Limite de linhas de uma planilha do Excel (menos o cabeçalho)
+XLSX_MAX_ROWS = 1_048_575
+
+FORMATS = {
+    'csv': ('CSV compactado (.csv.gz)', 'csv.gz', 'application/gzip'),
+    'xlsx': ('Excel (.xlsx)', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def export_folder(app=None):
+    app = app or current_app
+    return app.config.get('EXPORT_FOLDER') or os.path.join(app.instance_path, 'exports')
+
+
+def _parse_date(value):
+    return date.fromisoformat(value) if value else None
+
+
+def _date_range(column, filters, is_datetime=True):
+    """Condições de período (date_from/date_to inclusivos, em ISO) sobre a coluna."""
+    conditions = []
+    start, end = _parse_date(filters.get('date_from')), _parse_date(filters.get('date_to'))
+    if start:
+        conditions.append(column >= (datetime.combine(start, datetime.min.time()) if is_datetime else start))
+    if end:
+        end = end + timedelta(days=1)
+        conditions.append(column < (datetime.combine(end, datetime.min.time()) if is_datetime else end))
+    return conditions
+
+
+# --- Tipos de exportação ---
+# Cada tipo: rótulo, cabeçalho, consulta só com as colunas (a primeira é o id,
+# usado na paginação por chave) e, opcionalmente, dados extras por lote.
+
+def _leads_query(filters):
+    stmt = select(
+        Lead.id, Lead.created_at, Lead.parent_name, Lead.email, Lead.whatsapp, Lead.child_name,
+        Lead.child_age, Lead.service_of_interest, Lead.status, Lead.message,
+    ).where(*_date_range(Lead.created_at, filters))
+    if filters.get('status'):
+        stmt = stmt.where(Lead.status == filters['status'])
+    return stmt, Lead.id
+
+
+def _clients_query(filters):
+    stmt = select(
+        Client.id, Client.child_name, Client.child_date_of_birth, Client.parent1_name, Client.parent1_phone,
+        Client.parent2_name, Client.parent2_phone, Client.contact_phone, Client.email, Client.address_street,
+        Client.address_number, Client.address_neighborhood, Client.address_city, Client.address_cep,
+        Client.created_at,
+    ).where(*_date_range(Client.created_at, filters))
+    return stmt, Client.id
+
+
+def _client_services_query(filters):
+    stmt = (
+        select(
+            ClientService.id, ClientService.service_date, ClientService.service_name, Client.child_name,
+            Client.parent1_name, Client.contact_phone, ClientService.observation,
+        )
+        .join(Client, ClientService.client_id == Client.id)
+        .where(*_date_range(ClientService.service_date, filters, is_datetime=False))
+    )
+    return stmt, ClientService.id
+
+
+def _posts_query(filters):
+    stmt = (
+        select(Post.id, Post.title, Post.slug, Post.is_published, User.username, Post.created_at, Post.updated_at)
+        .outerjoin(User, Post.user_id == User.id)
+        .where(*_date_range(Post.created_at, filters))
+    )
+    if filters.get('published') in ('yes', 'no'):
+        published = filters['published'] == 'yes'
+        stmt = stmt.where(Post.is_published.is_(True) if published else or_(Post.is_published.is_(False),
+                                                                             Post.is_published.is_(None)))
+    return stmt, Post.id
+
+
+def _post_categories(rows):
+    """Linhas do lote com a coluna de categorias ('a, b'), lidas em uma consulta."""
+    names = {}
+    for post_id, name in db.session.execute(
+        select(post_categories.c.post_id, Category.name)
+        .join(Category, Category.id == post_categories.c.category_id)
+        .where(post_categories.c.post_id.in_([row[0] for row in rows]))
+        .order_by(Category.name)
+    ):
+        names.setdefault(post_id, []).append(name)
+    return [(*row[1:4], ', '.join(names.get(row[0], [])), *row[4:]) for row in rows]
+
+
+EXPORT_KINDS = {
+    'leads': {
+        'label': 'Leads',
+        'header': ('Recebido em', 'Responsável', 'E-mail', 'WhatsApp', 'Criança', 'Idade',
+                   'Serviço de Interesse', 'Status', 'Mensagem'),
+        'query': _leads_query,
+    },
+    'clients': {
+        'label': 'Clientes',
+        'header': ('Criança', 'Data de Nascimento', 'Responsável 1', 'Telefone Responsável 1', 'Responsável 2',
+                   'Telefone Responsável 2', 'Telefone de Contato', 'E-mail', 'Rua', 'Número', 'Bairro',
+                   'Cidade', 'CEP', 'Cadastrado em'),
+        'query': _clients_query,
+    },
+    'client_services': {
+        'label': 'Histórico de Serviços',
+        'header': ('Data do Serviço', 'Serviço', 'Criança', 'Responsável', 'Telefone', 'Observação'),
+        'query': _client_services_query,
+    },
+    'posts': {
+        'label': 'Postagens',
+        'header': ('Título', 'Slug', 'Publicado', 'Categorias', 'Autor', 'Criado em', 'Atualizado em'),
+        'query': _posts_query,
+        'rows': _post_categories,
+    },
+}
+
+
+def enqueue_export(kind, fmt, filters, user=None):
+    """Cria o pedido de exportação e a tarefa (entram no banco no commit do chamador)."""
+    export = Export(kind=kind, format=fmt, filters=filters, requested_by=user)
+    db.session.add(export)
+    db.session.flush()
+    export.job = enqueue('exports.run', {'export_id': export.id})
+    return export
+
+
+def download_name(export):
+    extension = FORMATS[export.format][1]
+    return f'{export.kind}_{export.created_at:%Y%m%d_%H%M}.{extension}'
+
+
+# --- Geração (no worker) ---
+
+def iter_rows(stmt, id_column, batch_size=DEFAULT_BATCH_SIZE):
+    """Percorre a consulta em lotes por chave (id > último), sem OFFSET."""
+    last_id = None
+    while True:
+        batch_stmt = stmt if last_id is None else stmt.where(id_column > last_id)
+        batch = db.session.execute(batch_stmt.order_by(id_column).limit(batch_size)).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1][0]
+
+
+def _format_csv_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%d/%m/%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    if isinstance(value, bool):
+        return 'Sim' if value else 'Não'
+    return '' if value is None else spreadsheet_safe(value)
+
+
+class _CsvWriter:
+    def __init__(self, path, header):
+        self._file = gzip.open(path, 'wt', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+
+    def write(self, rows):
+        self._writer.writerows([_format_csv_value(value) for value in row] for row in rows)
+
+    def close(self):
+        self._file.close()
+
+    abort = close
+
+
+class _XlsxWriter:
+    def __init__(self, path, header):
+        from openpyxl import Workbook
+
+        self._path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet('Dados')
+        self._sheet.append(header)
+
+    def write(self, rows):
+        for row in rows:
+            self._sheet.append(['Sim' if value is True else 'Não' if value is False else spreadsheet_safe(value)
+                                for value in row])
+
+    def close(self):
+        self._workbook.save(self._path)
+
+    def abort(self):
+        pass
+
+
+@task('exports.run', max_attempts=3)
+def run_export(export_id):
+    export = db.session.get(Export, export_id)
+    if export is None or export.filename:
+        # Excluída antes de rodar, ou já gerada por uma tentativa anterior
+        return None
+    spec = EXPORT_KINDS[export.kind]
+    stmt, id_column = spec['query'](export.filters or {})
+    total = db.session.scalar(select(func.count()).select_from(stmt.subquery()))
+    if export.format == 'xlsx' and total > XLSX_MAX_ROWS:
+        raise PermanentError(f'{total} linhas passam do limite de uma planilha do Excel; exporte em CSV.')
+    export.rows_total, export.rows_done = total, 0
+    db.session.commit()
+
+    folder = export_folder()
+    os.makedirs(folder, exist_ok=True)
+    filename = f'{export.kind}-{export.id}-{secrets.token_hex(8)}.{FORMATS[export.format][1]}'
+    path = os.path.join(folder, filename)
+    temporary = f'{path}.tmp'
+    writer = (_XlsxWriter if export.format == 'xlsx' else _CsvWriter)(temporary, spec['header'])
+    try:
+        for batch in iter_rows(stmt, id_column, current_app.config.get('EXPORT_BATCH_SIZE', DEFAULT_BATCH_SIZE)):
+            writer.write(spec['rows'](batch) if 'rows' in spec else [row[1:] for row in batch])
+            export.rows_done += len(batch)
+            # Renova a reserva da tarefa: exportações grandes passam de JOBS_STALE_SECONDS
+            heartbeat()
+            db.session.commit()
+        writer.close()
+        os.replace(temporary, path)
+    except BaseException:
+        writer.abort()
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+    now = datetime.utcnow()
+    export.filename, export.size, export.finished_at = filename, os.path.getsize(path), now
+    export.expires_at = now + timedelta(hours=retention_hours())
+    db.session.commit()
+    purge_expired()
+    return {'rows': export.rows_done, 'size': export.size}
+
+
+# --- Retenção ---
+
+def retention_hours():
+    return current_app.config.get('EXPORT_RETENTION_HOURS', DEFAULT_RETENTION_HOURS)
+
+
+def delete_export(export):
+    """Apaga o arquivo e o registro (o commit fica com o chamador)."""
+    if export.filename:
+        try:
+            os.remove(os.path.join(export_folder(), export.filename))
+        except FileNotFoundError:
+            pass
+    db.session.delete(export)
+
+
+def purge_expired(now=None):
+    """Apaga as exportações vencidas e as que falharam há mais que o prazo de retenção."""
+    now = now or datetime.utcnow()
+    limit = now - timedelta(hours=retention_hours())
+    expired = Export.query.outerjoin(Job, Export.job_id == Job.id).filter(or_(
+        Export.expires_at < now,
+        and_(Export.filename.is_(None), Export.created_at < limit, or_(Job.id.is_(None), Job.status == 'failed')),
+    )).all()
+    for export in expired:
+        delete_export(export)
+    db.session.commit()
+    return len(expired)
@@ -2,9 +2,11 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
+from app.instrumentation import RequestMetrics
 
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
+request_metrics = RequestMetrics()
 login_manager.login_view = 'auth.login'
 login_manager.login_message = "Por favor, faça login para acessar esta página."
\ No newline at end of file
@@ -0,0 +1,290 @@
+# app/feeds.py
+"""
+sitemap.xml e feed Atom (feed.xml) dos posts e landing pages publicados.
+
+Os arquivos são gerados em disco (FEEDS_FOLDER) com consultas em streaming
+(yield_per, só as colunas necessárias) e servidos direto do disco. Um commit
+que publica, edita ou exclui um Post ou LandingPage publicado apaga os
+arquivos; a próxima requisição (ou 'flask feeds build') os gera de novo.
+
+Acima de SITEMAP_MAX_URLS endereços, sitemap.xml vira um índice que aponta
+para sitemap-1.xml, sitemap-2.xml, ...
+"""
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from heapq import merge
+from itertools import chain, islice
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from flask import current_app, has_app_context, url_for
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Post, LandingPage, Settings
+
+logger = logging.getLogger('app.feeds')
+
+SITEMAP_FILENAME = 'sitemap.xml'
+FEED_FILENAME = 'feed.xml'
+# Arquivo tocado a cada invalidação; sua data marca a "geração" do cache
+INVALIDATION_MARKER = '.invalidated'
+
+# Limite do protocolo sitemaps.org por arquivo
+DEFAULT_SITEMAP_MAX_URLS = 50_000
+DEFAULT_FEED_MAX_ITEMS = 50
+
+FEED_MODELS = (Post, LandingPage)
+
+# Entidades extras para valores dentro de atributos XML
+_ATTR = {'"': '&quot;'}
+
+_build_lock = threading.Lock()
+
+
+def feeds_folder(app=None):
+    app = app or current_app
+    return app.config.get('FEEDS_FOLDER') or os.path.join(app.instance_path, 'feeds')
+
+
+def _generation(folder):
+    try:
+        return os.stat(os.path.join(folder, INVALIDATION_MARKER)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def invalidate(folder):
+    """Apaga os arquivos gerados e marca uma nova geração do cache."""
+    if not os.path.isdir(folder):
+        return
+    with open(os.path.join(folder, INVALIDATION_MARKER), 'w') as marker:
+        marker.write(str(time.time_ns()))
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.endswith('.xml'):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def _w3c(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ') if value else None
+
+
+def _summary(meta_description, body, length=280):
+    if meta_description:
+        return meta_description
+    text = re.sub(r'\s+', ' ', re.sub(r'<[^>]+>', ' ', body or '')).strip()
+    return text if len(text) <= length else text[:length].rsplit(' ', 1)[0] + '…'
+
+
+def _url_builder(endpoint):
+    """url_for uma vez com marcador; depois só troca o slug (milhares de linhas)."""
+    template = url_for(endpoint, slug='__slug__', _external=True)
+    return lambda slug: template.replace('__slug__', quote(slug))
+
+
+# --- sitemap.xml ---
+
+def _sitemap_entries(batch_size):
+    """(loc, lastmod) das páginas fixas, posts e landing pages publicados."""
+    for endpoint in ('main.index', 'main.blog_archive', 'main.contact', 'main.privacy_policy'):
+        yield url_for(endpoint, _external=True), None
+
+    post_url = _url_builder('main.post_detail')
+    stmt = (select(Post.slug, Post.updated_at)
+            .where(Post.is_published.is_(True)).order_by(Post.id)
+            .execution_options(yield_per=batch_size))
+    for slug, updated_at in db.session.execute(stmt):
+        yield post_url(slug), updated_at
+
+    page_url = _url_builder('main.view_landing_page')
+    stmt = (select(LandingPage.slug, LandingPage.updated_at)
+            .where(LandingPage.is_published.is_(True)).order_by(LandingPage.id)
+            .execution_options(yield_per=batch_size))
+    for slug, updated_at in db.session.execute(stmt):
+        yield page_url(slug), updated_at
+
+
+def _write_urlset(path, entries):
+    newest = None
+    with open(path, 'w', encoding='utf-8') as sitemap:
+        sitemap.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                      '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for loc, lastmod in entries:
+            if lastmod:
+                newest = max(newest, lastmod) if newest else lastmod
+                sitemap.write(f'<url><loc>{escape(loc)}</loc><lastmod>{_w3c(lastmod)}</lastmod></url>\n')
+            else:
+                sitemap.write(f'<url><loc>{escape(loc)}</loc></url>\n')
+        sitemap.write('</urlset>\n')
+    return newest
+
+
+def _write_sitemaps(folder, suffix, max_urls, batch_size):
+    """
+    Grava os sitemaps em arquivos temporários (sufixo 'suffix').
+    Retorna a lista de nomes finais, com sitemap.xml por último.
+    """
+    entries = _sitemap_entries(batch_size)
+    first_chunk = list(islice(entries, max_urls + 1))
+    if len(first_chunk) <= max_urls:
+        _write_urlset(os.path.join(folder, SITEMAP_FILENAME + suffix), first_chunk)
+        return [SITEMAP_FILENAME]
+
+    # Índice: divide em arquivos de até max_urls endereços (um lote na memória por vez)
+    names, parts = [], []
+    entries = chain(first_chunk, entries)
+    for number, chunk in enumerate(iter(lambda: list(islice(entries, max_urls)), []), start=1):
+        name = f'sitemap-{number}.xml'
+        lastmod = _write_urlset(os.path.join(folder, name + suffix), chunk)
+        names.append(name)
+        parts.append((url_for('main.sitemap_part', number=number, _external=True), lastmod))
+
+    with open(os.path.join(folder, SITEMAP_FILENAME + suffix), 'w', encoding='utf-8') as index:
+        index.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for loc, lastmod in parts:
+            lastmod_tag = f'<lastmod>{_w3c(lastmod)}</lastmod>' if lastmod else ''
+            index.write(f'<sitemap><loc>{escape(loc)}</loc>{lastmod_tag}</sitemap>\n')
+        index.write('</sitemapindex>\n')
+    return names + [SITEMAP_FILENAME]
+
+
+# --- feed.xml (Atom) ---
+
+def _latest(model, url, limit, summary_columns):
+    stmt = (select(model.slug, model.title, model.created_at, model.updated_at, *summary_columns)
+            .where(model.is_published.is_(True))
+            .order_by(model.created_at.desc(), model.id.desc()).limit(limit))
+    for slug, title, created_at, updated_at, description, body in db.session.execute(stmt):
+        yield created_at or datetime.min, url(slug), title, updated_at or created_at, _summary(description, body)
+
+
+def _write_feed(path, max_items):
+    settings = db.session.execute(select(Settings.business_name, Settings.site_description).limit(1)).first()
+    title = settings.business_name if settings and settings.business_name else 'Planeta Imaginário'
+    subtitle = settings.site_description if settings else ''
+
+    posts = _latest(Post, _url_builder('main.post_detail'), max_items,
+                    (Post.meta_description, Post.content))
+    pages = _latest(LandingPage, _url_builder('main.view_landing_page'), max_items,
+                    (LandingPage.hero_subtitle, LandingPage.content_body))
+    items = list(islice(merge(posts, pages, key=lambda item: item[0], reverse=True), max_items))
+
+    feed_url = url_for('main.feed', _external=True)
+    updated = max((item[3] for item in items if item[3]), default=datetime.utcnow())
+    with open(path, 'w', encoding='utf-8') as feed:
+        feed.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                   '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+                   f'<title>{escape(title)}</title>\n'
+                   f'<subtitle>{escape(subtitle or "")}</subtitle>\n'
+                   f'<link href="{escape(url_for("main.index", _external=True), _ATTR)}"/>\n'
+                   f'<link rel="self" href="{escape(feed_url, _ATTR)}"/>\n'
+                   f'<id>{escape(feed_url)}</id>\n'
+                   f'<updated>{_w3c(updated)}</updated>\n')
+        for published, link, entry_title, entry_updated, summary in items:
+            feed.write('<entry>\n'
+                       f'<title>{escape(entry_title)}</title>\n'
+                       f'<link href="{escape(link, _ATTR)}"/>\n'
+                       f'<id>{escape(link)}</id>\n'
+                       f'<published>{_w3c(published)}</published>\n'
+                       f'<updated>{_w3c(entry_updated or published)}</updated>\n'
+                       f'<summary>{escape(summary)}</summary>\n'
+                       '</entry>\n')
+        feed.write('</feed>\n')
+
+
+# --- Geração ---
+
+def build_feeds(folder=None):
+    """
+    Gera sitemap(s) e feed.xml (requer contexto de requisição para url_for).
+    Os arquivos só substituem os atuais se nenhuma invalidação aconteceu durante
+    a geração. Retorna a lista de arquivos gerados.
+    """
+    app = current_app
+    folder = folder or feeds_folder(app)
+    os.makedirs(folder, exist_ok=True)
+    max_urls = app.config.get('SITEMAP_MAX_URLS', DEFAULT_SITEMAP_MAX_URLS)
+    max_items = app.config.get('FEED_MAX_ITEMS', DEFAULT_FEED_MAX_ITEMS)
+
+    generation = _generation(folder)
+    suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+    names = _write_sitemaps(folder, suffix, max_urls, batch_size=1000)
+    _write_feed(os.path.join(folder, FEED_FILENAME + suffix), max_items)
+    names.append(FEED_FILENAME)
+
+    if _generation(folder) != generation:
+        # Um commit invalidou o cache no meio da geração: descarta e deixa
+        # a próxima requisição gerar de novo
+        for name in names:
+            os.remove(os.path.join(folder, name + suffix))
+        return []
+
+    for name in names:
+        os.replace(os.path.join(folder, name + suffix), os.path.join(folder, name))
+    return names
+
+
+def cached_file(name):
+    """
+    Caminho do arquivo gerado, gerando todos se ainda não existir (ou None).
+
+    Os links absolutos ficam gravados e são servidos a todos os robôs, então
+    não podem vir de um Host forjado: usa SITE_URL ou, sem ele, o Host da
+    requisição só se TRUSTED_HOSTS estiver definido (o Flask recusa os demais).
+    Sem nenhum dos dois, o arquivo não é gerado.
+    """
+    folder = feeds_folder()
+    path = os.path.join(folder, name)
+    if not os.path.exists(path):
+        config = current_app.config
+        if not (config.get('SITE_URL') or config.get('TRUSTED_HOSTS')):
+            logger.warning('sitemap/feed não gerados: defina SITE_URL (ou TRUSTED_HOSTS).')
+            return None
+        with _build_lock:
+            if not os.path.exists(path):
+                if config.get('SITE_URL'):
+                    with current_app.test_request_context(base_url=config['SITE_URL']):
+                        build_feeds(folder)
+                else:
+                    build_feeds(folder)
+    return path if os.path.exists(path) else None
+
+
+# --- Invalidação via eventos da sessão ---
+
+def _affects_feeds(obj):
+    """Só interessam registros publicados agora ou antes da alteração."""
+    if obj.is_published:
+        return True
+    history = inspect(obj).attrs.is_published.history
+    return any(history.deleted)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_feed_changes(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        # Settings: nome e descrição do site entram no cabeçalho do feed
+        if isinstance(obj, Settings) or (isinstance(obj, FEED_MODELS) and _affects_feeds(obj)):
+            session.info['feeds_dirty'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('feeds_dirty', False) and has_app_context():
+        invalidate(feeds_folder())
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_feed_changes(session):
+    session.info.pop('feeds_dirty', None)
@@ -203,9 +203,12 @@ class SettingsForm(FlaskForm):
     site_description = TextAreaField('Descrição Geral do Site (para SEO)', 
                                      description="Uma breve descrição do negócio, com até 160 caracteres.")
 
-    lead_whatsapp_message = TextAreaField('Mensagem de WhatsApp para Leads')
-    client_whatsapp_message = TextAreaField('Mensagem de WhatsApp para Clientes')
-    birthday_congrats_message = TextAreaField('Mensagem de Parabéns (Aniversário)')
+    lead_whatsapp_message = TextAreaField('Mensagem de WhatsApp para Leads',
+                                          description="Marcadores: [NOME_LEAD], [NOME_CRIANCA], [IDADE], [SERVICO_LEAD].")
+    client_whatsapp_message = TextAreaField('Mensagem de WhatsApp para Clientes',
+                                            description="Marcadores: [NOME_RESPONSAVEL], [NOME_CRIANCA], [IDADE], [DATA_PROXIMO_SERVICO].")
+    birthday_congrats_message = TextAreaField('Mensagem de Parabéns (Aniversário)',
+                                              description="Marcadores: [NOME_RESPONSAVEL], [NOME_CRIANCA], [IDADE], [DATA_PROXIMO_SERVICO].")
     birthday_notification_days = IntegerField('Avisar sobre aniversários com X dias de antecedência')
     footer_address = TextAreaField('Endereço no Rodapé')
     footer_phone = StringField('Telefone no Rodapé')
@@ -391,3 +394,28 @@ class LocationSectionForm(FlaskForm):
 class SectionOrderForm(FlaskForm):
     """Formulário vazio, usado apenas para gerar o CSRF token para a reordenação."""
     pass
+
+class PublishHomepageForm(FlaskForm):
+    """Publica o rascunho da homepage (também dá o CSRF token para voltar versões)."""
+    note = StringField('Descrição da versão (opcional)', validators=[Optional(), Length(max=200)])
+    submit_publish = SubmitField('Publicar alterações')
+
+class ExportForm(FlaskForm):
+    """Pedido de exportação (gerada em segundo plano, ver app/exports.py)."""
+    kind = SelectField('O que exportar', choices=[
+        ('leads', 'Leads'), ('clients', 'Clientes'),
+        ('client_services', 'Histórico de Serviços'), ('posts', 'Postagens'),
+    ], validators=[DataRequired()])
+    format = SelectField('Formato', choices=[('xlsx', 'Excel (.xlsx)'), ('csv', 'CSV compactado (.csv.gz)')],
+                         validators=[DataRequired()])
+    status = SelectField('Status do lead', choices=[], validators=[Optional()])
+    published = SelectField('Situação da postagem', choices=[('', 'Todas'), ('yes', 'Publicadas'), ('no', 'Rascunhos')],
+                            validators=[Optional()])
+    date_from = DateField('De', format='%Y-%m-%d', validators=[Optional()])
+    date_to = DateField('Até', format='%Y-%m-%d', validators=[Optional()])
+    submit = SubmitField('Gerar exportação')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from app.models import LEAD_STATUSES
+        self.status.choices = [('', 'Todos')] + [(status, status) for status in LEAD_STATUSES]
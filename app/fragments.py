@@ -0,0 +1,75 @@
+# app/fragments.py
+"""
+Cache de fragmentos das seções dinâmicas da homepage.
+
+As seções fixas já vêm renderizadas na versão publicada (app/homepage.py). As
+que dependem de outros dados (o blog, com os últimos posts) são renderizadas
+uma vez e guardadas em memória, chaveadas pelo nome e pela versão: a versão
+publicada da homepage mais um contador em stat_counter
+('version:section:<nome>', mantido por track_versions em app/stats.py),
+incrementado quando os posts publicados mudam.
+
+O cache é por processo: cada worker do gunicorn renderiza a seção uma vez
+por versão. Os contadores de todas as seções são lidos em uma única consulta.
+"""
+import threading
+
+from flask import current_app
+from markupsafe import Markup
+from sqlalchemy import inspect
+
+from app.extensions import db
+from app.models import Post
+from app.stats import VERSION_PREFIX, read_counters, track_versions
+
+SECTION_VERSION_PREFIX = f'{VERSION_PREFIX}section:'
+
+# {seção: (versão, template, html)}
+_fragments = {}
+_lock = threading.Lock()
+
+
+def section_versions():
+    """Contadores extras de todas as seções ({seção: valor}; ausente vale 0)."""
+    return read_counters(db.session.connection(), SECTION_VERSION_PREFIX)
+
+
+def render_section(name, version, **context):
+    """
+    HTML da seção, do cache quando a versão (qualquer valor comparável) bate.
+    'context' pode ter valores chamáveis (ex: consulta dos últimos posts),
+    avaliados só se for preciso renderizar.
+    """
+    template = current_app.jinja_env.get_template(f'public/sections/_{name}.html')
+    cached = _fragments.get(name)
+    # Com TEMPLATES_AUTO_RELOAD, um template editado gera outro objeto Template
+    if cached and cached[0] == version and cached[1] is template:
+        return cached[2]
+
+    values = {key: value() if callable(value) else value for key, value in context.items()}
+    html = Markup(template.render(**values))
+    with _lock:
+        _fragments[name] = (version, template, html)
+    return html
+
+
+def clear_fragments():
+    with _lock:
+        _fragments.clear()
+
+
+# --- Seção do blog: posts publicados ---
+
+def _affects_blog(obj):
+    if obj.is_published:
+        return True
+    history = inspect(obj).attrs.is_published.history
+    return any(history.deleted)
+
+
+_bump_sections = track_versions(SECTION_VERSION_PREFIX, {Post: 'blog'}, affects=_affects_blog)
+
+
+def bump_blog_section(connection):
+    """Invalida a seção do blog, para escritas em posts feitas fora do ORM."""
+    _bump_sections(connection, 'blog')
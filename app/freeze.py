@@ -0,0 +1,364 @@
+# app/freeze.py
+"""
+Exportação estática ("freeze") das páginas públicas.
+
+'flask freeze' renderiza cada endereço público (home, todas as páginas do
+arquivo do blog, posts e landing pages publicados, política de privacidade)
+pela própria aplicação, em paralelo, e grava o HTML em FREEZE_FOLDER
+(padrão: instance/static_site):
+
+    /                         -> index.html
+    /blog                     -> blog/index.html
+    /blog?page=2              -> blog/page-2.html
+    /post/<slug>              -> post/<slug>/index.html
+    /lp/<slug>                -> lp/<slug>/index.html
+    /politica-de-privacidade  -> politica-de-privacidade/index.html
+
+Depois disso, cada commit do dashboard congela de novo só as páginas
+afetadas (eventos da sessão, como em app/feeds.py), em uma thread separada
+(nos comandos "flask ...", antes de o processo terminar).
+/contato (formulário com CSRF) e /dashboard continuam dinâmicos.
+
+Para servir os arquivos, o proxy pode usar a pasta diretamente quando não há
+cookie de sessão; ou FREEZE_SERVE=True instala FrozenSite na aplicação, que
+faz o mesmo antes do Flask. Exemplo para o nginx:
+
+    location / {
+        if ($http_cookie ~* "session=|remember_token=") { proxy_pass http://app; }
+        try_files $uri/index.html /blog/page-$arg_page.html @app;
+    }
+"""
+import logging
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from flask import current_app, has_app_context, has_request_context
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from werkzeug.http import parse_cookie
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+
+from app.extensions import db
+from app.models import (
+    Post, LandingPage, Settings, Popup, Category, Image, Video, HomePageContent
+)
+
+logger = logging.getLogger('app.freeze')
+
+DEFAULT_WORKERS = 8
+
+# Alvos de congelamento: 'all', 'index', 'blog', 'post:<slug>', 'lp:<slug>'
+ALL = 'all'
+
+STATIC_PAGES = ('/', '/politica-de-privacidade')
+
+# Marca no environ das requisições do próprio freeze, que o FrozenSite ignora
+RENDER_ENVIRON_KEY = 'planeta.freeze'
+
+
+def freeze_folder(app=None):
+    app = app or current_app
+    return app.config.get('FREEZE_FOLDER') or os.path.join(app.instance_path, 'static_site')
+
+
+def frozen_path(path, query=''):
+    """
+    Caminho relativo do arquivo congelado para um endereço público, ou None
+    (query string só é aceita na paginação do blog).
+    """
+    args = parse_qs(query) if query else {}
+    if args:
+        pages = args.get('page')
+        if path.rstrip('/') != '/blog' or set(args) != {'page'} or len(pages) != 1 or not pages[0].isdigit():
+            return None
+        number = int(pages[0])
+        return 'blog/index.html' if number == 1 else f'blog/page-{number}.html'
+    relative = path.strip('/')
+    return safe_join(relative, 'index.html') if relative else 'index.html'
+
+
+# --- Endereços ---
+
+def _blog_pages():
+    from app.main.routes import BLOG_PER_PAGE
+
+    published = db.session.scalar(select(func.count(Post.id)).where(Post.is_published.is_(True)))
+    return max(1, math.ceil(published / BLOG_PER_PAGE))
+
+
+def _blog_urls():
+    return ['/blog'] + [f'/blog?page={number}' for number in range(2, _blog_pages() + 1)]
+
+
+def _published_slugs(model):
+    return db.session.scalars(select(model.slug).where(model.is_published.is_(True)).order_by(model.id)).all()
+
+
+def public_urls():
+    """Todos os endereços públicos congeláveis."""
+    urls = list(STATIC_PAGES) + _blog_urls()
+    urls += [f'/post/{slug}' for slug in _published_slugs(Post)]
+    urls += [f'/lp/{slug}' for slug in _published_slugs(LandingPage)]
+    return urls
+
+
+def _expand(targets):
+    """Alvos -> (endereços a renderizar, caminhos de arquivos a conferir)."""
+    if ALL in targets:
+        return public_urls(), None
+    urls, checked = [], []
+    for target in sorted(targets):
+        if target == 'index':
+            urls.append('/')
+        elif target == 'blog':
+            urls += _blog_urls()
+            checked.append('blog')
+        else:
+            prefix, slug = target.split(':', 1)
+            # Se o registro não está mais publicado, a resposta é 404 e o arquivo sai
+            urls.append(f'/{prefix}/{slug}')
+    return urls, checked
+
+
+# --- Renderização ---
+
+def _render(app, url, base_url):
+    """(status, html) da página como um visitante anônimo a veria."""
+    path, _, query = url.partition('?')
+    response = app.test_client().get(path, query_string=query, base_url=base_url,
+                                     environ_overrides={RENDER_ENVIRON_KEY: True})
+    # Página que grava cookie (ex: sessão) não é igual para todos
+    if response.headers.getlist('Set-Cookie'):
+        return response.status_code, None
+    return response.status_code, response.get_data()
+
+
+def _write(folder, relative, html):
+    target = os.path.join(folder, relative)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temporary = f'{target}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporary, 'wb') as output:
+        output.write(html)
+    os.replace(temporary, target)
+
+
+def _remove(folder, relative):
+    target = os.path.join(folder, relative)
+    try:
+        os.remove(target)
+        # post/<slug>/ e lp/<slug>/ ficam vazias
+        if os.path.dirname(relative) and not os.listdir(os.path.dirname(target)):
+            os.rmdir(os.path.dirname(target))
+    except FileNotFoundError:
+        pass
+
+
+def freeze(targets=(ALL,), workers=None, base_url=None, folder=None, progress=None):
+    """
+    Congela os alvos (requer contexto da aplicação). Páginas que respondem 404
+    têm o arquivo removido; com 'all', arquivos de páginas que não existem mais
+    também saem. Retorna {'written': n, 'removed': n, 'failed': [(url, status)]}.
+    """
+    app = current_app._get_current_object()
+    folder = folder or freeze_folder(app)
+    workers = workers or app.config.get('FREEZE_WORKERS', DEFAULT_WORKERS)
+    base_url = base_url or app.config.get('SITE_URL') or 'http://localhost'
+    os.makedirs(folder, exist_ok=True)
+
+    urls, checked = _expand(set(targets))
+    stats = {'written': 0, 'removed': 0, 'failed': []}
+    expected = set()
+
+    def job(url):
+        with app.app_context():
+            try:
+                return url, _render(app, url, base_url)
+            finally:
+                db.session.remove()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for url, (status, html) in executor.map(job, urls):
+            relative = frozen_path(*url.partition('?')[::2])
+            if status == 200 and html is not None:
+                _write(folder, relative, html)
+                expected.add(relative)
+                stats['written'] += 1
+            elif status == 404:
+                _remove(folder, relative)
+                stats['removed'] += 1
+            else:
+                # Mantém a versão anterior da página, se houver
+                expected.add(relative)
+                stats['failed'].append((url, status))
+            if progress:
+                progress(1)
+
+    # Arquivos que sobraram: páginas do blog além da última ou, com 'all', qualquer página extinta
+    for root in ([''] if checked is None else checked):
+        stats['removed'] += _remove_stale(folder, root, expected)
+    return stats
+
+
+def _remove_stale(folder, root, expected):
+    """Apaga os .html de 'root' que não foram renderizados agora e as pastas vazias."""
+    removed = 0
+    for current, _, filenames in os.walk(os.path.join(folder, root), topdown=False):
+        for filename in filenames:
+            relative = os.path.relpath(os.path.join(current, filename), folder)
+            if filename.endswith('.html') and relative not in expected:
+                os.remove(os.path.join(current, filename))
+                removed += 1
+        if current != folder and not os.listdir(current):
+            os.rmdir(current)
+    return removed
+
+
+# --- Recongelamento após os commits do dashboard ---
+
+_pending = set()
+_pending_lock = threading.Lock()
+_worker = None
+
+
+def schedule(app, targets):
+    """
+    Agenda o congelamento dos alvos em uma thread (agrupa commits seguidos).
+    Fora de uma requisição (comandos 'flask homepage publish', 'seed-synthetic'
+    ...) congela na hora: o processo termina logo depois e mataria a thread,
+    deixando as páginas antigas no ar.
+    """
+    global _worker
+    if not has_request_context():
+        _freeze_now(app, targets)
+        return
+    with _pending_lock:
+        _pending.update(targets)
+        if _worker is None:
+            _worker = threading.Thread(target=_drain, args=(app,), name='freeze', daemon=True)
+            _worker.start()
+
+
+def _freeze_now(app, targets):
+    # Contexto próprio: a sessão do chamador pode estar no meio do commit
+    with app.app_context():
+        try:
+            stats = freeze(targets)
+            if stats['failed']:
+                logger.warning('Falha ao congelar: %s', stats['failed'])
+        except Exception:
+            logger.exception('Erro ao congelar %s', sorted(targets))
+        finally:
+            db.session.remove()
+
+
+def _drain(app):
+    global _worker
+    while True:
+        with _pending_lock:
+            targets = set(_pending)
+            _pending.clear()
+            if not targets:
+                # Sob a trava: um schedule() a seguir já inicia outra thread
+                _worker = None
+                return
+        _freeze_now(app, targets)
+
+
+def _was_or_is_published(obj):
+    if obj.is_published:
+        return True
+    return any(inspect(obj).attrs.is_published.history.deleted)
+
+
+def _slugs(obj):
+    """Slug atual e, se mudou nesta transação, o anterior."""
+    return {obj.slug, *inspect(obj).attrs.slug.history.deleted} - {None}
+
+
+def _targets_for(session, obj):
+    if isinstance(obj, (Settings, Popup, Category)):
+        # Cabeçalho, rodapé e popup estão em todas as páginas
+        return {ALL}
+    if isinstance(obj, Post):
+        if not _was_or_is_published(obj):
+            return set()
+        return {'index', 'blog', *(f'post:{slug}' for slug in _slugs(obj))}
+    if isinstance(obj, LandingPage):
+        if not _was_or_is_published(obj):
+            return set()
+        state = inspect(obj)
+        # O menu de todas as páginas lista as landing pages publicadas
+        if obj in session.new or obj in session.deleted or any(
+                state.attrs[name].history.has_changes() for name in ('title', 'slug', 'is_published')):
+            return {ALL}
+        return {f'lp:{obj.slug}'}
+    if isinstance(obj, (Image, Video)):
+        post = obj.post or session.get(Post, obj.post_id)
+        return {f'post:{post.slug}'} if post is not None and post.is_published else set()
+    if isinstance(obj, HomePageContent) and inspect(obj).attrs.live_release_id.history.has_changes():
+        return {'index'}
+    return set()
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_freeze_targets(session, flush_context, instances):
+    targets = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        targets |= _targets_for(session, obj)
+    if targets:
+        session.info.setdefault('freeze_targets', set()).update(targets)
+
+
+def refreeze(app, targets):
+    """
+    Recongela as páginas se o site já foi congelado ('flask freeze') neste
+    servidor. Chamada após o commit de escritas feitas fora do ORM.
+    """
+    if app.config.get('FREEZE_ON_SAVE', True) and os.path.isdir(freeze_folder(app)):
+        schedule(app, targets)
+
+
+@event.listens_for(Session, 'after_commit')
+def _refreeze_after_commit(session):
+    targets = session.info.pop('freeze_targets', None)
+    if targets and has_app_context():
+        refreeze(current_app._get_current_object(), targets)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_freeze_targets(session):
+    session.info.pop('freeze_targets', None)
+
+
+# --- Servindo os arquivos ---
+
+class FrozenSite:
+    """
+    Middleware WSGI: responde GET/HEAD anônimos com o arquivo congelado, se
+    existir; o resto (POST, dashboard, visitante com sessão) segue para o Flask.
+    """
+
+    def __init__(self, wsgi_app, folder, cookie_names=('session', 'remember_token'), max_age=60):
+        self.wsgi_app = wsgi_app
+        self.folder = folder
+        self.cookie_names = cookie_names
+        self.max_age = max_age
+
+    def __call__(self, environ, start_response):
+        if (environ['REQUEST_METHOD'] in ('GET', 'HEAD') and RENDER_ENVIRON_KEY not in environ
+                and not self._has_session(environ)):
+            relative = frozen_path(environ.get('PATH_INFO', ''), environ.get('QUERY_STRING', ''))
+            path = relative and os.path.join(self.folder, relative)
+            if path and os.path.isfile(path):
+                response = send_file(path, environ, mimetype='text/html', max_age=self.max_age)
+                response.vary.add('Cookie')
+                return response(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+    def _has_session(self, environ):
+        cookies = parse_cookie(environ.get('HTTP_COOKIE', ''))
+        return any(name in cookies for name in self.cookie_names)
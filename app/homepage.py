@@ -0,0 +1,371 @@
+# app/homepage.py
+"""
+Documentos das seções da homepage (HomePageSection).
+
+Cada seção guarda um documento JSON com o formato descrito em SECTION_SCHEMAS.
+Listas (cards, itens, destaques, vídeos) têm tamanho livre no documento; os
+formulários do dashboard editam as primeiras posições usando os nomes planos
+antigos (ex: 'services_card2_item3'), convertidos por flatten()/unflatten().
+
+O dashboard edita um rascunho (HomePageSection, ordem e galeria). O site exibe
+a versão publicada (HomePageRelease): publish() copia o rascunho, renderiza o
+HTML das seções e troca a versão no ar na mesma transação; rollback() volta
+para uma versão anterior só trocando o ponteiro.
+
+O HTML gravado na versão não acompanha mudanças nos templates das seções:
+um deploy que altera public/sections/ deve rodar 'flask homepage rerender',
+que publica uma cópia da versão no ar com o HTML novo (ou publicar de novo).
+Seções sem HTML gravado (ex: a versão criada pela migração) são renderizadas
+em memória, uma vez por processo.
+"""
+import threading
+
+from flask import current_app
+from markupsafe import Markup
+from sqlalchemy import delete, select
+from sqlalchemy.orm import defer
+
+from app.extensions import db
+from app.models import HomePageSection, HomePageRelease, StructureImage
+
+SECTION_NAMES = ('hero', 'services', 'values', 'structure', 'videos', 'blog', 'cta', 'location')
+
+
+class Repeat:
+    """Lista no documento; 'pattern' ({n} = posição, a partir de 1) monta o nome plano."""
+
+    def __init__(self, pattern, count, item=None):
+        self.pattern = pattern
+        self.count = count
+        # dict (lista de objetos) ou None (lista de textos)
+        self.item = item
+
+
+class SectionSchema:
+    def __init__(self, version, prefix, fields, defaults=None):
+        self.version = version
+        self.prefix = prefix
+        self.fields = fields
+        self.defaults = defaults or {}
+
+
+_HEADER = {'tagline': 'section_tagline', 'title': 'section_title', 'subtitle': 'section_subtitle'}
+
+SECTION_SCHEMAS = {
+    'hero': SectionSchema(1, 'hero_', {
+        'background_color_from': 'background_color_from',
+        'background_color_to': 'background_color_to',
+        'badge_text': 'badge_text',
+        'title': 'title',
+        'subtitle': 'subtitle',
+        'whatsapp_button_text': 'whatsapp_button_text',
+        'whatsapp_button_link': 'whatsapp_button_link',
+        'highlight_text': 'highlight_text',
+    }, defaults={'background_color_from': '#4f46e5', 'background_color_to': '#f97316'}),
+    'services': SectionSchema(1, 'services_', {
+        **_HEADER,
+        'cards': Repeat('card{n}_', 3, {
+            'icon': 'icon',
+            'title': 'title',
+            'text': 'text',
+            'items': Repeat('item{n}', 3),
+            'cta_text': 'cta_text',
+            'cta_link': 'cta_link',
+        }),
+    }),
+    'values': SectionSchema(1, 'values_', {
+        **_HEADER,
+        'cards': Repeat('card{n}_', 3, {'icon': 'icon', 'title': 'title', 'text': 'text'}),
+    }),
+    'structure': SectionSchema(1, 'structure_', {
+        **_HEADER,
+        'features': Repeat('feature{n}_', 2, {'title': 'title', 'text': 'text'}),
+    }),
+    'videos': SectionSchema(1, 'videos_section_', {
+        'title': 'title',
+        'videos': Repeat('video{n}', 3),
+    }),
+    'blog': SectionSchema(1, 'blog_', {**_HEADER, 'cta_text': 'cta_text'}),
+    'cta': SectionSchema(1, 'cta_', {
+        'title': 'title',
+        'subtitle': 'subtitle',
+        'whatsapp_button_text': 'whatsapp_button_text',
+        'form_button_text': 'form_button_text',
+    }),
+    'location': SectionSchema(1, 'location_', {
+        **_HEADER,
+        'card_title': 'card_title',
+        'address_title': 'address_title',
+        'address_text': 'address_text',
+        'phone_title': 'phone_title',
+        'phone_text': 'phone_text',
+        'hours_title': 'hours_title',
+        'hours_text': 'hours_text',
+        'gmaps_button_text': 'gmaps_button_text',
+        'gmaps_link': 'gmaps_link',
+        'image_alt': 'image_alt',
+    }),
+}
+
+
+def visibility_field(name):
+    """Nome do checkbox 'Exibir esta seção?' no formulário da seção."""
+    return f'show_{name}_section'
+
+
+# --- Documento <-> nomes planos dos formulários ---
+
+def _flatten(fields, data, prefix, flat):
+    data = data or {}
+    for key, node in fields.items():
+        if isinstance(node, Repeat):
+            items = data.get(key) or []
+            for n in range(1, node.count + 1):
+                item = items[n - 1] if n <= len(items) else None
+                name = prefix + node.pattern.format(n=n)
+                if node.item is None:
+                    flat[name] = item
+                else:
+                    _flatten(node.item, item, name, flat)
+        else:
+            flat[prefix + node] = data.get(key)
+    return flat
+
+
+def _unflatten(fields, flat, prefix, base):
+    data = dict(base or {})
+    for key, node in fields.items():
+        if isinstance(node, Repeat):
+            # Posições além das editadas no formulário são preservadas
+            items = list(data.get(key) or [])
+            for n in range(1, node.count + 1):
+                name = prefix + node.pattern.format(n=n)
+                if node.item is None:
+                    if name not in flat:
+                        continue
+                    value = flat[name]
+                else:
+                    current = items[n - 1] if n <= len(items) else None
+                    value = _unflatten(node.item, flat, name, current)
+                items.extend([None] * (n - len(items)))
+                items[n - 1] = value
+            data[key] = items
+        elif prefix + node in flat:
+            data[key] = flat[prefix + node]
+    return data
+
+
+def flatten(name, data):
+    """Documento da seção -> {nome plano: valor}, para preencher o formulário."""
+    schema = SECTION_SCHEMAS[name]
+    return _flatten(schema.fields, data, schema.prefix, {})
+
+
+def unflatten(name, flat, base=None):
+    """Valores planos (ex: form.data) aplicados sobre o documento 'base'."""
+    schema = SECTION_SCHEMAS[name]
+    return _unflatten(schema.fields, flat, schema.prefix, base)
+
+
+def form_data(section):
+    """Dados para SectionForm(data=...): documento plano + visibilidade."""
+    return {**flatten(section.name, section.data), visibility_field(section.name): section.is_visible}
+
+
+def apply_form_data(section, flat):
+    """Grava no documento os valores do formulário (atribui um novo dict, marcando a linha como alterada)."""
+    section.data = unflatten(section.name, flat, section.data)
+    section.schema_version = SECTION_SCHEMAS[section.name].version
+    if visibility_field(section.name) in flat:
+        section.is_visible = bool(flat[visibility_field(section.name)])
+
+
+# --- Carregamento ---
+
+def new_section(name):
+    schema = SECTION_SCHEMAS[name]
+    return HomePageSection(name=name, is_visible=True, schema_version=schema.version,
+                           data=unflatten(name, {}, schema.defaults))
+
+
+def load_sections(names=None, with_data=True):
+    """
+    Seções como {nome: HomePageSection}, criando as que ainda não existem.
+    Com with_data=False o JSON só é lido quando acessado (ex: fragmento fora do cache).
+    """
+    names = tuple(names or SECTION_NAMES)
+    stmt = select(HomePageSection).where(HomePageSection.name.in_(names))
+    if not with_data:
+        stmt = stmt.options(defer(HomePageSection.data))
+    sections = {section.name: section for section in db.session.scalars(stmt)}
+
+    missing = [name for name in names if name not in sections]
+    if missing:
+        for name in missing:
+            sections[name] = new_section(name)
+            db.session.add(sections[name])
+        db.session.commit()
+    return sections
+
+
+def get_section(name):
+    return load_sections((name,))[name]
+
+
+# --- Rascunho e versões publicadas ---
+
+# Versões guardadas para voltar atrás (além da que está no ar)
+DEFAULT_RELEASES_KEPT = 20
+
+# Seções renderizadas a cada requisição: o blog mostra os últimos posts
+DYNAMIC_SECTIONS = ('blog',)
+
+# (id da versão, página) da última versão servida; versões gravadas nunca
+# mudam (rerender() cria outra), então o id basta como chave
+_live_page = (None, None)
+_live_lock = threading.Lock()
+
+
+def snapshot_sections(sections):
+    """{nome: HomePageSection} -> cópia dos documentos para HomePageRelease.sections."""
+    return {
+        name: {'is_visible': section.is_visible, 'schema_version': section.schema_version,
+               'version': section.version, 'data': section.data}
+        for name, section in sections.items()
+    }
+
+
+def draft_gallery(content):
+    stmt = (select(StructureImage.filename, StructureImage.caption)
+            .where(StructureImage.homepage_content_id == content.id).order_by(StructureImage.id))
+    return [{'filename': filename, 'caption': caption} for filename, caption in db.session.execute(stmt)]
+
+
+def visible_order(section_order, sections):
+    """Nomes das seções visíveis, na ordem de 'section_order'."""
+    names = section_order.split(',') if section_order else []
+    return [name for name in names if name in sections and sections[name]['is_visible']]
+
+
+def render_sections(names, sections, gallery, **context):
+    """HTML de cada seção (requer contexto de requisição para url_for)."""
+    rendered = {}
+    for name in names:
+        template = current_app.jinja_env.get_template(f'public/sections/_{name}.html')
+        rendered[name] = template.render(section=sections[name]['data'], structure_images=gallery, **context)
+    return rendered
+
+
+def publish(content, user=None, note=None):
+    """
+    Publica o rascunho atual. O HTML é renderizado antes de gravar, então um
+    erro de template não altera o site; a nova versão entra no ar no commit.
+    """
+    return _put_live(content, content.section_order, snapshot_sections(load_sections()),
+                     draft_gallery(content), user=user, note=note)
+
+
+def rerender(content, user=None):
+    """
+    Publica uma cópia da versão no ar com o HTML renderizado pelos templates
+    atuais (ex: após um deploy). Não edita a versão existente: os processos
+    que já a têm em memória trocam de página pelo novo id.
+    """
+    live = content.live_release
+    return _put_live(content, live.section_order, live.sections, live.gallery, user=user,
+                     note=f'Versão #{live.id} renderizada de novo')
+
+
+def _put_live(content, section_order, sections, gallery, user=None, note=None):
+    global _live_page
+    static_names = [name for name in visible_order(section_order, sections) if name not in DYNAMIC_SECTIONS]
+
+    release = HomePageRelease(
+        section_order=section_order,
+        sections=sections,
+        gallery=gallery,
+        rendered=render_sections(static_names, sections, gallery),
+        note=note,
+        published_by=user,
+    )
+    db.session.add(release)
+    db.session.flush()
+    content.live_release_id = release.id
+    _prune_releases(content)
+    db.session.commit()
+
+    # Deixa a versão pronta neste processo para o primeiro visitante
+    with _live_lock:
+        _live_page = (release.id, _page_from_release(release))
+    return release
+
+
+def rollback(content, release):
+    """Coloca no ar uma versão já publicada (o rascunho não muda)."""
+    content.live_release_id = release.id
+    db.session.commit()
+
+
+def _prune_releases(content):
+    keep = current_app.config.get('HOMEPAGE_RELEASES_KEPT', DEFAULT_RELEASES_KEPT)
+    stale = db.session.scalars(
+        select(HomePageRelease.id).where(HomePageRelease.id != content.live_release_id)
+        .order_by(HomePageRelease.id.desc()).offset(keep)
+    ).all()
+    if stale:
+        db.session.execute(delete(HomePageRelease).where(HomePageRelease.id.in_(stale)),
+                           execution_options={'synchronize_session': False})
+
+
+def _page_from_release(release):
+    order = visible_order(release.section_order, release.sections)
+    rendered = dict(release.rendered or {})
+    missing = [name for name in order if name not in rendered and name not in DYNAMIC_SECTIONS]
+    if missing:
+        rendered.update(render_sections(missing, release.sections, release.gallery))
+    return {
+        'order': order,
+        'rendered': {name: Markup(html) for name, html in rendered.items()},
+        'sections': {name: release.sections[name]['data'] for name in DYNAMIC_SECTIONS if name in release.sections},
+    }
+
+
+def draft_page(content):
+    """Página montada do rascunho, sem gravar uma versão (site ainda sem nenhuma publicada)."""
+    draft = HomePageRelease(section_order=content.section_order, sections=snapshot_sections(load_sections()),
+                            gallery=draft_gallery(content), rendered={})
+    return _page_from_release(draft)
+
+
+def live_page(release_id):
+    """
+    Versão publicada pronta para servir: {'order', 'rendered', 'sections'}
+    ('sections' só com os documentos das seções dinâmicas), ou None.
+    """
+    global _live_page
+    cached_id, page = _live_page
+    if cached_id == release_id:
+        return page
+    release = db.session.get(HomePageRelease, release_id)
+    if release is None:
+        return None
+    page = _page_from_release(release)
+    with _live_lock:
+        _live_page = (release_id, page)
+    return page
+
+
+def pending_changes(content, sections, release):
+    """Nomes das seções do rascunho diferentes da versão no ar (+ 'order')."""
+    if release is None:
+        return ['order', *SECTION_NAMES]
+    changed = []
+    if content.section_order != release.section_order:
+        changed.append('order')
+    for name, section in sections.items():
+        published = release.sections.get(name)
+        if not published or (published['version'], published['is_visible']) != (section.version, section.is_visible):
+            changed.append(name)
+    if 'structure' not in changed and draft_gallery(content) != release.gallery:
+        changed.append('structure')
+    return changed
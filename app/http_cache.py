@@ -0,0 +1,109 @@
+# app/http_cache.py
+"""
+GET condicional (ETag / 304) para as páginas públicas; Last-Modified só quando
+todos os validadores da página são datas.
+
+Antes de renderizar, uma única consulta barata lê os "validadores" da página:
+datas de atualização, contagens e versões de tudo o que ela exibe, inclusive o
+que vem dos processadores de contexto (Settings, popup ativo e landing pages do
+menu). Se o navegador ou o proxy já tem essa versão, a resposta é um 304 sem
+corpo e o template nem é executado.
+"""
+import hashlib
+import os
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from sqlalchemy import func, select
+from werkzeug.http import is_resource_modified
+
+from app.extensions import db
+from app.models import Settings, Popup, LandingPage
+
+
+def site_validators():
+    """Partes do estado que aparecem em todas as páginas públicas."""
+    return [
+        select(func.max(Settings.version)).scalar_subquery(),
+        select(func.max(Popup.updated_at)).scalar_subquery(),
+        select(func.min(Popup.id)).where(Popup.is_active.is_(True)).scalar_subquery(),
+        select(func.max(LandingPage.updated_at)).scalar_subquery(),
+        select(func.count(LandingPage.id)).where(LandingPage.is_published.is_(True)).scalar_subquery(),
+    ]
+
+
+def _template_salt(app):
+    """
+    Entra no hash do ETag para que um deploy com templates alterados invalide as
+    cópias em cache. Usa HTTP_CACHE_SALT se definido; senão, a data do template
+    mais recente (igual em todos os workers, ao contrário da hora de início).
+    """
+    salt = app.config.get('HTTP_CACHE_SALT')
+    if salt:
+        return str(salt)
+    salt = app.extensions.get('http_cache_salt')
+    if salt is None:
+        latest = 0.0
+        for current, _, filenames in os.walk(os.path.join(app.root_path, app.template_folder)):
+            for filename in filenames:
+                latest = max(latest, os.path.getmtime(os.path.join(current, filename)))
+        salt = app.extensions['http_cache_salt'] = str(int(latest))
+    return salt
+
+
+def _is_personalized():
+    """Usuário logado ou mensagens flash pendentes: a página não é a mesma para todos."""
+    return '_user_id' in session or '_flashes' in session
+
+
+def _apply_cache_control(response, endpoint):
+    policy = current_app.config.get('CACHE_CONTROL', {}).get(endpoint)
+    if policy:
+        response.headers['Cache-Control'] = policy
+    response.vary.add('Cookie')
+    return response
+
+
+def conditional_get(validators):
+    """
+    Decorador para views públicas. 'validators' recebe os mesmos argumentos da
+    view e devolve uma lista de expressões escalares (subconsultas) que mudam
+    sempre que a página muda. A primeira identifica o recurso: se vier None
+    (ex.: slug inexistente), a view é executada normalmente.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or _is_personalized():
+                response = make_response(view(*args, **kwargs))
+                response.headers['Cache-Control'] = 'private, no-cache'
+                response.vary.add('Cookie')
+                return response
+
+            page_parts = validators(*args, **kwargs)
+            state = db.session.execute(select(*page_parts, *site_validators())).one()
+            if state[0] is None:
+                return view(*args, **kwargs)
+
+            digest = hashlib.sha1(
+                '|'.join([_template_salt(current_app), request.full_path, *map(str, state)]).encode()
+            ).hexdigest()
+            # Last-Modified só vale se todo o estado for datas: contagens, versões
+            # e ids (exclusões, popup ativado) mudam sem mover nenhuma data, e um
+            # cliente que só envia If-Modified-Since receberia 304 de uma página velha
+            timestamps = [value for value in state if hasattr(value, 'isoformat')]
+            last_modified = max(timestamps) if timestamps and len(timestamps) == len(state) else None
+
+            if not is_resource_modified(request.environ, etag=digest, last_modified=last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(digest, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            return _apply_cache_control(response, request.endpoint)
+        return wrapper
+    return decorator
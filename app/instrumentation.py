@@ -0,0 +1,234 @@
+# app/instrumentation.py
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('app.requests')
+
+# Limites (em segundos ou unidades) dos buckets dos histogramas
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """Histograma cumulativo simples, no formato esperado pelo Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class RequestMetrics:
+    """
+    Mede cada requisição: tempo total, quantidade e tempo das consultas SQL,
+    tempo de renderização de templates e bytes enviados no corpo.
+
+    Os valores saem no cabeçalho Server-Timing (só com
+    INSTRUMENTATION_SERVER_TIMING ou em debug), em uma linha de log JSON
+    (logger 'app.requests', configurado em create_app) e em histogramas por
+    endpoint mantidos em memória.
+    Com vários workers do gunicorn, cada processo tem os seus histogramas.
+    """
+
+    # (nome da métrica, atributo da medição, buckets, descrição)
+    HISTOGRAMS = (
+        ('request_duration_seconds', 'duration', DURATION_BUCKETS, 'Tempo total da requisição.'),
+        ('db_duration_seconds', 'db_time', DURATION_BUCKETS, 'Tempo gasto em consultas SQL por requisição.'),
+        ('db_queries', 'db_queries', QUERY_COUNT_BUCKETS, 'Consultas SQL por requisição.'),
+        ('template_duration_seconds', 'template_time', DURATION_BUCKETS, 'Tempo de renderização de templates por requisição.'),
+    )
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._upload_bytes = {}
+        self._responses = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('INSTRUMENTATION_ENABLED', True)
+        app.config.setdefault('INSTRUMENTATION_SERVER_TIMING', False)
+        app.config.setdefault('INSTRUMENTATION_LOG', True)
+        app.config.setdefault('INSTRUMENTATION_METRIC_PREFIX', 'planeta_')
+        if not app.config['INSTRUMENTATION_ENABLED']:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        before_render_template.connect(self._start_render, app)
+        template_rendered.connect(self._finish_render, app)
+        _listen_engine_events()
+        app.extensions['request_metrics'] = self
+
+    # --- Ciclo da requisição ---
+
+    def _start_request(self):
+        g.request_metrics = {
+            'start': time.perf_counter(),
+            'db_queries': 0,
+            'db_time': 0.0,
+            'template_time': 0.0,
+            'template_start': None,
+        }
+
+    def _start_render(self, sender, template, context, **extra):
+        metrics = g.get('request_metrics')
+        if metrics is not None:
+            metrics['template_start'] = time.perf_counter()
+
+    def _finish_render(self, sender, template, context, **extra):
+        metrics = g.get('request_metrics')
+        if metrics is not None and metrics['template_start'] is not None:
+            metrics['template_time'] += time.perf_counter() - metrics['template_start']
+            metrics['template_start'] = None
+
+    def _finish_request(self, response):
+        metrics = g.pop('request_metrics', None)
+        if metrics is None:
+            return response
+
+        measurement = {
+            'duration': time.perf_counter() - metrics['start'],
+            'db_queries': metrics['db_queries'],
+            'db_time': metrics['db_time'],
+            'template_time': metrics['template_time'],
+            'upload_bytes': request.content_length or 0,
+        }
+        endpoint = request.endpoint or '<unmatched>'
+        self.record(endpoint, response.status_code, measurement)
+
+        config = current_app.config
+        if config['INSTRUMENTATION_SERVER_TIMING'] or current_app.debug:
+            response.headers.add('Server-Timing', _server_timing(measurement))
+        if config['INSTRUMENTATION_LOG']:
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'endpoint': endpoint,
+                'status': response.status_code,
+                'duration_ms': round(measurement['duration'] * 1000, 2),
+                'db_queries': measurement['db_queries'],
+                'db_ms': round(measurement['db_time'] * 1000, 2),
+                'template_ms': round(measurement['template_time'] * 1000, 2),
+                'upload_bytes': measurement['upload_bytes'],
+            }, ensure_ascii=False))
+        return response
+
+    # --- Agregação ---
+
+    def record(self, endpoint, status_code, measurement):
+        """Soma uma medição aos histogramas do endpoint."""
+        status_class = f'{status_code // 100}xx'
+        with self._lock:
+            histograms = self._histograms.get(endpoint)
+            if histograms is None:
+                histograms = self._histograms[endpoint] = {
+                    name: Histogram(buckets) for name, _, buckets, _ in self.HISTOGRAMS
+                }
+            for name, attribute, _, _ in self.HISTOGRAMS:
+                histograms[name].observe(measurement[attribute])
+            self._upload_bytes[endpoint] = self._upload_bytes.get(endpoint, 0) + measurement['upload_bytes']
+            key = (endpoint, status_class)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def prometheus_text(self, prefix='planeta_'):
+        """Exporta os histogramas no formato texto do Prometheus (v0.0.4)."""
+        lines = []
+        with self._lock:
+            for name, _, _, description in self.HISTOGRAMS:
+                metric = f'{prefix}{name}'
+                lines.append(f'# HELP {metric} {description}')
+                lines.append(f'# TYPE {metric} histogram')
+                for endpoint in sorted(self._histograms):
+                    histogram = self._histograms[endpoint][name]
+                    label = _escape_label(endpoint)
+                    for bound, total in histogram.cumulative():
+                        lines.append(f'{metric}_bucket{{endpoint="{label}",le="{bound}"}} {total}')
+                    lines.append(f'{metric}_sum{{endpoint="{label}"}} {histogram.sum:.6f}')
+                    lines.append(f'{metric}_count{{endpoint="{label}"}} {histogram.count}')
+
+            metric = f'{prefix}request_upload_bytes_total'
+            lines.append(f'# HELP {metric} Bytes recebidos no corpo das requisições.')
+            lines.append(f'# TYPE {metric} counter')
+            for endpoint in sorted(self._upload_bytes):
+                lines.append(f'{metric}{{endpoint="{_escape_label(endpoint)}"}} {self._upload_bytes[endpoint]}')
+
+            metric = f'{prefix}responses_total'
+            lines.append(f'# HELP {metric} Respostas por endpoint e classe de status.')
+            lines.append(f'# TYPE {metric} counter')
+            for (endpoint, status_class), total in sorted(self._responses.items()):
+                lines.append(f'{metric}{{endpoint="{_escape_label(endpoint)}",status="{status_class}"}} {total}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._upload_bytes.clear()
+            self._responses.clear()
+
+
+# --- Contagem de consultas SQL ---
+# Os eventos são registrados na classe Engine, valendo para qualquer engine
+# criada pelo Flask-SQLAlchemy; fora de uma requisição eles não fazem nada.
+
+_engine_events_registered = False
+
+
+def _listen_engine_events():
+    global _engine_events_registered
+    if _engine_events_registered:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _engine_events_registered = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if not has_request_context():
+        return
+    metrics = g.get('request_metrics')
+    if metrics is not None:
+        metrics['db_queries'] += 1
+        metrics['db_time'] += elapsed
+
+
+# --- Funções auxiliares ---
+
+def _server_timing(measurement):
+    return ', '.join((
+        f"app;dur={measurement['duration'] * 1000:.1f}",
+        f"db;dur={measurement['db_time'] * 1000:.1f};desc=\"{measurement['db_queries']} queries\"",
+        f"tpl;dur={measurement['template_time'] * 1000:.1f}",
+    ))
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
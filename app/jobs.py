@@ -0,0 +1,289 @@
+# app/jobs.py
+"""
+Fila de tarefas em segundo plano guardada no próprio banco (tabela 'job').
+
+As rotas chamam enqueue() e retornam; a tarefa entra na fila no commit da
+mesma transação (se ela for desfeita, a tarefa também some). 'flask worker'
+executa as tarefas com um pool de threads ou de processos:
+
+- No Postgres cada worker reserva a próxima tarefa com
+  SELECT ... FOR UPDATE SKIP LOCKED, sem disputar linhas com os outros.
+- Nos demais bancos (SQLite) a reserva é um UPDATE condicional
+  (status = 'queued'); como as escritas são serializadas, só um worker vence.
+
+Falhas voltam para a fila com espera exponencial até max_attempts (ou falham
+de vez, se a tarefa levantar PermanentError); tarefas
+'running' de um worker que morreu voltam para a fila após JOBS_STALE_SECONDS,
+contando como uma tentativa. Tarefas longas chamam heartbeat() durante a
+execução para não serem tomadas como travadas (e executadas duas vezes).
+As tarefas são funções registradas com @task('nome') e recebem o payload
+como argumentos nomeados; o retorno (se for JSON) fica em Job.result.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models import Job
+
+logger = logging.getLogger('app.jobs')
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+STATUSES = (QUEUED, RUNNING, DONE, FAILED)
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_BASE = 10        # segundos antes da 2ª tentativa
+DEFAULT_BACKOFF_MAX = 3600
+DEFAULT_STALE_SECONDS = 15 * 60
+DEFAULT_POLL_INTERVAL = 2.0
+
+# {nome: (função, tentativas)}
+TASKS = {}
+
+# Tarefa em execução nesta thread (para heartbeat())
+_running = threading.local()
+
+
+class PermanentError(Exception):
+    """Falha que não adianta repetir: a tarefa vai direto para 'failed'."""
+
+
+def task(name, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Registra a função como tarefa executável pelo worker."""
+    def decorator(func):
+        TASKS[name] = (func, max_attempts)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, delay=0, max_attempts=None):
+    """
+    Adiciona a tarefa à sessão atual; ela entra na fila no commit do chamador.
+    'delay' em segundos. Retorna o Job (id disponível após o flush).
+    """
+    if max_attempts is None:
+        max_attempts = TASKS[name][1] if name in TASKS else DEFAULT_MAX_ATTEMPTS
+    job = Job(name=name, payload=payload or {}, max_attempts=max_attempts,
+              run_at=datetime.utcnow() + timedelta(seconds=delay))
+    db.session.add(job)
+    return job
+
+
+def backoff(attempts, base=DEFAULT_BACKOFF_BASE, maximum=DEFAULT_BACKOFF_MAX):
+    """Espera antes da próxima tentativa: base * 2^(n-1), limitada, com ±20% de variação."""
+    delay = min(base * 2 ** max(attempts - 1, 0), maximum)
+    return delay * random.uniform(0.8, 1.2)
+
+
+# --- Reserva e execução ---
+
+def _ready():
+    return (Job.status == QUEUED, Job.run_at <= datetime.utcnow())
+
+
+def claim(worker_id):
+    """Reserva a próxima tarefa pronta para este worker (ou None)."""
+    now = datetime.utcnow()
+    if db.session.get_bind().dialect.name == 'postgresql':
+        job = db.session.scalars(
+            select(Job).where(*_ready()).order_by(Job.run_at, Job.id)
+            .limit(1).with_for_update(skip_locked=True)
+        ).first()
+        if job is None:
+            db.session.commit()
+            return None
+        job.status, job.locked_by, job.locked_at = RUNNING, worker_id, now
+        job.attempts += 1
+        db.session.commit()
+        return job
+
+    # Sem SKIP LOCKED: tenta reservar as próximas candidatas com UPDATE condicional
+    for job_id in db.session.scalars(select(Job.id).where(*_ready()).order_by(Job.run_at, Job.id).limit(5)).all():
+        result = db.session.execute(
+            update(Job).where(Job.id == job_id, Job.status == QUEUED)
+            .values(status=RUNNING, locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+        )
+        db.session.commit()
+        if result.rowcount == 1:
+            return db.session.get(Job, job_id)
+    return None
+
+
+def _json_or_none(value):
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return None
+
+
+def execute(job):
+    """Executa a tarefa reservada e grava o resultado ou agenda a nova tentativa."""
+    job_id = job.id
+    entry = TASKS.get(job.name)
+    _running.job_id = job_id
+    try:
+        if entry is None:
+            raise LookupError(f'Tarefa não registrada: {job.name}')
+        result = entry[0](**(job.payload or {}))
+    except Exception as error:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.last_error = traceback.format_exc()[-4000:]
+        job.locked_by = job.locked_at = None
+        if job.attempts >= job.max_attempts or isinstance(error, PermanentError):
+            job.status, job.finished_at = FAILED, datetime.utcnow()
+            logger.error('Tarefa %s (%s) falhou após %d tentativa(s).', job_id, job.name, job.attempts)
+        else:
+            config = current_app.config
+            delay = backoff(job.attempts, config.get('JOBS_BACKOFF_BASE', DEFAULT_BACKOFF_BASE),
+                            config.get('JOBS_BACKOFF_MAX', DEFAULT_BACKOFF_MAX))
+            job.status, job.run_at = QUEUED, datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning('Tarefa %s (%s) falhou; nova tentativa em %.0fs.', job_id, job.name, delay)
+        db.session.commit()
+        return False
+    finally:
+        _running.job_id = None
+
+    job = db.session.get(Job, job_id)
+    job.status, job.finished_at = DONE, datetime.utcnow()
+    job.result = _json_or_none(result)
+    job.last_error = None
+    job.locked_by = job.locked_at = None
+    db.session.commit()
+    return True
+
+
+def heartbeat():
+    """
+    Renova a reserva da tarefa em execução nesta thread; chamada pelas tarefas
+    longas a cada etapa (o commit fica com a tarefa). Sem tarefa, não faz nada.
+    """
+    job_id = getattr(_running, 'job_id', None)
+    if job_id is not None:
+        db.session.execute(
+            update(Job).where(Job.id == job_id, Job.status == RUNNING).values(locked_at=datetime.utcnow())
+        )
+
+
+def requeue_stale(seconds):
+    """
+    Tarefas 'running' sem sinal há mais de 'seconds' (worker morto): voltam
+    para a fila ou, se já usaram todas as tentativas, falham. Assim uma tarefa
+    que derruba o worker não é repetida para sempre.
+    """
+    now = datetime.utcnow()
+    stale = (Job.status == RUNNING, Job.locked_at < now - timedelta(seconds=seconds))
+    failed = db.session.execute(
+        update(Job).where(*stale, Job.attempts >= Job.max_attempts)
+        .values(status=FAILED, locked_by=None, locked_at=None, finished_at=now,
+                last_error='O worker parou durante a última tentativa.')
+    )
+    requeued = db.session.execute(
+        update(Job).where(*stale)
+        .values(status=QUEUED, locked_by=None, locked_at=None, run_at=now)
+    )
+    db.session.commit()
+    if failed.rowcount:
+        logger.error('%d tarefa(s) travada(s) sem tentativas restantes marcada(s) como falha.', failed.rowcount)
+    return requeued.rowcount
+
+
+def retry(job):
+    """Coloca de volta na fila uma tarefa que falhou (zera as tentativas)."""
+    job.status, job.attempts, job.run_at = QUEUED, 0, datetime.utcnow()
+    job.finished_at = job.last_error = None
+
+
+def status_counts():
+    rows = db.session.execute(select(Job.status, func.count(Job.id)).group_by(Job.status))
+    return {**dict.fromkeys(STATUSES, 0), **dict(rows.all())}
+
+
+def oldest_ready_at():
+    """Horário da tarefa pronta mais antiga: se for antigo, não há worker rodando."""
+    return db.session.scalar(select(func.min(Job.run_at)).where(*_ready()))
+
+
+# --- Worker ---
+
+def _worker_loop(app, worker_id, stop):
+    config = app.config
+    poll_interval = config.get('JOBS_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)
+    stale_seconds = config.get('JOBS_STALE_SECONDS', DEFAULT_STALE_SECONDS)
+    next_stale_check = 0.0
+    while not stop.is_set():
+        with app.app_context():
+            try:
+                if time.monotonic() >= next_stale_check:
+                    requeued = requeue_stale(stale_seconds)
+                    if requeued:
+                        logger.warning('%d tarefa(s) travada(s) devolvida(s) à fila.', requeued)
+                    next_stale_check = time.monotonic() + 60
+                job = claim(worker_id)
+                if job is not None:
+                    execute(job)
+                    continue
+            except Exception:
+                logger.exception('Erro no worker %s', worker_id)
+                db.session.rollback()
+            finally:
+                db.session.remove()
+        stop.wait(poll_interval)
+
+
+def _process_main(config_name, worker_id, stop):
+    # O processo pai trata os sinais e avisa pelo 'stop'
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from app import create_app
+
+    app = create_app(config_name)
+    with app.app_context():
+        # Conexões herdadas do processo pai não podem ser reaproveitadas
+        db.engine.dispose()
+    _worker_loop(app, worker_id, stop)
+
+
+def run_worker(app, concurrency=4, mode='thread', config_name=None):
+    """
+    Executa o pool até receber SIGINT/SIGTERM. Cada thread (ou processo)
+    reserva e executa uma tarefa por vez.
+    """
+    prefix = f'{socket.gethostname()}:{os.getpid()}'
+    if mode == 'process':
+        stop = multiprocessing.Event()
+        workers = [
+            multiprocessing.Process(target=_process_main, args=(config_name, f'{prefix}:{slot}', stop),
+                                    name=f'job-worker-{slot}')
+            for slot in range(concurrency)
+        ]
+    else:
+        stop = threading.Event()
+        workers = [
+            threading.Thread(target=_worker_loop, args=(app, f'{prefix}:{slot}', stop),
+                             name=f'job-worker-{slot}', daemon=True)
+            for slot in range(concurrency)
+        ]
+
+    def shutdown(signum, frame):
+        logger.info('Encerrando o worker (termina as tarefas em andamento)...')
+        stop.set()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    for worker in workers:
+        worker.start()
+    while any(worker.is_alive() for worker in workers):
+        for worker in workers:
+            worker.join(timeout=1)
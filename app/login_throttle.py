@@ -0,0 +1,227 @@
+# app/login_throttle.py
+"""
+Limite de tentativas de login por conta (e-mail) e por IP.
+
+Cada chave ('account:<email>' ou 'ip:<endereço>') guarda só três inteiros:
+a janela atual de LOGIN_WINDOW_SECONDS, as falhas nela e as falhas da janela
+anterior. A contagem usada é a de uma janela deslizante: as falhas atuais
+mais as anteriores proporcionais ao que falta da janela atual. Passado o
+limite, o login é recusado antes de procurar o usuário e de calcular o hash
+da senha, que é a parte cara.
+
+As contagens ficam em memória, por processo. Com vários workers do gunicorn
+(LOGIN_THROTTLE_SHARED), cada falha também é somada na tabela
+login_attempt_window, e quando a memória ainda não bloqueia, a tabela é lida
+pela chave primária; uma chave bloqueada lá passa a ser bloqueada também na
+memória do processo, sem novas consultas até a janela virar.
+"""
+import logging
+import math
+import threading
+import time
+
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.extensions import db
+from app.models import LoginAttemptWindow
+
+logger = logging.getLogger('app.login_throttle')
+
+
+def _advance(entry, window):
+    """Soma uma falha à entrada (janela, atuais, anteriores) na janela informada."""
+    if entry is None:
+        return (window, 1, 0)
+    start, current, previous = entry
+    if start == window:
+        return (window, current + 1, previous)
+    if start == window - 1:
+        return (window, 1, current)
+    return (window, 1, 0)
+
+
+def _estimate(entry, now, window_seconds):
+    """Falhas na janela deslizante que termina agora."""
+    if entry is None:
+        return 0.0
+    window = int(now // window_seconds)
+    start, current, previous = entry
+    if start == window - 1:
+        current, previous = 0, current
+    elif start != window:
+        return 0.0
+    return current + previous * (1 - (now % window_seconds) / window_seconds)
+
+
+def _seconds_until_below(entry, limit, now, window_seconds):
+    """Segundos até a janela deslizante da entrada ficar abaixo do limite, sem novas falhas."""
+    window = int(now // window_seconds)
+    elapsed = now % window_seconds
+    start, current, previous = entry
+    if start == window - 1:
+        current, previous = 0, current
+    if current < limit:
+        # Ainda nesta janela: as falhas anteriores perdem peso até o fim dela
+        until = window_seconds * (1 - (limit - current) / previous) - elapsed
+    else:
+        # Só na próxima, quando as falhas atuais passam a ser as anteriores
+        until = window_seconds - elapsed + window_seconds * (1 - limit / current)
+    return max(1, math.floor(until) + 1)
+
+
+class LoginThrottle:
+    """Contagem de falhas de login em memória, com a tabela compartilhada como apoio."""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._next_prune = 0.0
+        self._app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('LOGIN_THROTTLE_ENABLED', True)
+        # Falhas permitidas na janela, por conta e por IP
+        app.config.setdefault('LOGIN_MAX_ATTEMPTS_ACCOUNT', 5)
+        app.config.setdefault('LOGIN_MAX_ATTEMPTS_IP', 20)
+        app.config.setdefault('LOGIN_WINDOW_SECONDS', 15 * 60)
+        # Soma as falhas também no banco, para valer entre processos
+        app.config.setdefault('LOGIN_THROTTLE_SHARED', True)
+        # Teto de chaves em memória (e-mails inventados em massa)
+        app.config.setdefault('LOGIN_THROTTLE_MAX_KEYS', 100_000)
+        self._app = app
+        app.extensions['login_throttle'] = self
+
+    def _keys(self, email, ip):
+        config = self._app.config
+        keys = []
+        if email:
+            keys.append((f'account:{email.strip().lower()}', config['LOGIN_MAX_ATTEMPTS_ACCOUNT']))
+        if ip:
+            keys.append((f'ip:{ip}', config['LOGIN_MAX_ATTEMPTS_IP']))
+        return keys
+
+    # --- Consulta (antes de qualquer hash) ---
+
+    def check(self, email, ip, now=None):
+        """Segundos até poder tentar de novo, ou 0 se a tentativa pode seguir."""
+        config = self._app.config
+        if not config['LOGIN_THROTTLE_ENABLED']:
+            return 0
+        now = time.time() if now is None else now
+        window_seconds = config['LOGIN_WINDOW_SECONDS']
+        keys = self._keys(email, ip)
+
+        if not self._over_limit(keys, now, window_seconds) and config['LOGIN_THROTTLE_SHARED']:
+            shared = self._read_shared([key for key, _ in keys])
+            if shared:
+                with self._lock:
+                    for key, entry in shared.items():
+                        # Fica com a maior contagem entre a memória e a tabela
+                        if _estimate(entry, now, window_seconds) > _estimate(self._entries.get(key), now,
+                                                                               window_seconds):
+                            self._entries[key] = entry
+        blocked = self._over_limit(keys, now, window_seconds)
+        if blocked:
+            # A chave que demora mais para sair do bloqueio define o Retry-After
+            return max(_seconds_until_below(self._entries[key], limit, now, window_seconds)
+                       for key, limit in blocked)
+        return 0
+
+    def _over_limit(self, keys, now, window_seconds):
+        """Chaves (e limites) que estão bloqueadas agora."""
+        return [(key, limit) for key, limit in keys
+                if _estimate(self._entries.get(key), now, window_seconds) >= limit]
+
+    # --- Registro ---
+
+    def failed(self, email, ip, now=None):
+        """Soma uma falha à conta e ao IP."""
+        config = self._app.config
+        if not config['LOGIN_THROTTLE_ENABLED']:
+            return
+        now = time.time() if now is None else now
+        window = int(now // config['LOGIN_WINDOW_SECONDS'])
+        keys = [key for key, _ in self._keys(email, ip)]
+        with self._lock:
+            prune = now >= self._next_prune or len(self._entries) >= config['LOGIN_THROTTLE_MAX_KEYS']
+            if prune:
+                # Descarta as chaves sem falhas nas duas últimas janelas
+                self._entries = {key: entry for key, entry in self._entries.items() if entry[0] >= window - 1}
+                self._next_prune = now + config['LOGIN_WINDOW_SECONDS']
+            for key in keys:
+                if key in self._entries or len(self._entries) < config['LOGIN_THROTTLE_MAX_KEYS']:
+                    self._entries[key] = _advance(self._entries.get(key), window)
+        if config['LOGIN_THROTTLE_SHARED']:
+            self._add_shared(keys, window)
+            if prune:
+                self._write_shared(lambda connection: connection.execute(
+                    delete(LoginAttemptWindow.__table__).where(LoginAttemptWindow.window_number < window - 1)))
+
+    def succeeded(self, email):
+        """Login correto: zera as falhas da conta (as do IP continuam valendo)."""
+        if not self._app.config['LOGIN_THROTTLE_ENABLED']:
+            return
+        key = self._keys(email, None)[0][0]
+        with self._lock:
+            self._entries.pop(key, None)
+        if self._app.config['LOGIN_THROTTLE_SHARED']:
+            self._write_shared(lambda connection: connection.execute(
+                delete(LoginAttemptWindow.__table__).where(LoginAttemptWindow.key == key)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # --- Tabela compartilhada ---
+
+    def _read_shared(self, keys):
+        table = LoginAttemptWindow.__table__
+        try:
+            rows = db.session.execute(
+                select(table.c.key, table.c.window_number, table.c.current, table.c.previous)
+                .where(table.c.key.in_(keys))
+            )
+            return {key: (window, current, previous) for key, window, current, previous in rows}
+        except SQLAlchemyError:
+            db.session.rollback()
+            logger.exception('Falha ao ler as tentativas de login compartilhadas.')
+            return {}
+
+    def _add_shared(self, keys, window):
+        table = LoginAttemptWindow.__table__
+        same = table.c.window_number == window
+        stmt = update(table).values(
+            current=case((same, table.c.current + 1), else_=1),
+            previous=case((same, table.c.previous), (table.c.window_number == window - 1, table.c.current), else_=0),
+            window_number=window,
+        )
+
+        def add(connection):
+            for key in keys:
+                if connection.execute(stmt.where(table.c.key == key)).rowcount == 0:
+                    connection.execute(insert(table).values(key=key, window_number=window, current=1, previous=0))
+
+        # Outro processo pode criar a mesma chave entre o UPDATE e o INSERT
+        for attempt in (1, 2):
+            try:
+                self._write_shared(add, reraise=IntegrityError)
+                return
+            except IntegrityError:
+                if attempt == 2:
+                    logger.warning('Conflito ao registrar a tentativa de login de %s.', keys)
+
+    def _write_shared(self, write, reraise=()):
+        """Grava em uma transação própria, fora da sessão da requisição."""
+        try:
+            with db.engine.begin() as connection:
+                write(connection)
+        except reraise:
+            raise
+        except SQLAlchemyError:
+            logger.exception('Falha ao gravar as tentativas de login compartilhadas.')
+
+
+login_throttle = LoginThrottle()
@@ -1,17 +1,69 @@
 # app/main/routes.py
 
 # --- Imports Essenciais ---
-from flask import render_template, request, abort, flash, redirect, url_for
+from flask import render_template, request, abort, flash, redirect, url_for, send_file, current_app
+from sqlalchemy import func, select
 
 # --- Imports do Projeto ---
 from app.main import bp
-from app.models import Post, Lead , HomePageContent, LandingPage, Settings
+from app.models import (
+    Post, Lead , HomePageContent, LandingPage, Settings, Category, Image, Video, Popup, post_categories
+)
 from app.extensions import db
 from app.forms import LeadForm
+from app.http_cache import conditional_get
+from app import feeds
+from app.fragments import section_versions, render_section
+from app.homepage import draft_page, live_page
+from app.analytics import event_buffer, POPUP_IMPRESSION, POPUP_CLICK, LANDING_PAGE_VIEW
+
+# Posts por página do arquivo do blog (também usado por app/freeze.py)
+BLOG_PER_PAGE = 9
+
+# --- Validadores do GET condicional (app/http_cache.py) ---
+
+def _published_posts_state():
+    published = Post.is_published.is_(True)
+    return [
+        select(func.count(Post.id)).where(published).scalar_subquery(),
+        select(func.max(Post.updated_at)).where(published).scalar_subquery(),
+    ]
+
+def _index_state():
+    # Só a versão publicada importa: editar o rascunho não muda o ETag
+    return [
+        select(HomePageContent.live_release_id).order_by(HomePageContent.id).limit(1).scalar_subquery(),
+        *_published_posts_state(),
+    ]
+
+def _blog_archive_state():
+    return [
+        *_published_posts_state(),
+        select(func.max(Category.updated_at)).scalar_subquery(),
+    ]
+
+def _post_detail_state(slug):
+    post_id = select(Post.id).where(Post.slug == slug, Post.is_published.is_(True)).scalar_subquery()
+    return [
+        select(Post.updated_at).where(Post.id == post_id).scalar_subquery(),
+        select(func.max(Category.updated_at)).join(post_categories)
+            .where(post_categories.c.post_id == post_id).scalar_subquery(),
+        select(func.count(Image.id)).where(Image.post_id == post_id).scalar_subquery(),
+        select(func.max(Image.updated_at)).where(Image.post_id == post_id).scalar_subquery(),
+        select(func.count(Video.id)).where(Video.post_id == post_id).scalar_subquery(),
+        select(func.max(Video.updated_at)).where(Video.post_id == post_id).scalar_subquery(),
+    ]
+
+def _landing_page_state(slug):
+    return [
+        select(LandingPage.updated_at)
+            .where(LandingPage.slug == slug, LandingPage.is_published.is_(True)).scalar_subquery(),
+    ]
 
 # --- Rotas Públicas ---
 
 @bp.route('/')
+@conditional_get(_index_state)
 def index():
     """Renderiza a página inicial do site."""
     content = HomePageContent.query.first()
@@ -21,26 +73,41 @@ def index():
         db.session.add(content)
         db.session.commit()
 
-    latest_posts = Post.query.filter_by(is_published=True).order_by(Post.created_at.desc()).limit(3).all()
-    ordered_sections = content.section_order.split(',') if content.section_order else []
+    # Versão publicada: HTML das seções renderizado na publicação (app/homepage.py).
+    # Sem nenhuma publicada ainda, mostra o rascunho sem gravar uma versão
+    release_id = content.live_release_id
+    page = live_page(release_id) if release_id is not None else None
+    if page is None:
+        page = draft_page(content)
+
+    def section_html(section_name):
+        if section_name in page['rendered']:
+            return page['rendered'][section_name]
+        # Seções dinâmicas (blog): cache de fragmentos, chaveado também pelos posts
+        return render_section(
+            section_name, (release_id, section_versions().get(section_name, 0)),
+            section=page['sections'].get(section_name, {}),
+            latest_posts=lambda: Post.query.filter_by(is_published=True).order_by(Post.created_at.desc()).limit(3).all(),
+        )
 
     return render_template(
         'public/index.html',
-        content=content,
-        latest_posts=latest_posts,
-        ordered_sections=ordered_sections
+        section_html=section_html,
+        ordered_sections=page['order']
     )
 
 @bp.route('/blog')
+@conditional_get(_blog_archive_state)
 def blog_archive():
     """Renderiza a página de arquivo do blog com todas as postagens."""
     page = request.args.get('page', 1, type=int)
     posts_pagination = Post.query.filter_by(is_published=True)\
                                  .order_by(Post.created_at.desc())\
-                                 .paginate(page=page, per_page=9, error_out=False)
+                                 .paginate(page=page, per_page=BLOG_PER_PAGE, error_out=False)
     return render_template('public/blog_archive.html', posts_pagination=posts_pagination)
 
 @bp.route('/post/<slug>')
+@conditional_get(_post_detail_state)
 def post_detail(slug):
     """Exibe uma postagem completa com base no seu slug."""
     post = Post.query.filter_by(slug=slug, is_published=True).first_or_404()
@@ -48,11 +115,39 @@ def post_detail(slug):
     return render_template('public/post_detail.html', post=post, gallery_filenames=gallery_filenames)
 
 @bp.route('/lp/<slug>')
+@conditional_get(_landing_page_state)
 def view_landing_page(slug):
     """Renderiza a página de uma landing page publicada."""
     lp = LandingPage.query.filter_by(slug=slug, is_published=True).first_or_404()
     return render_template('public/view_landing_page.html', lp=lp)
 
+# --- Contagem de eventos (app/analytics.py): só memória, sem escrita no banco ---
+
+def _no_store(response):
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@bp.route('/e/popup/<int:popup_id>/impression', methods=['POST'])
+def popup_impression(popup_id):
+    """Beacon enviado pelo navegador quando o popup é exibido."""
+    event_buffer.record(POPUP_IMPRESSION, popup_id)
+    return _no_store(current_app.response_class(status=204))
+
+@bp.route('/e/lp/<int:landing_page_id>/view', methods=['POST'])
+def landing_page_view(landing_page_id):
+    """Beacon da landing page (conta também as visitas servidas pelo cache HTTP)."""
+    event_buffer.record(LANDING_PAGE_VIEW, landing_page_id)
+    return _no_store(current_app.response_class(status=204))
+
+@bp.route('/p/<int:popup_id>')
+def popup_click(popup_id):
+    """Conta o clique e redireciona para o destino do popup."""
+    target_url = db.session.scalar(select(Popup.target_url).where(Popup.id == popup_id))
+    if not target_url:
+        abort(404)
+    event_buffer.record(POPUP_CLICK, popup_id)
+    return _no_store(redirect(target_url))
+
 @bp.route('/politica-de-privacidade')
 def privacy_policy():
     """Renderiza a página de Política de Privacidade."""
@@ -79,6 +174,33 @@ def contact():
         
     return render_template('public/contact.html', form=form)
 
+# --- Sitemap e Feed (gerados em disco por app/feeds.py) ---
+
+def _send_feed_file(name, mimetype):
+    path = feeds.cached_file(name)
+    if path is None:
+        abort(404)
+    response = send_file(path, mimetype=mimetype, conditional=True)
+    policy = current_app.config.get('CACHE_CONTROL', {}).get(request.endpoint)
+    if policy:
+        response.headers['Cache-Control'] = policy
+    return response
+
+@bp.route('/sitemap.xml')
+def sitemap():
+    """Sitemap (ou índice de sitemaps, quando há muitos endereços)."""
+    return _send_feed_file(feeds.SITEMAP_FILENAME, 'application/xml')
+
+@bp.route('/sitemap-<int:number>.xml')
+def sitemap_part(number):
+    """Uma das partes listadas no índice de sitemaps."""
+    return _send_feed_file(f'sitemap-{number}.xml', 'application/xml')
+
+@bp.route('/feed.xml')
+def feed():
+    """Feed Atom com os posts e landing pages mais recentes."""
+    return _send_feed_file(feeds.FEED_FILENAME, 'application/atom+xml')
+
 # --- Processador de Contexto ---
 
 @bp.app_context_processor
@@ -0,0 +1,324 @@
+# app/matching.py
+"""
+Identificação de leads que já são (ou parecem ser) clientes.
+
+Os clientes ficam em um índice invertido em memória, por processo:
+
+- telefone E.164 (contato, responsável 1 e 2) -> ids
+- e-mail em minúsculas -> ids
+- palavras dos nomes dos responsáveis, sem acentos -> ids
+- palavras do nome da criança, sem acentos -> ids
+
+Para cada lead, os candidatos vêm do telefone, do e-mail e da interseção das
+listas das palavras dos nomes do responsável e da criança (começando pela
+menor), e cada um é pontuado pelo que coincide (MATCH_WEIGHTS). Só aparecem
+os que somam MIN_SCORE: telefone ou e-mail, ou os nomes do responsável e da
+criança.
+
+O índice é montado com uma consulta só com as colunas usadas, na primeira
+vez que é preciso, e depois atualizado a cada commit deste processo com os
+clientes gravados (eventos da sessão). Alterações feitas por outros processos
+aparecem no contador 'version:table:client' de app/reports.py, que é lido a
+cada uso; se ele andou mais do que os commits locais, o índice é remontado em
+uma thread, e as buscas usam o índice anterior até lá.
+"""
+import logging
+import re
+import threading
+import unicodedata
+from collections import defaultdict, namedtuple
+from functools import lru_cache
+
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Client
+from app.reports import TABLE_VERSION_PREFIX
+from app.stats import read_keys
+
+logger = logging.getLogger('app.matching')
+
+CLIENT_VERSION_KEY = f'{TABLE_VERSION_PREFIX}client'
+
+# Pontos de cada coincidência e o mínimo para sinalizar o lead
+MATCH_WEIGHTS = {'telefone': 3, 'e-mail': 3, 'responsável': 2, 'criança': 1}
+MIN_SCORE = 3
+
+# Palavras que não distinguem nomes
+STOP_WORDS = frozenset({'de', 'da', 'do', 'das', 'dos', 'e'})
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_EMPTY = frozenset()
+
+_Entry = namedtuple('_Entry', 'child_name parent_name phones email parents child')
+Match = namedtuple('Match', 'client_id child_name parent_name reasons score')
+
+_COLUMNS = (
+    Client.id, Client.child_name, Client.parent1_name, Client.parent2_name, Client.email,
+    Client.contact_phone_e164, Client.parent1_phone_e164, Client.parent2_phone_e164,
+)
+
+
+def fold(text):
+    """Texto em minúsculas e sem acentos ('Conceição' -> 'conceicao')."""
+    text = text or ''
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return text.lower()
+
+
+# Os mesmos nomes se repetem muito entre clientes (e na montagem do índice)
+@lru_cache(maxsize=65536)
+def name_tokens(name):
+    """Palavras de um nome, sem acentos e sem preposições."""
+    return frozenset(_TOKEN_RE.findall(fold(name))) - STOP_WORDS
+
+
+def normalize_email(email):
+    return (email or '').strip().lower() or None
+
+
+def _entry(child_name, parent1_name, parent2_name, email, *phones):
+    return _Entry(
+        child_name=child_name,
+        parent_name=parent1_name,
+        phones=frozenset(phone for phone in phones if phone),
+        email=normalize_email(email),
+        parents=tuple(tokens for tokens in (name_tokens(parent1_name), name_tokens(parent2_name)) if tokens),
+        child=name_tokens(child_name),
+    )
+
+
+def _client_version():
+    return read_keys(db.session.connection(), [CLIENT_VERSION_KEY])[CLIENT_VERSION_KEY]
+
+
+def _intersection(lists):
+    """
+    Ids presentes em todas as listas. Começando pela menor, o resultado
+    parcial fica pequeno e as interseções seguintes percorrem só ele.
+    """
+    lists = sorted(lists, key=len)
+    if not lists or not lists[0]:
+        return _EMPTY
+    return lists[0].intersection(*lists[1:])
+
+
+class ClientIndex:
+    """Índice invertido dos clientes para encontrar leads já cadastrados."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+        self._rebuilding = False
+        self._reset()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _reset(self):
+        self._entries = {}
+        self._phones = defaultdict(set)
+        self._emails = defaultdict(set)
+        self._parents = defaultdict(set)
+        self._children = defaultdict(set)
+
+    # --- Manutenção ---
+
+    def rebuild(self, rows, version):
+        """
+        Remonta o índice a partir das linhas (id, nomes, e-mail, telefones).
+        O novo índice é montado à parte e trocado de uma vez, então as buscas
+        feitas enquanto isso usam o anterior.
+        """
+        fresh = ClientIndex()
+        for client_id, *values in rows:
+            fresh._add(client_id, _entry(*values))
+        with self._lock:
+            self._entries, self._phones, self._emails = fresh._entries, fresh._phones, fresh._emails
+            self._parents, self._children = fresh._parents, fresh._children
+            self._version = version
+
+    def apply(self, changes, bumps):
+        """
+        Aplica os clientes gravados por um commit ({id: valores ou None se
+        excluído}) e avança a versão pelos 'bumps' do contador feitos por ele.
+        """
+        with self._lock:
+            if self._version is None:
+                return
+            for client_id, values in changes.items():
+                self._remove(client_id)
+                if values is not None:
+                    self._add(client_id, _entry(*values))
+            self._version += bumps
+
+    def sync(self):
+        """
+        Monta o índice na primeira vez (requer contexto da aplicação). Depois,
+        se a tabela mudou fora deste processo, remonta em uma thread e segue
+        com o índice atual até a troca.
+        """
+        version = _client_version()
+        if version == self._version:
+            return
+        if self._version is None:
+            with self._lock:
+                if self._version is None:
+                    self.rebuild(db.session.execute(select(*_COLUMNS)), version)
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, args=(current_app._get_current_object(),),
+                         name='client-index', daemon=True).start()
+
+    def _rebuild_in_background(self, app):
+        try:
+            with app.app_context():
+                try:
+                    # A versão é lida antes das linhas: uma alteração entre as
+                    # duas leituras só causa outra remontagem
+                    version = _client_version()
+                    self.rebuild(db.session.execute(select(*_COLUMNS)).all(), version)
+                finally:
+                    db.session.remove()
+        except Exception:
+            logger.exception('Erro ao remontar o índice de clientes')
+        finally:
+            self._rebuilding = False
+
+    def _add(self, client_id, entry):
+        self._entries[client_id] = entry
+        for phone in entry.phones:
+            self._phones[phone].add(client_id)
+        if entry.email:
+            self._emails[entry.email].add(client_id)
+        for tokens in entry.parents:
+            for token in tokens:
+                self._parents[token].add(client_id)
+        for token in entry.child:
+            self._children[token].add(client_id)
+
+    def _remove(self, client_id):
+        entry = self._entries.pop(client_id, None)
+        if entry is None:
+            return
+        keys = [(self._phones, phone) for phone in entry.phones]
+        keys += [(self._parents, token) for tokens in entry.parents for token in tokens]
+        keys += [(self._children, token) for token in entry.child]
+        if entry.email:
+            keys.append((self._emails, entry.email))
+        for postings, key in keys:
+            ids = postings.get(key)
+            if ids is not None:
+                ids.discard(client_id)
+                if not ids:
+                    del postings[key]
+
+    # --- Busca ---
+
+    def match(self, phone, email, parent_name, child_name, limit=3):
+        """Clientes que coincidem com os dados do lead, do mais ao menos provável."""
+        email = normalize_email(email)
+        parent = name_tokens(parent_name)
+        child = name_tokens(child_name)
+
+        candidates = set(self._phones.get(phone, _EMPTY)) if phone else set()
+        if email:
+            candidates |= self._emails.get(email, _EMPTY)
+        # Só pelos nomes, é preciso coincidir o responsável (ao menos duas
+        # palavras, 'Ana' sozinho traria clientes demais) e a criança
+        if len(parent) >= 2 and child:
+            candidates |= _intersection([self._parents.get(token, _EMPTY) for token in parent]
+                                        + [self._children.get(token, _EMPTY) for token in child])
+
+        matches = []
+        for client_id in candidates:
+            entry = self._entries.get(client_id)
+            if entry is None:
+                continue
+            reasons = []
+            if phone and phone in entry.phones:
+                reasons.append('telefone')
+            if email and email == entry.email:
+                reasons.append('e-mail')
+            if parent and any(parent <= tokens for tokens in entry.parents):
+                reasons.append('responsável')
+            if child and child <= entry.child:
+                reasons.append('criança')
+            score = sum(MATCH_WEIGHTS[reason] for reason in reasons)
+            if score >= MIN_SCORE:
+                matches.append(Match(client_id, entry.child_name, entry.parent_name, tuple(reasons), score))
+        matches.sort(key=lambda match: (-match.score, match.client_id))
+        return matches[:limit]
+
+
+client_index = ClientIndex()
+
+
+def matches_for(leads):
+    """{lead_id: [Match]} dos leads ainda não vinculados a um cliente."""
+    client_index.sync()
+    result = {}
+    for lead in leads:
+        if lead.client_id is None:
+            matches = client_index.match(lead.whatsapp_e164, lead.email, lead.parent_name, lead.child_name)
+            if matches:
+                result[lead.id] = matches
+    return result
+
+
+def client_form_data(lead):
+    """Campos do formulário de cliente preenchidos com os dados do lead."""
+    return {
+        'child_name': lead.child_name,
+        'parent1_name': lead.parent_name,
+        'parent1_phone': lead.whatsapp,
+        'contact_phone': lead.whatsapp,
+        'email': lead.email,
+    }
+
+
+# --- Atualização incremental pelos commits deste processo ---
+
+@event.listens_for(Session, 'before_flush')
+def _collect_clients(session, flush_context, instances):
+    clients = [obj for obj in (*session.new, *session.dirty) if type(obj) is Client]
+    deleted = [obj.id for obj in session.deleted if type(obj) is Client]
+    if clients or deleted:
+        pending = session.info.setdefault('client_index_flush', ([], []))
+        pending[0].extend(clients)
+        pending[1].extend(deleted)
+
+
+@event.listens_for(Session, 'after_flush')
+def _snapshot_clients(session, flush_context):
+    pending = session.info.pop('client_index_flush', None)
+    if not pending:
+        return
+    clients, deleted = pending
+    changes, bumps = session.info.setdefault('client_index_changes', ({}, [0]))
+    for client in clients:
+        changes[client.id] = (client.child_name, client.parent1_name, client.parent2_name, client.email,
+                              client.contact_phone_e164, client.parent1_phone_e164, client.parent2_phone_e164)
+    for client_id in deleted:
+        changes[client_id] = None
+    # Um flush com clientes soma 1 ao contador de versão (app/reports.py)
+    bumps[0] += 1
+
+
+@event.listens_for(Session, 'after_commit')
+def _update_client_index(session):
+    pending = session.info.pop('client_index_changes', None)
+    if pending:
+        client_index.apply(pending[0], pending[1][0])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_client_changes(session):
+    session.info.pop('client_index_flush', None)
+    session.info.pop('client_index_changes', None)
@@ -0,0 +1,416 @@
+# app/media.py
+"""
+Manutenção da pasta de mídia (UPLOAD_FOLDER): gravação em lote dos uploads
+das galerias, coleta de arquivos órfãos, cópia paralela entre pastas e
+correção de permissões.
+"""
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, insert, select, union
+from sqlalchemy.orm import Session
+from werkzeug.datastructures import FileStorage
+
+from app.extensions import db
+from app.jobs import enqueue, task
+from app.models import (
+    Post, Image, Video, StructureImage, StructureVideo, Popup, LandingPage, HomePageSection, HomePageRelease
+)
+from app.utils import picture_filename, video_filename
+
+# Pasta (dentro de UPLOAD_FOLDER) para onde vão os arquivos órfãos
+QUARANTINE_DIR = '.quarantine'
+
+# Arquivos usados como padrão pelos templates, nunca recolhidos
+PROTECTED_FILES = {'default.jpg'}
+
+# Todas as colunas que guardam nomes de arquivos de UPLOAD_FOLDER
+MEDIA_COLUMNS = (
+    Post.cover_image,
+    Post.video_filename,
+    Image.filename,
+    Video.filename,
+    StructureImage.filename,
+    StructureVideo.filename,
+    Popup.image_filename,
+    LandingPage.hero_image,
+    LandingPage.content_image,
+)
+
+
+def referenced_media():
+    """Nomes de arquivo referenciados pelo banco (colunas em uma única consulta UNION)."""
+    stmt = union(*(select(column.label('filename')).where(column.isnot(None)) for column in MEDIA_COLUMNS))
+    referenced = {filename for filename in db.session.scalars(stmt) if filename}
+    # Vídeos da seção "Nossos Vídeos" ficam no documento JSON da seção
+    videos = db.session.scalar(select(HomePageSection.data).where(HomePageSection.name == 'videos'))
+    referenced.update(filename for filename in (videos or {}).get('videos') or [] if filename)
+    # Versões publicadas da homepage guardam sua própria galeria e vídeos
+    for sections, gallery in db.session.execute(select(HomePageRelease.sections, HomePageRelease.gallery)):
+        videos = (sections.get('videos') or {}).get('data') or {}
+        referenced.update(filename for filename in videos.get('videos') or [] if filename)
+        referenced.update(image['filename'] for image in gallery or [])
+    return referenced
+
+
+def find_orphans(upload_folder, referenced, grace_seconds, now=None):
+    """
+    Percorre UPLOAD_FOLDER com os.scandir e separa os arquivos não referenciados.
+    Retorna (órfãos, recentes): listas de (nome, tamanho). Os recentes foram
+    modificados dentro da carência e podem ser uploads ainda não gravados no banco.
+    """
+    now = now or time.time()
+    orphans, recent = [], []
+    with os.scandir(upload_folder) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.is_file(follow_symlinks=False):
+                continue
+            if entry.name in referenced or entry.name in PROTECTED_FILES:
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if now - stat.st_mtime < grace_seconds:
+                recent.append((entry.name, stat.st_size))
+            else:
+                orphans.append((entry.name, stat.st_size))
+    return orphans, recent
+
+
+def quarantine(upload_folder, filenames):
+    """
+    Move os arquivos para UPLOAD_FOLDER/.quarantine/<data-hora>/ (mesmo disco,
+    então é só um rename). Retorna a pasta usada.
+    """
+    target = os.path.join(upload_folder, QUARANTINE_DIR, datetime.now().strftime('%Y%m%d-%H%M%S'))
+    os.makedirs(target, exist_ok=True)
+    for filename in filenames:
+        os.replace(os.path.join(upload_folder, filename), os.path.join(target, filename))
+    return target
+
+
+def delete_files(upload_folder, filenames):
+    for filename in filenames:
+        os.remove(os.path.join(upload_folder, filename))
+
+
+def purge_quarantine(upload_folder, older_than_seconds, now=None):
+    """Apaga os lotes de quarentena mais antigos que o prazo. Retorna quantos foram apagados."""
+    root = os.path.join(upload_folder, QUARANTINE_DIR)
+    if not os.path.isdir(root):
+        return 0
+    now = now or time.time()
+    purged = 0
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and now - entry.stat().st_mtime >= older_than_seconds:
+                shutil.rmtree(entry.path)
+                purged += 1
+    return purged
+
+
+# --- Gravação em lote dos uploads das galerias ---
+
+DEFAULT_INGEST_WORKERS = 4
+
+
+def ingest_uploads(files, model, video=False, workers=None, **columns):
+    """
+    Grava os arquivos de um MultipleFileField em paralelo (pool de threads
+    limitado a MEDIA_INGEST_WORKERS) e cria as linhas de 'model' (Image,
+    Video, StructureImage) em um único INSERT com todas elas. 'columns' são
+    os demais valores de cada linha: fixos (ex: post_id=post.id) ou funções
+    que recebem o arquivo (ex: a legenda a partir do nome).
+
+    Se a transação terminar sem commit (erro no commit, ou exceção na rota:
+    o teardown do Flask-SQLAlchemy fecha a sessão sem chamar 'after_rollback'),
+    os arquivos gravados aqui são apagados. Retorna os nomes gravados.
+    """
+    files = [file for file in files or [] if isinstance(file, FileStorage) and file.filename]
+    if not files:
+        return []
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    os.makedirs(upload_folder, exist_ok=True)
+    filenames = [video_filename(file) if video else picture_filename(file) for file in files]
+
+    def save(pair):
+        file, filename = pair
+        file.save(os.path.join(upload_folder, filename))
+
+    workers = workers or current_app.config.get('MEDIA_INGEST_WORKERS', DEFAULT_INGEST_WORKERS)
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(files))) as executor:
+            list(executor.map(save, zip(files, filenames)))
+    except Exception:
+        _remove_uploads(upload_folder, filenames)
+        raise
+
+    db.session.info.setdefault('media_written', []).extend(filenames)
+    db.session.execute(insert(model), [
+        {'filename': filename,
+         **{name: value(file) if callable(value) else value for name, value in columns.items()}}
+        for file, filename in zip(files, filenames)
+    ])
+    return filenames
+
+
+def _remove_uploads(upload_folder, filenames):
+    for filename in filenames:
+        try:
+            os.remove(os.path.join(upload_folder, filename))
+        except FileNotFoundError:
+            pass
+
+
+@event.listens_for(Session, 'after_commit')
+def _keep_written_uploads(session):
+    # 'after_commit' também dispara ao liberar um SAVEPOINT; só o commit principal confirma
+    if not session.in_nested_transaction():
+        session.info.pop('media_written', None)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _remove_written_uploads(session, transaction):
+    # Só a transação principal; depois do commit a lista já foi esvaziada acima
+    if transaction.parent is not None:
+        return
+    filenames = session.info.pop('media_written', None)
+    if filenames and has_app_context():
+        _remove_uploads(current_app.config['UPLOAD_FOLDER'], filenames)
+
+
+# --- Exclusão em segundo plano (app/jobs.py) ---
+
+def schedule_deletion(filename):
+    """
+    Marca o arquivo para exclusão. No commit da transação atual os arquivos
+    marcados viram uma única tarefa 'media.delete_files'; se ela for
+    desfeita, nada é apagado.
+    """
+    db.session.info.setdefault('media_deletions', []).append(filename)
+
+
+@event.listens_for(Session, 'before_commit')
+def _enqueue_deletions(session):
+    filenames = session.info.pop('media_deletions', None)
+    if filenames:
+        enqueue('media.delete_files', {'filenames': sorted(set(filenames))})
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_deletions(session):
+    session.info.pop('media_deletions', None)
+
+
+@task('media.delete_files')
+def delete_uploads(filenames):
+    """Apaga os arquivos de UPLOAD_FOLDER que continuam sem referência no banco."""
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    referenced = referenced_media()
+    removed = 0
+    for filename in filenames:
+        if filename in referenced or filename in PROTECTED_FILES or os.path.basename(filename) != filename:
+            continue
+        try:
+            os.remove(os.path.join(upload_folder, filename))
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return {'removed': removed, 'kept': len(filenames) - removed}
+
+
+# --- Varredura paralela ---
+
+def walk_files(root, workers=8, skip_hidden=True):
+    """
+    Lista recursivamente os arquivos de 'root' como (caminho relativo, os.stat_result),
+    lendo os subdiretórios em paralelo com os.scandir.
+    """
+    def scan(relative_dir):
+        files, subdirs = [], []
+        with os.scandir(os.path.join(root, relative_dir)) as entries:
+            for entry in entries:
+                if skip_hidden and entry.name.startswith('.'):
+                    continue
+                relative = os.path.join(relative_dir, entry.name) if relative_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(relative)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append((relative, entry.stat(follow_symlinks=False)))
+        return files, subdirs
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(scan, '')}
+        while pending:
+            future = next(as_completed(pending))
+            pending.remove(future)
+            files, subdirs = future.result()
+            results.extend(files)
+            pending.update(pool.submit(scan, subdir) for subdir in subdirs)
+    return results
+
+
+def walk_dirs(root, skip_hidden=True):
+    """Diretórios de 'root' (inclusive), como caminhos absolutos."""
+    for current, dirnames, _ in os.walk(root):
+        if skip_hidden:
+            dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+        yield current
+
+
+def run_parallel(func, items, workers=8, progress=None):
+    """
+    Executa func(item) em um pool de threads. 'progress' (opcional) é chamado
+    a cada item concluído. Retorna a lista de (item, resultado ou exceção).
+    """
+    outcomes = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(func, item): item for item in items}
+        for future in as_completed(futures):
+            try:
+                outcomes.append((futures[future], future.result()))
+            except OSError as error:
+                outcomes.append((futures[future], error))
+            if progress:
+                progress(1)
+    return outcomes
+
+
+# --- Cópia sem passar pelo espaço do usuário ---
+
+def _copy_contents(source, target):
+    """Copia o conteúdo com copy_file_range/sendfile (kernel), com alternativa portável."""
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        size = os.fstat(src.fileno()).st_size
+        copied = 0
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while copied < size:
+                    sent = os.copy_file_range(src.fileno(), dst.fileno(), size - copied)
+                    if sent == 0:
+                        break
+                    copied += sent
+            except OSError:
+                # Sistemas de arquivos diferentes em kernels antigos (EXDEV) ou sem suporte
+                copied = 0
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+        if copied < size and hasattr(os, 'sendfile'):
+            try:
+                while copied < size:
+                    sent = os.sendfile(dst.fileno(), src.fileno(), copied, size - copied)
+                    if sent == 0:
+                        break
+                    copied += sent
+            except OSError:
+                copied = 0
+                dst.seek(0)
+                dst.truncate()
+        if copied < size:
+            src.seek(copied)
+            dst.seek(copied)
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as media_file:
+        for chunk in iter(lambda: media_file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def same_file(source_stat, target_path):
+    """Mesmo tamanho e mesma data de modificação (em segundos)."""
+    try:
+        target_stat = os.stat(target_path)
+    except FileNotFoundError:
+        return False
+    return (target_stat.st_size == source_stat.st_size
+            and int(target_stat.st_mtime) == int(source_stat.st_mtime))
+
+
+class CopyManifest:
+    """
+    Registro (JSON lines) dos arquivos já copiados, gravado na pasta de destino.
+    Uma migração interrompida é retomada pulando o que já consta aqui.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as manifest_file:
+                for line in manifest_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Linha incompleta de uma execução interrompida
+                    self.done[entry['path']] = (entry['size'], entry['mtime'])
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def is_done(self, relative, source_stat):
+        return self.done.get(relative) == (source_stat.st_size, int(source_stat.st_mtime))
+
+    def add(self, relative, source_stat, checksum=None):
+        entry = {'path': relative, 'size': source_stat.st_size, 'mtime': int(source_stat.st_mtime)}
+        if checksum:
+            entry['sha256'] = checksum
+        with self._lock:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+            self.done[relative] = (entry['size'], entry['mtime'])
+
+    def close(self):
+        self._file.close()
+
+
+def copy_media_file(source_root, target_root, relative, source_stat, manifest=None, verify=False):
+    """
+    Copia um arquivo preservando a data de modificação. Retorna 'skipped' se o
+    destino já é igual (manifesto ou tamanho + mtime) ou 'copied'.
+    Levanta OSError se a verificação por checksum falhar.
+    """
+    target = os.path.join(target_root, relative)
+    if (manifest and manifest.is_done(relative, source_stat) and os.path.exists(target)) \
+            or same_file(source_stat, target):
+        if manifest and not manifest.is_done(relative, source_stat):
+            manifest.add(relative, source_stat)
+        return 'skipped'
+
+    source = os.path.join(source_root, relative)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    partial = f'{target}.part'
+    _copy_contents(source, partial)
+    shutil.copystat(source, partial)
+
+    checksum = None
+    if verify:
+        checksum = file_checksum(source)
+        if file_checksum(partial) != checksum:
+            os.remove(partial)
+            raise OSError(f'checksum divergente: {relative}')
+    os.replace(partial, target)
+
+    if manifest:
+        manifest.add(relative, source_stat, checksum)
+    return 'copied'
+
+
+# --- Permissões ---
+
+def fix_permissions(path, mode):
+    """Aplica 'mode' se for diferente do atual. Retorna True se alterou."""
+    if stat.S_IMODE(os.stat(path).st_mode) == mode:
+        return False
+    os.chmod(path, mode)
+    return True
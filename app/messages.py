@@ -0,0 +1,205 @@
+# app/messages.py
+import csv
+import io
+import re
+from datetime import date
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Settings, ClientService
+from app.utils import build_whatsapp_url, spreadsheet_safe
+
+# Marcadores aceitos nas mensagens de WhatsApp das Configurações
+PLACEHOLDERS = {
+    'NOME_CRIANCA': 'child_name',
+    'NOME_RESPONSAVEL': 'parent_name',
+    'NOME_LEAD': 'parent_name',
+    'IDADE': 'age',
+    'DATA_PROXIMO_SERVICO': 'next_service_date',
+    'SERVICO_LEAD': 'service_of_interest',
+}
+
+# Campos de Settings que contêm mensagens
+MESSAGE_FIELDS = ('lead_whatsapp_message', 'client_whatsapp_message', 'birthday_congrats_message')
+
+_PLACEHOLDER_RE = re.compile(r'\[([A-Z_]+)\]')
+
+
+def _text(value):
+    # Só None vira vazio: uma idade 0 continua aparecendo
+    return '' if value is None else str(value)
+
+
+class MessageTemplate:
+    """
+    Mensagem já analisada: uma lista de trechos literais e nomes de campos.
+    Renderizar é apenas juntar os trechos, sem reprocessar o texto.
+    Marcadores desconhecidos são mantidos como texto.
+    """
+
+    def __init__(self, source):
+        self.source = source or ''
+        self.parts = []
+        position = 0
+        for match in _PLACEHOLDER_RE.finditer(self.source):
+            field = PLACEHOLDERS.get(match.group(1))
+            if field is None:
+                continue
+            if match.start() > position:
+                self.parts.append((False, self.source[position:match.start()]))
+            self.parts.append((True, field))
+            position = match.end()
+        if position < len(self.source):
+            self.parts.append((False, self.source[position:]))
+        self.fields = {part for is_field, part in self.parts if is_field}
+
+    def __bool__(self):
+        return bool(self.source)
+
+    def render(self, values):
+        """Renderiza a mensagem para um destinatário ({campo: valor})."""
+        return ''.join(
+            _text(values.get(part)) if is_field else part
+            for is_field, part in self.parts
+        )
+
+    def render_many(self, recipients):
+        """Renderiza a mensagem para vários destinatários, em sequência."""
+        render = self.render
+        return (render(values) for values in recipients)
+
+
+# --- Cache das mensagens compiladas ---
+# Chaveado pela versão das Configurações (Settings.version), que é
+# incrementada automaticamente a cada gravação. Cada processo mantém
+# apenas a versão mais recente.
+_compiled = {}
+
+
+def compile_settings(settings):
+    """Retorna {campo: MessageTemplate} das mensagens das Configurações."""
+    if settings is None:
+        return {field: MessageTemplate(None) for field in MESSAGE_FIELDS}
+    cache_key = (settings.id, settings.version)
+    templates = _compiled.get(cache_key)
+    if templates is None:
+        templates = {field: MessageTemplate(getattr(settings, field)) for field in MESSAGE_FIELDS}
+        _compiled.clear()
+        _compiled[cache_key] = templates
+    return templates
+
+
+def current_templates():
+    """
+    Busca apenas id e versão das Configurações e devolve as mensagens
+    compiladas do cache (o texto só é lido quando a versão muda).
+    """
+    row = db.session.execute(select(Settings.id, Settings.version).limit(1)).first()
+    if row is None:
+        return compile_settings(None)
+    templates = _compiled.get((row.id, row.version))
+    if templates is None:
+        templates = compile_settings(db.session.get(Settings, row.id))
+    return templates
+
+
+# --- Valores dos marcadores por destinatário ---
+
+def _age(date_of_birth, today):
+    if not date_of_birth:
+        return None
+    return today.year - date_of_birth.year - ((today.month, today.day) < (date_of_birth.month, date_of_birth.day))
+
+
+def next_service_dates(client_ids, today=None):
+    """Data do próximo serviço agendado de cada cliente, em uma consulta."""
+    if not client_ids:
+        return {}
+    today = today or date.today()
+    rows = db.session.execute(
+        select(ClientService.client_id, func.min(ClientService.service_date))
+        .where(ClientService.client_id.in_(client_ids), ClientService.service_date >= today)
+        .group_by(ClientService.client_id)
+    )
+    return {client_id: service_date for client_id, service_date in rows}
+
+
+def client_values(client, next_service=None, today=None):
+    """Valores dos marcadores para um cliente."""
+    today = today or date.today()
+    return {
+        'child_name': client.child_name,
+        'parent_name': client.parent1_name,
+        'age': _age(client.child_date_of_birth, today),
+        'next_service_date': next_service.strftime('%d/%m/%Y') if next_service else None,
+    }
+
+
+def lead_values(lead):
+    """Valores dos marcadores para um lead."""
+    return {
+        'child_name': lead.child_name,
+        'parent_name': lead.parent_name,
+        'age': lead.child_age,
+        'service_of_interest': lead.service_of_interest,
+    }
+
+
+def client_whatsapp_links(clients, template):
+    """Links de WhatsApp de uma lista de clientes, renderizados em lote."""
+    if not template:
+        return {}
+    today = date.today()
+    next_services = {}
+    if 'next_service_date' in template.fields:
+        next_services = next_service_dates([client.id for client in clients], today)
+    messages = template.render_many(
+        client_values(client, next_services.get(client.id), today) for client in clients
+    )
+    return {
+        client.id: build_whatsapp_url(client.contact_phone_e164, message)
+        for client, message in zip(clients, messages)
+    }
+
+
+def lead_whatsapp_links(leads, template):
+    """Links de WhatsApp de uma lista de leads, renderizados em lote."""
+    if not template:
+        return {}
+    messages = template.render_many(lead_values(lead) for lead in leads)
+    return {
+        lead.id: build_whatsapp_url(lead.whatsapp_e164, message)
+        for lead, message in zip(leads, messages)
+    }
+
+
+# --- Exportação para ferramentas de disparo em massa ---
+
+def iter_in_batches(query, model, batch_size=1000):
+    """Percorre uma consulta em lotes por chave (id > último), sem OFFSET."""
+    last_id = 0
+    while True:
+        batch = query.filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def broadcast_csv(header, rows):
+    """
+    Gera as linhas de um CSV (UTF-8 com BOM, para abrir no Excel). Textos que
+    começam como fórmula são gravados como texto (nomes vêm do formulário público).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow([spreadsheet_safe(value) for value in row])
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -1,8 +1,12 @@
 # app/models.py
 from app.extensions import db
 from datetime import date, datetime
+from functools import lru_cache
+from flask import current_app, has_app_context
 from flask_login import UserMixin
+from sqlalchemy.orm import validates
 from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils import normalize_phone
 
 # Tabela de associação para a relação Muitos-para-Muitos entre Post e Category
 post_categories = db.Table('post_categories',
@@ -10,6 +14,23 @@ post_categories = db.Table('post_categories',
     db.Column('category_id', db.Integer, db.ForeignKey('category.id'), primary_key=True)
 )
 
+DEFAULT_PASSWORD_HASH_METHOD = 'scrypt'
+
+
+def password_hash_method():
+    if has_app_context():
+        return current_app.config.get('PASSWORD_HASH_METHOD') or DEFAULT_PASSWORD_HASH_METHOD
+    return DEFAULT_PASSWORD_HASH_METHOD
+
+
+@lru_cache(maxsize=8)
+def password_hash_prefix(method):
+    """
+    Prefixo que o werkzeug grava para o método, com os parâmetros completos
+    (ex: 'scrypt' -> 'scrypt:32768:8:1'). Calculado uma vez por processo.
+    """
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
 # app/models.py
 
 class User(UserMixin, db.Model):
@@ -29,12 +50,17 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # Métodos de senha (sem alterações)
+    # Métodos de senha: o hash usa PASSWORD_HASH_METHOD da configuração
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method=password_hash_method())
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """True se o hash foi gerado com outro método/parâmetros que os configurados."""
+        prefix = password_hash_prefix(password_hash_method())
+        return not (self.password_hash or '').startswith(f'{prefix}$')
         
     # ✅ NOVA PROPRIEDADE ADICIONADA
     # Facilita a verificação se o usuário é admin
@@ -74,6 +100,9 @@ class Post(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Listagem dos publicados, do mais novo ao mais antigo, paginada por cursor (app/api)
+    __table_args__ = (db.Index('ix_post_is_published_created_at_id', 'is_published', 'created_at', 'id'),)
+
     def __repr__(self):
         return f'<Post {self.title}>'
 
@@ -107,17 +136,31 @@ class Image(db.Model):
 
 
 
+# Status possíveis de um lead, na ordem do funil de atendimento
+LEAD_STATUSES = ['Novo', 'Contactado', 'Não Atendeu', 'Reagendar', 'Descartado']
+
+
 class Lead(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     parent_name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), nullable=False)
     whatsapp = db.Column(db.String(20), nullable=False)
+    whatsapp_e164 = db.Column(db.String(16), nullable=True, index=True)
     child_name = db.Column(db.String(100), nullable=True)
     child_age = db.Column(db.Integer, nullable=True)
     service_of_interest = db.Column(db.String(50), nullable=False)
     message = db.Column(db.Text, nullable=True)
-    status = db.Column(db.String(50), nullable=False, default='Novo')
+    status = db.Column(db.String(50), nullable=False, default='Novo', index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Cliente cadastrado a partir do lead ou ao qual ele foi vinculado (app/matching.py)
+    client_id = db.Column(db.Integer, db.ForeignKey('client.id', ondelete='SET NULL'), nullable=True, index=True)
+
+    client = db.relationship('Client', backref=db.backref('leads', lazy=True))
+
+    @validates('whatsapp')
+    def _sync_whatsapp_e164(self, key, value):
+        self.whatsapp_e164 = normalize_phone(value)
+        return value
 
     def __repr__(self):
         return f'<Lead {self.parent_name}>'
@@ -176,10 +219,38 @@ class Client(db.Model):
     # Telefone de Contato Principal
     contact_phone = db.Column(db.String(20), nullable=False)
 
+    # Telefones normalizados em E.164 (ex: +5511999990000), preenchidos a
+    # partir dos campos acima para busca exata, deduplicação e links wa.me
+    contact_phone_e164 = db.Column(db.String(16), nullable=True, index=True)
+    parent1_phone_e164 = db.Column(db.String(16), nullable=True, index=True)
+    parent2_phone_e164 = db.Column(db.String(16), nullable=True, index=True)
+
+    # Mês e dia do aniversário como MMDD (ex: 1225), indexado para buscar
+    # aniversariantes de um intervalo de dias com uma única consulta
+    birthday_md = db.Column(db.SmallInteger, nullable=True, index=True)
+
+    # Resumo do histórico de serviços, mantido pelos eventos da sessão em
+    # app/client_activity.py ('flask clients reconcile' corrige diferenças).
+    # A data indexada permite filtrar/ordenar por inatividade sem subconsulta.
+    last_service_date = db.Column(db.Date, nullable=True, index=True)
+    service_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    top_service = db.Column(db.String(150), nullable=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relacionamento com os serviços do cliente
     services = db.relationship('ClientService', backref='client', lazy=True, cascade="all, delete-orphan")
+    birthday_digest_entries = db.relationship('BirthdayDigest', backref='client', lazy=True, cascade="all, delete-orphan")
+
+    @validates('child_date_of_birth')
+    def _sync_birthday_md(self, key, value):
+        self.birthday_md = value.month * 100 + value.day if value else None
+        return value
+
+    @validates('contact_phone', 'parent1_phone', 'parent2_phone')
+    def _sync_phone_e164(self, key, value):
+        setattr(self, f'{key}_e164', normalize_phone(value))
+        return value
 
     # Propriedade para calcular a idade dinamicamente
     @property
@@ -191,6 +262,25 @@ class Client(db.Model):
         age = today.year - self.child_date_of_birth.year - ((today.month, today.day) < (self.child_date_of_birth.month, self.child_date_of_birth.day))
         return age
     
+    def to_dict(self):
+        """Dados do cliente para exportação (planilha)."""
+        return {
+            'Criança': self.child_name,
+            'Data de Nascimento': self.child_date_of_birth,
+            'Responsável 1': self.parent1_name,
+            'Telefone Responsável 1': self.parent1_phone,
+            'Responsável 2': self.parent2_name,
+            'Telefone Responsável 2': self.parent2_phone,
+            'Telefone de Contato': self.contact_phone,
+            'E-mail': self.email,
+            'Rua': self.address_street,
+            'Número': self.address_number,
+            'Bairro': self.address_neighborhood,
+            'Cidade': self.address_city,
+            'CEP': self.address_cep,
+            'Cadastrado em': self.created_at,
+        }
+
     def __repr__(self):
         return f'<Client {self.child_name}>'
 
@@ -221,6 +311,12 @@ class Settings(db.Model):
     footer_whatsapp_link = db.Column(db.String(255), default="#")
     footer_copyright_text = db.Column(db.String(200), default="© Planeta Imaginário. Todos os direitos reservados.")
 
+    # Incrementada pelo SQLAlchemy a cada gravação; usada como chave de cache
+    # das mensagens compiladas (app/messages.py)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    __mapper_args__ = {'version_id_col': version}
+
     def __repr__(self):
         return f'<Settings {self.id}>'
     
@@ -237,6 +333,9 @@ class ClientService(db.Model):
     # Chave estrangeira para linkar com o cliente
     client_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False)
 
+    # Histórico de um cliente (e o resumo em Client) pelo índice, do mais recente ao mais antigo
+    __table_args__ = (db.Index('ix_client_service_client_id_service_date', 'client_id', 'service_date'),)
+
     def __repr__(self):
         return f'<ClientService {self.service_name} for client {self.client_id}>'
     
@@ -245,6 +344,13 @@ class ClientService(db.Model):
 # app/models.py
 
 class HomePageContent(db.Model):
+    """
+    A página inicial: ordem das seções e galeria da Infraestrutura. O conteúdo
+    de cada seção fica em HomePageSection (um documento JSON por seção).
+
+    Tudo isso é o rascunho editado no dashboard; o site exibe a versão
+    publicada apontada por live_release_id (ver HomePageRelease).
+    """
     id = db.Column(db.Integer, primary_key=True)
 
     # ✅ NOVO CAMPO PARA ARMAZENAR A ORDEM
@@ -254,111 +360,60 @@ class HomePageContent(db.Model):
         default='hero,services,values,structure,videos,blog,cta,location',
         server_default='hero,services,values,structure,videos,blog,cta,location'
     )
-    
-    # --- Seção Hero ---
-    show_hero_section = db.Column(db.Boolean, default=True)
-    hero_background_color_from = db.Column(db.String(20), default='#4f46e5')
-    hero_background_color_to = db.Column(db.String(20), default='#f97316')
-    hero_badge_text = db.Column(db.String(200))
-    hero_title = db.Column(db.String(200))
-    hero_subtitle = db.Column(db.Text)
-    hero_whatsapp_button_text = db.Column(db.String(100))
-    hero_whatsapp_button_link = db.Column(db.String(255))
-    hero_highlight_text = db.Column(db.String(200))
-
-    # --- Seção "O que oferecemos" ---
-    show_services_section = db.Column(db.Boolean, default=True)
-    services_section_tagline = db.Column(db.String(100))
-    services_section_title = db.Column(db.String(200))
-    services_section_subtitle = db.Column(db.Text)
-    services_card1_icon = db.Column(db.String(10))
-    services_card1_title = db.Column(db.String(100))
-    services_card1_text = db.Column(db.Text)
-    services_card1_item1 = db.Column(db.String(100))
-    services_card1_item2 = db.Column(db.String(100))
-    services_card1_item3 = db.Column(db.String(100))
-    services_card1_cta_text = db.Column(db.String(50))
-    services_card1_cta_link = db.Column(db.String(255))
-    services_card2_icon = db.Column(db.String(10))
-    services_card2_title = db.Column(db.String(100))
-    services_card2_text = db.Column(db.Text)
-    services_card2_item1 = db.Column(db.String(100))
-    services_card2_item2 = db.Column(db.String(100))
-    services_card2_item3 = db.Column(db.String(100))
-    services_card2_cta_text = db.Column(db.String(50))
-    services_card2_cta_link = db.Column(db.String(255))
-    services_card3_icon = db.Column(db.String(10))
-    services_card3_title = db.Column(db.String(100))
-    services_card3_text = db.Column(db.Text)
-    services_card3_item1 = db.Column(db.String(100))
-    services_card3_item2 = db.Column(db.String(100))
-    services_card3_item3 = db.Column(db.String(100))
-    services_card3_cta_text = db.Column(db.String(50))
-    services_card3_cta_link = db.Column(db.String(255))
-
-    # --- Seção "Por que nos escolher" ---
-    show_values_section = db.Column(db.Boolean, default=True)
-    values_section_tagline = db.Column(db.String(100))
-    values_section_title = db.Column(db.String(200))
-    values_section_subtitle = db.Column(db.Text)
-    values_card1_icon = db.Column(db.String(10))
-    values_card1_title = db.Column(db.String(100))
-    values_card1_text = db.Column(db.Text)
-    values_card2_icon = db.Column(db.String(10))
-    values_card2_title = db.Column(db.String(100))
-    values_card2_text = db.Column(db.Text)
-    values_card3_icon = db.Column(db.String(10))
-    values_card3_title = db.Column(db.String(100))
-    values_card3_text = db.Column(db.Text)
-
-    # --- Seção "Infraestrutura" ---
-    show_structure_section = db.Column(db.Boolean, default=True)
-    structure_section_tagline = db.Column(db.String(100))
-    structure_section_title = db.Column(db.String(200))
-    structure_section_subtitle = db.Column(db.Text)
-    structure_feature1_title = db.Column(db.String(100))
-    structure_feature1_text = db.Column(db.Text)
-    structure_feature2_title = db.Column(db.String(100))
-    structure_feature2_text = db.Column(db.Text)
+
     structure_images = db.relationship('StructureImage', backref='homepage', lazy=True, cascade="all, delete-orphan")
     structure_videos = db.relationship('StructureVideo', backref='homepage', lazy=True, cascade="all, delete-orphan")
 
-    # --- Seção "Diário de bordo" (Blog) ---
-    show_blog_section = db.Column(db.Boolean, default=True)
-    blog_section_tagline = db.Column(db.String(100))
-    blog_section_title = db.Column(db.String(200))
-    blog_section_subtitle = db.Column(db.Text)
-    blog_cta_text = db.Column(db.String(100))
-    
-    # --- Seção CTA Final ---
-    show_cta_section = db.Column(db.Boolean, default=True)
-    cta_title = db.Column(db.String(200))
-    cta_subtitle = db.Column(db.Text)
-    cta_whatsapp_button_text = db.Column(db.String(100))
-    cta_form_button_text = db.Column(db.String(100))
-    
-    # --- Seção "Localização" ---
-    show_location_section = db.Column(db.Boolean, default=True)
-    location_section_tagline = db.Column(db.String(100))
-    location_section_title = db.Column(db.String(200))
-    location_section_subtitle = db.Column(db.Text)
-    location_card_title = db.Column(db.String(100))
-    location_address_title = db.Column(db.String(50))
-    location_address_text = db.Column(db.Text)
-    location_phone_title = db.Column(db.String(50))
-    location_phone_text = db.Column(db.String(50))
-    location_hours_title = db.Column(db.String(50))
-    location_hours_text = db.Column(db.Text)
-    location_gmaps_button_text = db.Column(db.String(50))
-    location_gmaps_link = db.Column(db.String(255))
-    location_image_alt = db.Column(db.String(200))
-
-    # --- Seção "Nossos Vídeos" (NOVA SEÇÃO) ---
-    show_videos_section = db.Column(db.Boolean, default=True)
-    videos_section_title = db.Column(db.String(200))
-    videos_section_video1 = db.Column(db.String(100), nullable=True)
-    videos_section_video2 = db.Column(db.String(100), nullable=True)
-    videos_section_video3 = db.Column(db.String(100), nullable=True)
+    live_release_id = db.Column(db.Integer, db.ForeignKey('home_page_release.id'), nullable=True)
+    live_release = db.relationship('HomePageRelease', foreign_keys=[live_release_id])
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class HomePageSection(db.Model):
+    """
+    Conteúdo de uma seção da homepage ('hero', 'services', ...) como documento
+    JSON. O formato de cada seção é descrito em app/homepage.py; schema_version
+    indica qual versão desse formato o documento segue.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(30), unique=True, nullable=False)
+    is_visible = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
+    schema_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    data = db.Column(db.JSON, nullable=False, default=dict)
+
+    # Incrementada pelo SQLAlchemy a cada gravação; usada como chave do cache
+    # de fragmentos da seção (app/fragments.py)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __mapper_args__ = {'version_id_col': version}
+
+    def __repr__(self):
+        return f'<HomePageSection {self.name} v{self.version}>'
+
+
+class HomePageRelease(db.Model):
+    """
+    Versão publicada da homepage: cópia imutável do rascunho (documentos das
+    seções, ordem e galeria) mais o HTML já renderizado de cada seção. Publicar
+    ou voltar a uma versão anterior só troca HomePageContent.live_release_id.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    section_order = db.Column(db.Text, nullable=False)
+    # {nome: {'is_visible', 'schema_version', 'version', 'data'}}
+    sections = db.Column(db.JSON, nullable=False)
+    # [{'filename', 'caption'}] da galeria da Infraestrutura
+    gallery = db.Column(db.JSON, nullable=False, default=list)
+    # {nome: html} das seções visíveis, menos o blog (muda com os posts)
+    rendered = db.Column(db.JSON, nullable=False, default=dict)
+    note = db.Column(db.String(200), nullable=True)
+    published_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    published_by = db.relationship('User')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<HomePageRelease {self.id}>'
 
 class StructureImage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -414,3 +469,129 @@ class Video(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+
+# Contadores materializados (ex: 'lead_status:Novo'), atualizados de forma
+# incremental para evitar COUNT/GROUP BY a cada carregamento do dashboard.
+class StatCounter(db.Model):
+    key = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<StatCounter {self.key}={self.value}>'
+
+
+# Falhas de login por conta/IP compartilhadas entre os processos
+# (app/login_throttle.py): janela atual, falhas nela e na janela anterior
+class LoginAttemptWindow(db.Model):
+    key = db.Column(db.String(200), primary_key=True)
+    # Número da janela: int(timestamp // LOGIN_WINDOW_SECONDS)
+    window_number = db.Column(db.Integer, nullable=False, index=True)
+    current = db.Column(db.Integer, nullable=False, default=0)
+    previous = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<LoginAttemptWindow {self.key} {self.window_number}: {self.current}/{self.previous}>'
+
+
+# Lista diária de aniversariantes, gerada por 'flask birthdays build' com os
+# links de WhatsApp já prontos. O dashboard apenas lê as linhas do dia.
+class BirthdayDigest(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    digest_date = db.Column(db.Date, nullable=False, index=True)
+    client_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False)
+
+    child_name = db.Column(db.String(150), nullable=False)
+    parent_name = db.Column(db.String(150), nullable=False)
+    contact_phone = db.Column(db.String(20), nullable=False)
+    birthday = db.Column(db.Date, nullable=False, comment="Data do próximo aniversário.")
+    days_until = db.Column(db.Integer, nullable=False)
+    age_turning = db.Column(db.Integer, nullable=False)
+    whatsapp_url = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @property
+    def is_today(self):
+        return self.days_until == 0
+
+    def __repr__(self):
+        return f'<BirthdayDigest {self.digest_date} {self.child_name}>'
+
+
+# Contagens diárias de eventos públicos (impressões e cliques de popups, visitas
+# de landing pages). Acumuladas em memória por app/analytics.py e gravadas em
+# lote; a chave primária já serve de índice para os relatórios por objeto.
+class DailyEventCount(db.Model):
+    kind = db.Column(db.String(30), primary_key=True)
+    object_id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<DailyEventCount {self.kind}:{self.object_id} {self.day}={self.count}>'
+
+
+# Fila de tarefas em segundo plano (app/jobs.py), executadas por 'flask worker'
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, comment="Nome da tarefa registrada em app/jobs.py.")
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    # 'queued', 'running', 'done' ou 'failed'
+    status = db.Column(db.String(20), nullable=False, default='queued', server_default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    max_attempts = db.Column(db.Integer, nullable=False, default=5, server_default='5')
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # A consulta do worker: próximas tarefas na fila por horário
+    __table_args__ = (db.Index('ix_job_status_run_at', 'status', 'run_at'),)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.name} {self.status}>'
+
+
+class Export(db.Model):
+    """Exportação pedida no dashboard, gerada em segundo plano (app/exports.py)."""
+    id = db.Column(db.Integer, primary_key=True)
+    # 'leads', 'clients', 'client_services' ou 'posts'
+    kind = db.Column(db.String(30), nullable=False)
+    # 'csv' (compactado com gzip) ou 'xlsx'
+    format = db.Column(db.String(10), nullable=False)
+    filters = db.Column(db.JSON, nullable=False, default=dict)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id', ondelete='SET NULL'), nullable=True)
+    requested_by_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'), nullable=True)
+    rows_total = db.Column(db.Integer, nullable=True)
+    rows_done = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Arquivo gerado, na pasta EXPORT_FOLDER (None até ficar pronto)
+    filename = db.Column(db.String(120), nullable=True)
+    size = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    job = db.relationship('Job')
+    requested_by = db.relationship('User')
+
+    @property
+    def status(self):
+        """'done' quando o arquivo existe; antes disso, a situação da tarefa."""
+        if self.filename:
+            return 'done'
+        return self.job.status if self.job else 'failed'
+
+    @property
+    def progress(self):
+        """Percentual de linhas gravadas (0 a 100)."""
+        if self.filename:
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(100, int(100 * self.rows_done / self.rows_total))
+
+    def __repr__(self):
+        return f'<Export {self.id} {self.kind}.{self.format}>'
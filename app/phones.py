@@ -0,0 +1,103 @@
+# app/phones.py
+import re
+
+from sqlalchemy import bindparam, or_, select, update
+
+from app.models import Client, Lead
+from app.utils import normalize_phone
+
+# Colunas de telefone em texto livre e suas colunas normalizadas (E.164)
+PHONE_COLUMNS = {
+    Client: (
+        ('contact_phone', 'contact_phone_e164'),
+        ('parent1_phone', 'parent1_phone_e164'),
+        ('parent2_phone', 'parent2_phone_e164'),
+    ),
+    Lead: (
+        ('whatsapp', 'whatsapp_e164'),
+    ),
+}
+
+# Busca com cara de telefone: só dígitos, espaços e + ( ) -
+PHONE_SEARCH = re.compile(r'[\d\s()+-]+')
+
+
+def search_phone(search):
+    """
+    Telefone E.164 de uma busca da listagem, ou None se ela não for só um
+    telefone (ex: um e-mail com dígitos segue para a busca textual).
+    """
+    if not search or not PHONE_SEARCH.fullmatch(search.strip()):
+        return None
+    return normalize_phone(search)
+
+
+def client_phone_filter(phone):
+    """Condição de busca exata (indexada) de um telefone E.164 nos clientes."""
+    return or_(
+        Client.contact_phone_e164 == phone,
+        Client.parent1_phone_e164 == phone,
+        Client.parent2_phone_e164 == phone,
+    )
+
+
+def client_ids_by_phone(phones):
+    """
+    Retorna {telefone_e164: client_id} dos telefones que já pertencem a algum
+    cliente, em uma única consulta sobre as colunas indexadas.
+    """
+    phones = {phone for phone in phones if phone}
+    if not phones:
+        return {}
+    rows = Client.query.with_entities(
+        Client.id, Client.contact_phone_e164, Client.parent1_phone_e164, Client.parent2_phone_e164
+    ).filter(or_(
+        Client.contact_phone_e164.in_(phones),
+        Client.parent1_phone_e164.in_(phones),
+        Client.parent2_phone_e164.in_(phones),
+    )).order_by(Client.id)
+
+    matches = {}
+    for client_id, *client_phones in rows:
+        for phone in client_phones:
+            if phone in phones:
+                matches.setdefault(phone, client_id)
+    return matches
+
+
+def backfill_phones(session, batch_size=1000):
+    """
+    Recalcula as colunas E.164 de clientes e leads a partir do texto livre,
+    em lotes por chave. Grava apenas as linhas divergentes.
+    Retorna {tabela: quantidade de linhas atualizadas}.
+    """
+    updated = {}
+    for model, columns in PHONE_COLUMNS.items():
+        table = model.__table__
+        raw_columns = [table.c[raw] for raw, _ in columns]
+        e164_columns = [table.c[e164] for _, e164 in columns]
+        stmt = update(table).where(table.c.id == bindparam('row_id')).values(
+            {e164: bindparam(e164) for _, e164 in columns}
+        )
+
+        total = 0
+        last_id = 0
+        while True:
+            rows = session.execute(
+                select(table.c.id, *raw_columns, *e164_columns)
+                .where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            changes = []
+            for row in rows:
+                values = {e164: normalize_phone(getattr(row, raw)) for raw, e164 in columns}
+                if any(getattr(row, e164) != value for e164, value in values.items()):
+                    changes.append({'row_id': row.id, **values})
+            if changes:
+                session.execute(stmt, changes)
+                total += len(changes)
+            last_id = rows[-1].id
+        session.commit()
+        updated[table.name] = total
+    return updated
@@ -0,0 +1,193 @@
+# app/reports.py
+"""
+Relatórios do dashboard (leads, aniversários e serviços) calculados com pandas.
+
+Cada conjunto de dados vem de uma única consulta só com as colunas usadas e
+vira um DataFrame (textos repetidos como 'category'); as contas são feitas de
+forma vetorizada (groupby por período, value_counts, np.bincount), sem laço
+em Python por linha. As funções de agregação recebem o DataFrame pronto e são
+as mesmas medidas em benchmarks/reports.py.
+
+Os resultados ficam em cache por processo (VersionedCache, com idade máxima
+REPORTS_CACHE_SECONDS), chaveados pela versão das tabelas envolvidas:
+contadores 'version:table:<tabela>' mantidos por track_versions (app/stats.py)
+para leads, clientes e serviços. Os contadores de todas as tabelas são lidos
+em uma consulta por página.
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Lead, Client, ClientService
+from app.stats import VERSION_PREFIX, VersionedCache, read_counters, track_versions
+
+TABLE_VERSION_PREFIX = f'{VERSION_PREFIX}table:'
+
+DEFAULT_CACHE_SECONDS = 300
+
+# Tabelas versionadas (nome usado na chave do contador)
+TRACKED_MODELS = {Lead: 'lead', Client: 'client', ClientService: 'client_service'}
+
+# Agrupamentos de leads por período: (rótulo, frequência do pandas). A semana
+# começa na segunda-feira e é rotulada por ela.
+FREQUENCIES = {'day': ('Dia', 'D'), 'week': ('Semana', 'W-MON')}
+LEAD_DIMENSIONS = {'service_of_interest': 'Serviço de Interesse', 'status': 'Status'}
+PERIOD_DAYS = (30, 90, 180, 365)
+
+# Meses do gráfico de serviços
+SERVICE_MONTHS = 12
+
+MONTH_NAMES = ('Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 'Julho',
+               'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro')
+
+EMPTY_LABEL = 'Não informado'
+
+_cache = VersionedCache('REPORTS_CACHE_SECONDS', DEFAULT_CACHE_SECONDS)
+
+# Invalida os relatórios das tabelas, para escritas feitas fora do ORM
+bump_table_versions = track_versions(TABLE_VERSION_PREFIX, TRACKED_MODELS)
+
+
+# --- Versões e cache ---
+
+def table_versions():
+    """{tabela: versão} das tabelas versionadas (ausente vale 0)."""
+    versions = read_counters(db.session.connection(), TABLE_VERSION_PREFIX)
+    return {name: versions.get(name, 0) for name in TRACKED_MODELS.values()}
+
+
+def clear_cache():
+    _cache.clear()
+
+
+# --- Leitura colunar ---
+
+def _frame(stmt, columns, categories=()):
+    frame = pd.DataFrame(db.session.execute(stmt).all(), columns=list(columns))
+    for column in categories:
+        frame[column] = frame[column].fillna(EMPTY_LABEL).astype('category')
+    return frame
+
+
+def leads_frame(start):
+    """Leads recebidos desde 'start': created_at, service_of_interest, status."""
+    columns = ('created_at', 'service_of_interest', 'status')
+    stmt = select(Lead.created_at, Lead.service_of_interest, Lead.status).where(
+        Lead.created_at >= datetime.combine(start, datetime.min.time()))
+    frame = _frame(stmt, columns, categories=columns[1:])
+    frame['created_at'] = pd.to_datetime(frame['created_at'])
+    return frame
+
+
+def birthday_values():
+    """birthday_md (MMDD) de todos os clientes com data de nascimento, como array."""
+    values = db.session.scalars(select(Client.birthday_md).where(Client.birthday_md.isnot(None))).all()
+    return np.fromiter(values, dtype=np.int16, count=len(values))
+
+
+def services_frame():
+    """Todos os serviços prestados: service_name, service_date."""
+    frame = _frame(select(ClientService.service_name, ClientService.service_date),
+                   ('service_name', 'service_date'), categories=('service_name',))
+    frame['service_date'] = pd.to_datetime(frame['service_date'])
+    return frame
+
+
+# --- Agregações (vetorizadas, sobre os DataFrames) ---
+
+def lead_counts(frame, frequency, by, start, end):
+    """
+    Tabela período x valor de 'by' com a quantidade de leads, incluindo os
+    períodos sem nenhum lead entre 'start' e 'end'.
+    """
+    # Agrupar pelo dia truncado é bem mais rápido que pd.Grouper(freq=...)
+    # com muitas linhas; a semana é o dia recuado até a segunda-feira
+    periods = frame['created_at'].dt.floor('D')
+    first = pd.Timestamp(start)
+    if frequency == 'week':
+        periods = periods - pd.to_timedelta(periods.dt.dayofweek, unit='D')
+        first -= pd.Timedelta(days=start.weekday())
+    counts = frame.groupby([periods, by], observed=True).size().unstack(fill_value=0)
+    counts = counts.reindex(pd.date_range(first, end, freq=FREQUENCIES[frequency][1]), fill_value=0)
+    # Colunas em ordem decrescente de volume
+    return counts[counts.sum().sort_values(ascending=False).index].astype('int64')
+
+
+def birthday_months(values):
+    """Quantidade de aniversariantes em cada mês (array com 12 posições)."""
+    return np.bincount(values // 100, minlength=13)[1:13]
+
+
+def service_volume(frame):
+    """Quantidade de cada serviço, do mais ao menos prestado."""
+    return frame['service_name'].value_counts()
+
+
+def service_months(frame, start):
+    """Tabela mês x serviço a partir do mês de 'start'."""
+    recent = frame[frame['service_date'] >= pd.Timestamp(start)]
+    months = pd.Series(recent['service_date'].to_numpy().astype('datetime64[M]'), index=recent.index)
+    counts = recent.groupby([months, 'service_name'], observed=True).size().unstack(fill_value=0)
+    return counts.reindex(pd.date_range(start, periods=SERVICE_MONTHS, freq='MS'), fill_value=0).astype('int64')
+
+
+# --- Relatórios prontos para o template ---
+
+def _table(counts, label):
+    """DataFrame período x coluna -> dicionário simples para o template."""
+    columns = [str(column) for column in counts.columns]
+    totals = counts.sum(axis=1).tolist()
+    return {
+        'columns': columns,
+        'rows': [(label(period), values, total)
+                 for period, values, total in zip(counts.index, counts.to_numpy().tolist(), totals)],
+        'column_totals': counts.sum().tolist(),
+        'total': int(sum(totals)),
+        'max_total': max(totals, default=0),
+    }
+
+
+def leads_report(frequency='day', by='status', days=90, versions=None, today=None):
+    today = today or date.today()
+    start = today - timedelta(days=days - 1)
+    versions = versions if versions is not None else table_versions()
+
+    def compute():
+        counts = lead_counts(leads_frame(start), frequency, by, start, today)
+        if frequency == 'week':
+            return _table(counts, lambda period: f'{period:%d/%m/%Y}')
+        return _table(counts, lambda period: f'{period:%d/%m}')
+
+    return _cache.get(('leads', frequency, by, days), (versions['lead'], today), compute)
+
+
+def birthdays_report(versions=None):
+    versions = versions if versions is not None else table_versions()
+
+    def compute():
+        months = birthday_months(birthday_values()).tolist()
+        return {'months': list(zip(MONTH_NAMES, months)), 'total': sum(months), 'max': max(months)}
+
+    return _cache.get(('birthdays',), versions['client'], compute)
+
+
+def services_report(versions=None, today=None):
+    today = today or date.today()
+    start = (pd.Timestamp(today).to_period('M') - (SERVICE_MONTHS - 1)).to_timestamp().date()
+    versions = versions if versions is not None else table_versions()
+
+    def compute():
+        frame = services_frame()
+        volume = service_volume(frame)
+        return {
+            'volume': list(zip(volume.index.astype(str), volume.tolist())),
+            'total': int(volume.sum()),
+            'max': int(volume.max()) if len(volume) else 0,
+            'months': _table(service_months(frame, start), lambda period: f'{period:%m/%Y}'),
+        }
+
+    return _cache.get(('services', start), versions['client_service'], compute)
+
@@ -0,0 +1,339 @@
+# app/stats.py
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import date, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, event, inspect, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import StatCounter, Lead, Client, Post, LandingPage
+
+# Prefixos das chaves de contadores
+LEAD_STATUS_PREFIX = 'lead_status:'
+CLIENT_BIRTHDAY_PREFIX = 'client_birthday:'
+# Contadores de versão (ex: cache de fragmentos), que não podem ser recalculados
+# a partir das tabelas e por isso são preservados pelo rebuild
+VERSION_PREFIX = 'version:'
+
+
+def lead_status_key(status):
+    """Retorna a chave do contador de leads para um status."""
+    return f'{LEAD_STATUS_PREFIX}{status}'
+
+
+def birthday_key(day):
+    """Retorna a chave do contador de aniversariantes de um dia (MM-DD)."""
+    return f'{CLIENT_BIRTHDAY_PREFIX}{day:%m-%d}'
+
+
+# --- Definição dos contadores por modelo ---
+# Cada função recebe os valores das colunas monitoradas e retorna as chaves
+# às quais o registro soma 1. A mesma função é usada nos eventos da sessão
+# e no comando de reconstrução, garantindo que os dois caminhos concordem.
+
+def _lead_keys(values):
+    return [lead_status_key(values['status'])]
+
+def _client_keys(values):
+    keys = ['client:total']
+    if values['child_date_of_birth']:
+        keys.append(birthday_key(values['child_date_of_birth']))
+    return keys
+
+def _post_keys(values):
+    keys = ['post:total']
+    if values['is_published']:
+        keys.append('post:published')
+    return keys
+
+def _landing_page_keys(values):
+    keys = ['landing_page:total']
+    if values['is_published']:
+        keys.append('landing_page:published')
+    return keys
+
+COUNTED_MODELS = {
+    Lead: (('status',), _lead_keys),
+    Client: (('child_date_of_birth',), _client_keys),
+    Post: (('is_published',), _post_keys),
+    LandingPage: (('is_published',), _landing_page_keys),
+}
+
+
+# --- Leitura e escrita dos contadores ---
+
+def apply_deltas(connection, deltas):
+    """
+    Soma os deltas informados ({chave: delta}) aos contadores, na mesma
+    transação da conexão recebida. Cria o contador se ele ainda não existir.
+    """
+    table = StatCounter.__table__
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        result = connection.execute(
+            update(table).where(table.c.key == key).values(value=table.c.value + delta)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(key=key, value=delta))
+
+
+def read_counters(connection, prefix):
+    """Lê todos os contadores de um prefixo como {sufixo: valor}."""
+    table = StatCounter.__table__
+    rows = connection.execute(
+        select(table.c.key, table.c.value).where(table.c.key.startswith(prefix))
+    )
+    return {key[len(prefix):]: value for key, value in rows}
+
+
+def read_keys(connection, keys):
+    """Lê os contadores informados; chaves inexistentes valem 0."""
+    table = StatCounter.__table__
+    values = dict.fromkeys(keys, 0)
+    rows = connection.execute(
+        select(table.c.key, table.c.value).where(table.c.key.in_(list(keys)))
+    )
+    values.update({key: value for key, value in rows})
+    return values
+
+
+# --- Contadores de versão e cache por processo ---
+
+def track_versions(prefix, models, affects=None):
+    """
+    Mantém os contadores '<prefix><nome>' das versões dos dados: a cada flush
+    que mexe em um dos modelos ({modelo: nome}), o nome soma 1, na mesma
+    transação. 'affects(obj)' pode filtrar os registros que contam.
+
+    Retorna bump(connection, *nomes), para escritas feitas fora do ORM.
+    """
+    info_key = f'changed_versions:{prefix}'
+
+    def bump(connection, *names):
+        apply_deltas(connection, {f'{prefix}{name}': 1 for name in names})
+
+    def collect(session, flush_context, instances):
+        names = {models[type(obj)] for obj in (*session.new, *session.dirty, *session.deleted)
+                 if type(obj) in models and (affects is None or affects(obj))}
+        if names:
+            session.info.setdefault(info_key, set()).update(names)
+
+    def apply(session, flush_context):
+        names = session.info.pop(info_key, None)
+        if names:
+            bump(session.connection(), *sorted(names))
+
+    def discard(session):
+        session.info.pop(info_key, None)
+
+    event.listen(Session, 'before_flush', collect)
+    event.listen(Session, 'after_flush', apply)
+    event.listen(Session, 'after_rollback', discard)
+    return bump
+
+
+class VersionedCache:
+    """
+    Valores calculados a partir do banco, em memória e por processo, válidos
+    enquanto a versão informada (contadores de track_versions) não muda.
+
+    config[ttl_setting] limita a idade de um valor, cobrindo escritas que não
+    passam pela sessão e não avisam (ex: SQL manual); config[size_setting], se
+    informado, o número de valores guardados (saem os usados há mais tempo).
+    """
+
+    def __init__(self, ttl_setting, default_ttl, size_setting=None, default_size=None):
+        self.ttl_setting = ttl_setting
+        self.default_ttl = default_ttl
+        self.size_setting = size_setting
+        self.default_size = default_size
+        # {chave: (versão, expira_em, valor)}, do uso mais antigo ao mais recente
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, compute):
+        """
+        Valor do cache se a versão bate e ainda não expirou; senão chama
+        'compute' e guarda o resultado (None não é guardado).
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version and entry[1] > now:
+                self._entries.move_to_end(key)
+                return entry[2]
+
+        value = compute()
+        if value is None:
+            return None
+        config = current_app.config
+        with self._lock:
+            self._entries[key] = (version, now + config.get(self.ttl_setting, self.default_ttl), value)
+            self._entries.move_to_end(key)
+            if self.size_setting:
+                while len(self._entries) > config.get(self.size_setting, self.default_size):
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def lead_funnel(connection):
+    """Retorna a contagem de leads por status a partir dos contadores."""
+    return read_counters(connection, LEAD_STATUS_PREFIX)
+
+
+def upcoming_birthday_keys(start, days):
+    """Chaves dos dias de aniversário entre 'start' e 'start + days' (inclusive)."""
+    keys = set()
+    for offset in range(days + 1):
+        day = start + timedelta(days=offset)
+        keys.add(birthday_key(day))
+        # Em anos não bissextos, quem nasceu em 29/02 comemora junto com o dia 28/02
+        if day.month == 2 and day.day == 28:
+            keys.add(f'{CLIENT_BIRTHDAY_PREFIX}02-29')
+    return keys
+
+
+def count_upcoming_birthdays(connection, days, start=None):
+    """Soma os contadores de aniversariantes da janela de notificação."""
+    start = start or date.today()
+    return sum(read_keys(connection, upcoming_birthday_keys(start, days)).values())
+
+
+# --- Manutenção incremental via eventos da sessão ---
+
+def _values_before_flush(obj, columns):
+    """Valores das colunas monitoradas como estavam no banco antes do flush."""
+    state = inspect(obj)
+    values = {}
+    for column in columns:
+        history = state.attrs[column].history
+        if history.deleted:
+            values[column] = history.deleted[0]
+        elif history.unchanged:
+            values[column] = history.unchanged[0]
+        else:
+            # Valor antigo não carregado; 'flask stats rebuild' corrige a diferença
+            return None
+    return values
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+def load_previous_value(attribute):
+    """
+    Com active_history, o SQLAlchemy carrega o valor antigo da coluna mesmo
+    quando o objeto estava expirado (ex: após um commit), para que o
+    before_flush sempre saiba o que mudou.
+    """
+    event.listen(attribute, 'set', _keep_previous_value, active_history=True, retval=True)
+
+
+for _model, (_columns, _) in COUNTED_MODELS.items():
+    for _column in _columns:
+        load_previous_value(getattr(_model, _column))
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_removed_counts(session, flush_context, instances):
+    """
+    Antes do flush, registra o que os registros alterados e excluídos
+    deixam de contar (ainda com acesso aos valores antigos).
+    """
+    deltas = session.info.setdefault('stat_deltas', Counter())
+    pending = session.info.setdefault('stat_pending_updates', [])
+
+    for obj in session.deleted:
+        spec = COUNTED_MODELS.get(type(obj))
+        if spec is None:
+            continue
+        columns, keys_for = spec
+        for key in keys_for({column: getattr(obj, column) for column in columns}):
+            deltas[key] -= 1
+
+    for obj in session.dirty:
+        spec = COUNTED_MODELS.get(type(obj))
+        if spec is None or not session.is_modified(obj):
+            continue
+        columns, keys_for = spec
+        old_values = _values_before_flush(obj, columns)
+        if old_values is None:
+            continue
+        for key in keys_for(old_values):
+            deltas[key] -= 1
+        pending.append(obj)
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_counts(session, flush_context):
+    """
+    Após o flush (com os defaults das colunas já aplicados), soma os novos
+    registros e os novos valores dos alterados, gravando tudo na mesma transação.
+    """
+    deltas = session.info.pop('stat_deltas', Counter())
+    pending = session.info.pop('stat_pending_updates', [])
+
+    for obj in list(session.new) + pending:
+        spec = COUNTED_MODELS.get(type(obj))
+        if spec is None:
+            continue
+        columns, keys_for = spec
+        for key in keys_for({column: getattr(obj, column) for column in columns}):
+            deltas[key] += 1
+
+    if any(deltas.values()):
+        apply_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_counts(session):
+    """Descarta deltas coletados de um flush que não chegou a ser gravado."""
+    session.info.pop('stat_deltas', None)
+    session.info.pop('stat_pending_updates', None)
+
+
+# --- Reconstrução completa ---
+
+def compute_counters(session, batch_size=1000):
+    """Recalcula todos os contadores varrendo as tabelas monitoradas."""
+    counts = Counter()
+    for model, (columns, keys_for) in COUNTED_MODELS.items():
+        stmt = select(*(getattr(model, column) for column in columns))
+        for row in session.execute(stmt.execution_options(yield_per=batch_size)):
+            counts.update(keys_for(row._asdict()))
+    return counts
+
+
+def rebuild_counters(session):
+    """
+    Substitui os contadores pelos valores recalculados, numa única transação.
+    Retorna {chave: (valor_antigo, valor_novo)} das chaves que estavam divergentes.
+    """
+    counts = compute_counters(session)
+    table = StatCounter.__table__
+    connection = session.connection()
+
+    rebuilt = ~table.c.key.startswith(VERSION_PREFIX)
+
+    current = dict(connection.execute(select(table.c.key, table.c.value).where(rebuilt)).all())
+    drift = {
+        key: (current.get(key, 0), counts.get(key, 0))
+        for key in set(current) | set(counts)
+        if current.get(key, 0) != counts.get(key, 0)
+    }
+
+    connection.execute(delete(table).where(rebuilt))
+    if counts:
+        connection.execute(insert(table), [
+            {'key': key, 'value': value} for key, value in counts.items()
+        ])
+    session.commit()
+    return drift
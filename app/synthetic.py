@@ -0,0 +1,302 @@
+# app/synthetic.py
+"""
+Geração de dados sintéticos em grande volume (clientes, serviços, leads,
+posts com galerias, landing pages e usuários) para testes de desempenho.
+
+As linhas são gravadas com INSERTs em lote do SQLAlchemy Core. Como o Core
+não passa pelos validadores e eventos do ORM, as colunas derivadas
+(birthday_md, *_e164) são calculadas aqui e os contadores do dashboard são
+reconstruídos ao final. Com a mesma semente, o conteúdo gerado é o mesmo.
+"""
+import os
+import random
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, insert, select, text
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import (
+    User, Client, ClientService, Lead, Post, Category, Image, Video,
+    LandingPage, LEAD_STATUSES, post_categories
+)
+from app.stats import rebuild_counters
+from app.client_activity import reconcile as reconcile_activity
+from app.reports import bump_table_versions
+from app.api.cache import bump_content_versions
+from app.feeds import feeds_folder, invalidate as invalidate_feeds
+from app.fragments import bump_blog_section
+from app.freeze import ALL, refreeze
+from app.utils import normalize_phone
+
+DEFAULT_SCALE = {
+    'clients': 100_000,
+    'services_per_client': 3,
+    'leads': 50_000,
+    'posts': 2_000,
+    'images_per_post': 6,
+    'videos_per_post': 1,
+    'categories': 12,
+    'landing_pages': 50,
+    'users': 10,
+}
+
+FIRST_NAMES = ['Ana', 'Bruno', 'Carla', 'Davi', 'Elisa', 'Felipe', 'Gabriela', 'Heitor',
+               'Isabela', 'João', 'Laura', 'Miguel', 'Nina', 'Otávio', 'Pietra', 'Rafael',
+               'Sofia', 'Theo', 'Valentina', 'Arthur', 'Helena', 'Lorenzo', 'Alice', 'Benício']
+LAST_NAMES = ['Silva', 'Souza', 'Oliveira', 'Santos', 'Pereira', 'Lima', 'Costa', 'Ferreira',
+              'Rodrigues', 'Almeida', 'Nascimento', 'Araújo', 'Ribeiro', 'Carvalho', 'Gomes']
+NEIGHBORHOODS = ['Centro', 'Anhangabaú', 'Vila Arens', 'Eloy Chaves', 'Medeiros', 'Engordadouro']
+SERVICES = ['Festa de Aniversário', 'Passaporte / Hora Avulsa', 'Colônia de Férias', 'Oficina']
+LOREM = ('Diversão, brincadeiras e muita imaginação para as crianças. '
+         'Espaço seguro, monitores treinados e festas temáticas inesquecíveis. ')
+
+# Senha de todos os usuários sintéticos (o hash é calculado uma única vez)
+SYNTHETIC_PASSWORD = 'sintetico123'
+
+
+def _name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def _phone(rng):
+    return f'(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}'
+
+
+def _next_id(model):
+    """Próximo id livre da tabela, para gerar ids explícitos sem colisão."""
+    return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _insert_batches(table, rows, batch_size):
+    """Grava as linhas geradas em lotes de 'batch_size'. Retorna o total gravado."""
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+# --- Geradores de linhas ---
+
+def _client_rows(rng, first_id, count, today):
+    for client_id in range(first_id, first_id + count):
+        birth = today - timedelta(days=rng.randint(365, 12 * 365))
+        contact_phone = _phone(rng)
+        parent2_phone = _phone(rng) if rng.random() < 0.4 else None
+        yield {
+            'id': client_id,
+            'child_name': _name(rng),
+            'child_date_of_birth': birth,
+            'birthday_md': birth.month * 100 + birth.day,
+            'parent1_name': _name(rng),
+            'parent1_phone': contact_phone,
+            'parent1_phone_e164': normalize_phone(contact_phone),
+            'parent2_name': _name(rng) if parent2_phone else None,
+            'parent2_phone': parent2_phone,
+            'parent2_phone_e164': normalize_phone(parent2_phone),
+            'contact_phone': contact_phone,
+            'contact_phone_e164': normalize_phone(contact_phone),
+            'email': f'cliente{client_id}@example.com',
+            'address_street': f'Rua {rng.choice(LAST_NAMES)}',
+            'address_number': str(rng.randint(1, 2000)),
+            'address_neighborhood': rng.choice(NEIGHBORHOODS),
+            'address_city': 'Jundiaí',
+            'address_cep': f'13{rng.randint(200, 219)}-{rng.randint(0, 999):03d}',
+            'created_at': datetime.utcnow() - timedelta(days=rng.randint(0, 900)),
+        }
+
+
+def _service_rows(rng, first_client_id, clients, per_client, today):
+    for client_id in range(first_client_id, first_client_id + clients):
+        for _ in range(rng.randint(0, per_client * 2)):
+            yield {
+                'client_id': client_id,
+                'service_name': rng.choice(SERVICES),
+                'service_date': today + timedelta(days=rng.randint(-700, 60)),
+                'observation': None,
+                'created_at': datetime.utcnow(),
+            }
+
+
+def _lead_rows(rng, count):
+    for index in range(count):
+        whatsapp = _phone(rng)
+        yield {
+            'parent_name': _name(rng),
+            'email': f'lead{rng.randrange(10**9)}@example.com',
+            'whatsapp': whatsapp,
+            'whatsapp_e164': normalize_phone(whatsapp),
+            'child_name': _name(rng),
+            'child_age': rng.randint(1, 12),
+            'service_of_interest': rng.choice(SERVICES),
+            'message': LOREM,
+            'status': rng.choice(LEAD_STATUSES),
+            'created_at': datetime.utcnow() - timedelta(minutes=rng.randint(0, 500_000)),
+        }
+
+
+def _post_rows(rng, first_id, count, user_ids, cover_images):
+    for offset, post_id in enumerate(range(first_id, first_id + count)):
+        created = datetime.utcnow() - timedelta(hours=offset)
+        yield {
+            'id': post_id,
+            'title': f'Post sintético {post_id}',
+            'slug': f'post-sintetico-{post_id}',
+            'content': f'<p>{LOREM * rng.randint(5, 30)}</p>',
+            'cover_image': rng.choice(cover_images),
+            'user_id': rng.choice(user_ids) if user_ids else None,
+            'meta_description': LOREM[:150],
+            'is_published': rng.random() < 0.9,
+            'created_at': created,
+            'updated_at': created,
+        }
+
+
+# --- Mídia de exemplo ---
+
+def _placeholder_png(rgb, size=64):
+    """PNG de uma cor só, gerado sem dependências externas."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    row = b'\x00' + bytes(rgb) * size
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(row * size))
+            + chunk(b'IEND', b''))
+
+
+def generate_media(upload_folder, seed, count, workers=8):
+    """
+    Grava 'count' imagens de exemplo em paralelo na pasta de uploads.
+    Retorna a lista de nomes de arquivo (as linhas geradas os reutilizam em rodízio).
+    """
+    os.makedirs(upload_folder, exist_ok=True)
+    rng = random.Random(seed)
+    files = [(f'synthetic_{seed}_{index}.png', (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+             for index in range(count)]
+
+    def write(item):
+        filename, rgb = item
+        path = os.path.join(upload_folder, filename)
+        if not os.path.exists(path):
+            with open(path, 'wb') as media_file:
+                media_file.write(_placeholder_png(rgb))
+        return filename
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(write, files))
+
+
+# --- Geração ---
+
+def generate(scale=None, seed=42, batch_size=5000, media_files=None, echo=print):
+    """
+    Acrescenta dados sintéticos ao banco atual (requer app context), sem
+    apagar o que já existe. Retorna {tabela: linhas gravadas}.
+    'media_files' é a lista de arquivos usados nas imagens (padrão: default.jpg).
+    """
+    scale = {**DEFAULT_SCALE, **(scale or {})}
+    rng = random.Random(seed)
+    today = date.today()
+    images = media_files or ['default.jpg']
+    totals = {}
+
+    echo(f"   usuários: {scale['users']}")
+    first_user = _next_id(User)
+    password_hash = generate_password_hash(SYNTHETIC_PASSWORD)
+    totals['user'] = _insert_batches(User.__table__, (
+        {'id': user_id, 'username': f'sintetico{user_id}', 'email': f'sintetico{user_id}@example.com',
+         'password_hash': password_hash, 'role': 'colaborador', 'is_approved': True,
+         'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow()}
+        for user_id in range(first_user, first_user + scale['users'])
+    ), batch_size)
+    user_ids = list(range(first_user, first_user + scale['users']))
+
+    echo(f"   clientes: {scale['clients']}")
+    first_client = _next_id(Client)
+    totals['client'] = _insert_batches(
+        Client.__table__, _client_rows(rng, first_client, scale['clients'], today), batch_size)
+    totals['client_service'] = _insert_batches(ClientService.__table__, _service_rows(
+        rng, first_client, scale['clients'], scale['services_per_client'], today), batch_size)
+
+    echo(f"   leads: {scale['leads']}")
+    totals['lead'] = _insert_batches(Lead.__table__, _lead_rows(rng, scale['leads']), batch_size)
+
+    echo(f"   posts: {scale['posts']}")
+    first_category = _next_id(Category)
+    category_ids = list(range(first_category, first_category + scale['categories']))
+    totals['category'] = _insert_batches(Category.__table__, (
+        {'id': category_id, 'name': f'Categoria {category_id}', 'slug': f'categoria-sintetica-{category_id}',
+         'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow()}
+        for category_id in category_ids
+    ), batch_size)
+
+    first_post = _next_id(Post)
+    post_ids = range(first_post, first_post + scale['posts'])
+    totals['post'] = _insert_batches(
+        Post.__table__, _post_rows(rng, first_post, scale['posts'], user_ids, images), batch_size)
+    if category_ids:
+        totals['post_categories'] = _insert_batches(post_categories, (
+            {'post_id': post_id, 'category_id': category_id}
+            for post_id in post_ids
+            for category_id in rng.sample(category_ids, min(2, len(category_ids)))
+        ), batch_size)
+    totals['image'] = _insert_batches(Image.__table__, (
+        {'post_id': post_id, 'filename': rng.choice(images), 'caption': f'Foto {n + 1}',
+         'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow()}
+        for post_id in post_ids
+        for n in range(scale['images_per_post'])
+    ), batch_size)
+    totals['video'] = _insert_batches(Video.__table__, (
+        {'post_id': post_id, 'filename': 'video.mp4', 'caption': f'Vídeo {n + 1}',
+         'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow()}
+        for post_id in post_ids
+        for n in range(scale['videos_per_post'])
+    ), batch_size)
+
+    echo(f"   landing pages: {scale['landing_pages']}")
+    first_page = _next_id(LandingPage)
+    totals['landing_page'] = _insert_batches(LandingPage.__table__, (
+        {'id': page_id, 'title': f'Campanha {page_id}', 'slug': f'campanha-sintetica-{page_id}',
+         'is_published': True, 'hero_title': f'Campanha {page_id}', 'hero_subtitle': LOREM,
+         'hero_image': rng.choice(images), 'hero_cta_text': 'Saiba mais', 'hero_cta_link': '/contato',
+         'content_title': 'Sobre', 'content_body': f'<p>{LOREM * 10}</p>',
+         'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow()}
+        for page_id in range(first_page, first_page + scale['landing_pages'])
+    ), batch_size)
+
+    _reset_sequences((User, Client, Category, Post, LandingPage))
+    bump_table_versions(db.session.connection(), 'lead', 'client', 'client_service')
+    bump_content_versions(db.session.connection(), 'posts', 'landing_pages')
+    bump_blog_section(db.session.connection())
+    db.session.commit()
+    # Posts e landing pages publicados: sitemap/feed e todas as páginas congeladas (menu)
+    invalidate_feeds(feeds_folder())
+    refreeze(current_app._get_current_object(), {ALL})
+    rebuild_counters(db.session)
+    reconcile_activity(db.session)
+    return totals
+
+
+def _reset_sequences(models):
+    """No Postgres, avança as sequências das tabelas gravadas com id explícito."""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for model in models:
+        table = model.__table__.name
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), (SELECT MAX(id) FROM \"{table}\"))"
+        ))
@@ -1,43 +1,39 @@
 # app/utils.py
 import os
 import secrets
+from urllib.parse import quote
 from flask import current_app
 from werkzeug.utils import secure_filename
 
 def delete_file_from_uploads(filename):
     """
-    Exclui um arquivo da pasta de UPLOAD_FOLDER se ele existir
-    e não for o 'default.jpg'.
+    Agenda a exclusão de um arquivo da pasta UPLOAD_FOLDER (exceto 'default.jpg').
+    O arquivo é apagado pelo 'flask worker' depois do commit da transação
+    atual (app/media.py), sem atrasar a resposta.
     """
     if not filename or filename == 'default.jpg':
         return
-    try:
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-        if os.path.exists(file_path):
-            os.remove(file_path)
-    except Exception as e:
-        # É uma boa prática logar esse erro em um sistema real
-        print(f"Erro ao deletar o arquivo {filename}: {e}")
+    from app.media import schedule_deletion
+    schedule_deletion(filename)
 
-def save_picture(form_picture_data):
-    random_hex = secrets.token_hex(8)
+def picture_filename(form_picture_data):
+    """Nome aleatório com a extensão original, usado ao gravar uma imagem enviada."""
     _, f_ext = os.path.splitext(form_picture_data.filename)
-    picture_fn = random_hex + f_ext
+    return secrets.token_hex(8) + f_ext
 
-    upload_folder = current_app.config['UPLOAD_FOLDER']
-    picture_path = os.path.join(upload_folder, picture_fn)
+def video_filename(form_video_data):
+    """Nome aleatório seguido do nome original (sanitizado), usado ao gravar um vídeo."""
+    return secrets.token_hex(8) + '_' + secure_filename(form_video_data.filename)
 
-    # LOG para debug
-    print(f"📁 SALVANDO IMAGEM EM: {picture_path}")
-    print(f"📁 UPLOAD_FOLDER configurado: {upload_folder}")
-    print(f"📁 Pasta existe? {os.path.exists(upload_folder)}")
-    
+def save_picture(form_picture_data):
+    """
+    Salva uma imagem do formulário na pasta UPLOAD_FOLDER
+    e retorna o nome do arquivo. Para várias de uma vez, use app.media.ingest_uploads.
+    """
+    picture_fn = picture_filename(form_picture_data)
+    upload_folder = current_app.config['UPLOAD_FOLDER']
     os.makedirs(upload_folder, exist_ok=True)
-    form_picture_data.save(picture_path)
-    
-    # Verifica se foi salvo
-    print(f"✅ Imagem salva? {os.path.exists(picture_path)}")
-    
+    form_picture_data.save(os.path.join(upload_folder, picture_fn))
     return picture_fn
 
 def save_video(form_video_data):
@@ -45,18 +41,62 @@ def save_video(form_video_data):
     Salva um vídeo do formulário na pasta UPLOAD_FOLDER
     e retorna o nome do arquivo.
     """
-    random_hex = secrets.token_hex(8)
-    video_fn = secure_filename(form_video_data.filename)
-    video_name = random_hex + '_' + video_fn
-    
+    video_name = video_filename(form_video_data)
     upload_folder = current_app.config['UPLOAD_FOLDER']
-    video_path = os.path.join(upload_folder, video_name)
-    
     os.makedirs(upload_folder, exist_ok=True)
-    
-    form_video_data.save(video_path)
+    form_video_data.save(os.path.join(upload_folder, video_name))
     return video_name
 
+def normalize_phone(phone, default_country='55'):
+    """
+    Normaliza um telefone digitado livremente para o formato E.164
+    (ex: '(11) 99999-0000' -> '+5511999990000').
+    Números sem código de país são tratados como brasileiros (DDD + número).
+    Retorna None se o texto não contiver um telefone válido.
+    """
+    if not phone:
+        return None
+    digits = ''.join(filter(str.isdigit, phone))
+    stripped = phone.strip()
+    if stripped.startswith('+'):
+        number = digits
+    elif stripped.startswith('00'):
+        number = digits[2:]
+    else:
+        # Remove o zero do prefixo de tronco (ex: 011 99999-0000)
+        national = digits.lstrip('0')
+        if len(national) in (10, 11):
+            number = default_country + national
+        elif len(national) in (12, 13) and national.startswith(default_country):
+            number = national
+        else:
+            return None
+    if not 10 <= len(number) <= 15:
+        return None
+    return f'+{number}'
+
+# Início de texto que o Excel/LibreOffice interpretam como fórmula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def spreadsheet_safe(value):
+    """
+    Texto seguro para uma célula de planilha: valores que começam como uma
+    fórmula (digitados no formulário público, por exemplo) ganham um apóstrofo
+    na frente e são exibidos como texto. Outros tipos passam sem alteração.
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+def build_whatsapp_url(phone, message):
+    """
+    Monta o link wa.me com a mensagem informada. Recebe preferencialmente o
+    telefone já normalizado (colunas *_e164); texto livre é normalizado aqui.
+    """
+    if not (phone and phone.startswith('+')):
+        phone = normalize_phone(phone) or ''
+    return f"https://wa.me/{phone.lstrip('+')}?text={quote(message)}"
+
 def get_media_url(filename):
     """
     Retorna a URL correta para um arquivo de mídia baseado no ambiente
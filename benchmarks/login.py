@@ -0,0 +1,108 @@
+# benchmarks/login.py
+"""
+Benchmark do login sob ataque (app/login_throttle.py).
+
+Cria um SQLite temporário com alguns usuários e simula duas rajadas de
+senhas erradas pelo cliente WSGI, com o limite de tentativas ligado e
+desligado:
+
+- conta: a mesma conta atacada de IPs diferentes (cada IP tenta uma vez)
+- ip: as contas existentes, em rodízio, atacadas do mesmo IP
+
+Mede o tempo de CPU do processo (time.process_time), que é o que a rajada
+tira dos workers, a latência por tentativa e quantas chegaram a calcular o
+hash da senha (respostas que não são 429).
+
+Exemplo:
+    python -m benchmarks.login --attempts 300
+    python -m benchmarks.login --attempts 300 --hash-method pbkdf2:sha256:600000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+USERS = 20
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--attempts', type=int, default=300, help='Tentativas de cada rajada')
+    parser.add_argument('--hash-method', default=None, help='PASSWORD_HASH_METHOD (padrão: o da aplicação)')
+    parser.add_argument('--no-shared', action='store_true', help='Só a contagem em memória, sem a tabela')
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _email(number):
+    return f'usuario{number}@example.com'
+
+
+def attack(app, attempts, kind):
+    """Rajada de senhas erradas; devolve (cpu, latências, tentativas que calcularam o hash)."""
+    client = app.test_client()
+    latencies, hashed = [], 0
+    cpu_started = time.process_time()
+    for attempt in range(attempts):
+        if kind == 'conta':
+            email, ip = _email(0), f'10.{attempt // 65536 % 256}.{attempt // 256 % 256}.{attempt % 256}'
+        else:
+            email, ip = _email(attempt % USERS), '10.0.0.1'
+        started = time.perf_counter()
+        response = client.post('/auth/login', data={'email': email, 'password': 'errada'},
+                               environ_base={'REMOTE_ADDR': ip})
+        latencies.append(time.perf_counter() - started)
+        hashed += response.status_code != 429
+    return time.process_time() - cpu_started, sorted(latencies), hashed
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fd, path = tempfile.mkstemp(suffix='.db', prefix='planeta_login_')
+    os.close(fd)
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    sys.path.insert(0, BASE_DIR)
+    from app import create_app
+    from app.extensions import db
+    from app.login_throttle import login_throttle
+    from app.models import User, LoginAttemptWindow
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['LOGIN_THROTTLE_SHARED'] = not args.no_shared
+    if args.hash_method:
+        app.config['PASSWORD_HASH_METHOD'] = args.hash_method
+
+    try:
+        with app.app_context():
+            db.create_all()
+            for number in range(USERS):
+                user = User(username=f'usuario{number}', email=_email(number), role='admin', is_approved=True)
+                user.set_password('correta')
+                db.session.add(user)
+            db.session.commit()
+            print(f'🧪 {args.attempts} tentativas por rajada · hash {user.password_hash.split("$")[0]}')
+
+            print(f"{'rajada':<8}{'limite':>9}{'CPU (s)':>10}{'hashes':>9}{'p50 (ms)':>11}{'p95 (ms)':>11}")
+            for kind in ('conta', 'ip'):
+                for enabled in (False, True):
+                    app.config['LOGIN_THROTTLE_ENABLED'] = enabled
+                    login_throttle.clear()
+                    LoginAttemptWindow.query.delete()
+                    db.session.commit()
+                    cpu, latencies, hashed = attack(app, args.attempts, kind)
+                    print(f"{kind:<8}{'ligado' if enabled else 'desligado':>9}{cpu:>10.2f}{hashed:>9}"
+                          f"{percentile(latencies, 0.5) * 1000:>11.2f}{percentile(latencies, 0.95) * 1000:>11.2f}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/matching.py
+"""
+Benchmark do índice de clientes usado para identificar leads já cadastrados
+(app/matching.py).
+
+Monta o índice com clientes sintéticos em memória (padrão: 100 mil, com os
+nomes de app/synthetic.py, que se repetem muito e são o pior caso para a
+busca por nome) e mede a montagem e a busca de páginas de 15 leads
+(telefone/e-mail de clientes, só nomes e leads sem cliente).
+
+Exemplo:
+    python -m benchmarks.matching --clients 100000 --pages 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGE_SIZE = 15
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=100_000)
+    parser.add_argument('--pages', type=int, default=200, help='Páginas de leads buscadas')
+    parser.add_argument('--random-seed', type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def _phone(rng):
+    return f'+55119{rng.randrange(10**8):08d}'
+
+
+def client_rows(rng, count, name):
+    for client_id in range(1, count + 1):
+        phone = _phone(rng)
+        yield (client_id, name(rng), name(rng), name(rng) if rng.random() < 0.3 else None,
+               f'cliente{client_id}@example.com', phone, phone, None)
+
+
+def lead_page(rng, clients, name):
+    """Uma página de leads: 1/3 com telefone ou e-mail de cliente, 1/3 só com nomes, 1/3 novos."""
+    page = []
+    for position in range(PAGE_SIZE):
+        client_id = rng.randrange(1, clients + 1)
+        kind = position % 3
+        if kind == 0:
+            page.append((_phone(rng) if position % 2 else None, f'cliente{client_id}@example.com', name(rng), None))
+        elif kind == 1:
+            page.append((None, f'lead{rng.randrange(10**9)}@example.com', name(rng), name(rng)))
+        else:
+            page.append((_phone(rng), f'lead{rng.randrange(10**9)}@example.com', name(rng), name(rng)))
+    return page
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.path.insert(0, BASE_DIR)
+    from app.matching import ClientIndex
+    from app.synthetic import FIRST_NAMES, LAST_NAMES
+
+    def name(rng):
+        return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+    rng = random.Random(args.random_seed)
+    rows = list(client_rows(rng, args.clients, name))
+    index = ClientIndex()
+    started = time.perf_counter()
+    index.rebuild(rows, version=0)
+    print(f'🧪 Índice com {len(index):,} clientes montado em {(time.perf_counter() - started) * 1000:.0f} ms')
+
+    pages = [lead_page(rng, args.clients, name) for _ in range(args.pages)]
+    timings, flagged = [], 0
+    for page in pages:
+        started = time.perf_counter()
+        for lead in page:
+            flagged += bool(index.match(*lead))
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    print(f'   {args.pages} páginas de {PAGE_SIZE} leads, {flagged} leads sinalizados')
+    print(f"   por página: p50 {percentile(timings, 0.5) * 1000:.2f} ms · "
+          f"p95 {percentile(timings, 0.95) * 1000:.2f} ms · máx {timings[-1] * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
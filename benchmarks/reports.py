@@ -0,0 +1,157 @@
+# benchmarks/reports.py
+"""
+Benchmark das agregações dos relatórios do dashboard (app/reports.py).
+
+Gera conjuntos sintéticos em memória (padrão: 1 milhão de linhas cada) e
+mede, com a melhor de N execuções, a montagem do DataFrame a partir das
+linhas que o banco devolveria e cada agregação vetorizada, comparando com o
+equivalente em Python puro (laço com Counter).
+
+Exemplos:
+    python -m benchmarks.reports
+    python -m benchmarks.reports --rows 200000 --repeat 5 --skip-python
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVICES = ['Festa de Aniversário', 'Passaporte / Hora Avulsa', 'Colônia de Férias', 'Oficina']
+STATUSES = ['Novo', 'Contactado', 'Não Atendeu', 'Reagendar', 'Descartado']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Linhas de cada conjunto (padrão: 1 milhão)')
+    parser.add_argument('--days', type=int, default=365, help='Janela dos leads, em dias')
+    parser.add_argument('--repeat', type=int, default=3, help='Execuções de cada medição (vale a melhor)')
+    parser.add_argument('--random-seed', type=int, default=42)
+    parser.add_argument('--skip-python', action='store_true', help='Não mede a versão em Python puro')
+    parser.add_argument('--json', action='store_true', help='Imprime o resultado em JSON')
+    return parser.parse_args(argv)
+
+
+# --- Dados sintéticos (as linhas como viriam do banco) ---
+
+def lead_rows(rng, rows, today, days):
+    start = np.datetime64(today - timedelta(days=days - 1))
+    seconds = rng.integers(0, days * 86400, rows)
+    created = (start + seconds.astype('timedelta64[s]')).astype(datetime)
+    return list(zip(created, rng.choice(SERVICES, rows).tolist(), rng.choice(STATUSES, rows).tolist()))
+
+
+def birthday_rows(rng, rows):
+    months = rng.integers(1, 13, rows)
+    return (months * 100 + rng.integers(1, 29, rows)).astype(np.int16)
+
+
+def service_rows(rng, rows, today):
+    dates = (np.datetime64(today) - rng.integers(0, 5 * 365, rows).astype('timedelta64[D]')).astype(date)
+    return list(zip(rng.choice(SERVICES, rows).tolist(), dates))
+
+
+def _to_frame(rows, columns, categories, dates):
+    frame = pd.DataFrame(rows, columns=columns)
+    for column in categories:
+        frame[column] = frame[column].astype('category')
+    frame[dates] = pd.to_datetime(frame[dates])
+    return frame
+
+
+# --- Equivalentes em Python puro, para comparação ---
+
+def python_lead_counts(rows, frequency):
+    counts = Counter()
+    for created_at, _, status in rows:
+        day = created_at.date()
+        if frequency == 'week':
+            day -= timedelta(days=day.weekday())
+        counts[(day, status)] += 1
+    return counts
+
+
+def python_birthday_months(values):
+    counts = Counter()
+    for value in values.tolist():
+        counts[value // 100] += 1
+    return counts
+
+
+def python_service_volume(rows):
+    return Counter(name for name, _ in rows)
+
+
+# --- Medição ---
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.path.insert(0, BASE_DIR)
+    from app.reports import lead_counts, birthday_months, service_volume, service_months, SERVICE_MONTHS
+
+    rng = np.random.default_rng(args.random_seed)
+    today = date.today()
+    start = today - timedelta(days=args.days - 1)
+    months_start = (pd.Timestamp(today).to_period('M') - (SERVICE_MONTHS - 1)).to_timestamp().date()
+
+    print(f'🧪 Gerando {args.rows:,} linhas por conjunto...')
+    leads = lead_rows(rng, args.rows, today, args.days)
+    birthdays = birthday_rows(rng, args.rows)
+    services = service_rows(rng, args.rows, today)
+
+    leads_frame = _to_frame(leads, ['created_at', 'service_of_interest', 'status'],
+                            ('service_of_interest', 'status'), 'created_at')
+    services_frame = _to_frame(services, ['service_name', 'service_date'], ('service_name',), 'service_date')
+
+    cases = [
+        ('leads_frame', lambda: _to_frame(leads, ['created_at', 'service_of_interest', 'status'],
+                                          ('service_of_interest', 'status'), 'created_at'), None),
+        ('leads_by_day_status', lambda: lead_counts(leads_frame, 'day', 'status', start, today),
+         lambda: python_lead_counts(leads, 'day')),
+        ('leads_by_week_status', lambda: lead_counts(leads_frame, 'week', 'status', start, today),
+         lambda: python_lead_counts(leads, 'week')),
+        ('leads_by_day_service', lambda: lead_counts(leads_frame, 'day', 'service_of_interest', start, today), None),
+        ('birthday_months', lambda: birthday_months(birthdays), lambda: python_birthday_months(birthdays)),
+        ('services_frame', lambda: _to_frame(services, ['service_name', 'service_date'], ('service_name',),
+                                             'service_date'), None),
+        ('service_volume', lambda: service_volume(services_frame), lambda: python_service_volume(services)),
+        ('service_months', lambda: service_months(services_frame, months_start), None),
+    ]
+
+    results = []
+    for name, vectorized, python in cases:
+        result = {'case': name, 'rows': args.rows, 'pandas_ms': round(best_of(args.repeat, vectorized) * 1000, 2)}
+        if python and not args.skip_python:
+            result['python_ms'] = round(best_of(args.repeat, python) * 1000, 2)
+            result['speedup'] = round(result['python_ms'] / result['pandas_ms'], 1) if result['pandas_ms'] else None
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'caso':<24}{'pandas (ms)':>14}{'python (ms)':>14}{'ganho':>9}")
+    for result in results:
+        python_ms = result.get('python_ms')
+        speedup = f"{result['speedup']}x" if result.get('speedup') else ''
+        print(f"{result['case']:<24}{result['pandas_ms']:>14}{python_ms if python_ms is not None else '':>14}"
+              f"{speedup:>9}")
+
+
+if __name__ == '__main__':
+    main()
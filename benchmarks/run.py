@@ -0,0 +1,348 @@
+# benchmarks/run.py
+"""
+Benchmark dos endpoints públicos e do dashboard.
+
+Exemplos:
+    # Semeia um SQLite com o volume padrão e mede pelo cliente WSGI
+    python -m benchmarks.run --database-url sqlite:////tmp/bench.db --seed
+
+    # Escala menor, cliente WSGI e gunicorn, gravando a linha de base
+    python -m benchmarks.run --database-url sqlite:////tmp/bench.db --seed \\
+        --scale clients=10000 --scale leads=5000 --mode both --save-baseline
+
+    # Compara com a linha de base gravada (sai com código 1 se houver regressão)
+    python -m benchmarks.run --database-url postgresql://.../bench --mode gunicorn
+
+As consultas por requisição vêm do cabeçalho Server-Timing emitido pela
+instrumentação da aplicação (app/instrumentation.py), ligado aqui com
+INSTRUMENTATION_SERVER_TIMING.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+_QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+_CSRF_RE = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+
+# --- Estatísticas ---
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(name, latencies, queries, elapsed, errors):
+    latencies = sorted(latencies)
+    return {
+        'scenario': name,
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def _is_error(scenario, status_code):
+    # Num GET, um redirecionamento indica sessão inválida (volta para o login)
+    return status_code >= 400 or (scenario.method == 'GET' and status_code >= 300)
+
+
+def _queries_from_header(value):
+    match = _QUERIES_RE.search(value or '')
+    return int(match.group(1)) if match else None
+
+
+# --- Cliente WSGI (em processo) ---
+
+def run_wsgi(app, scenarios, requests, user_id):
+    """Executa os cenários sequencialmente pelo cliente de testes do Flask."""
+    results = []
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    for scenario in scenarios:
+        total = max(3, int(requests * scenario.weight))
+        latencies, queries, errors = [], [], 0
+        started = time.perf_counter()
+        for index in range(total):
+            path = scenario.next_path()
+            data = scenario.data(index) if scenario.data else None
+            request_start = time.perf_counter()
+            response = client.open(path, method=scenario.method, data=data)
+            latencies.append(time.perf_counter() - request_start)
+            if _is_error(scenario, response.status_code):
+                errors += 1
+            count = _queries_from_header(response.headers.get('Server-Timing'))
+            if count is not None:
+                queries.append(count)
+            response.close()
+        results.append(summarize(scenario.name, latencies, queries, time.perf_counter() - started, errors))
+    return results
+
+
+# --- gunicorn (processo real, via HTTP) ---
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """Sessão HTTP com cookies, usada por uma thread do benchmark."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(request, timeout=120) as response:
+                response.read()
+                return response.status, response.headers
+        except urllib.error.HTTPError as error:
+            error.read()
+            return error.code, error.headers
+
+    def csrf_token(self, path):
+        with self.opener.open(self.base_url + path, timeout=30) as response:
+            match = _CSRF_RE.search(response.read().decode('utf-8', 'replace'))
+        return match.group(1) if match else ''
+
+    def login(self, email, password):
+        token = self.csrf_token('/auth/login')
+        self.request('POST', '/auth/login', {'csrf_token': token, 'email': email, 'password': password})
+
+
+def _wait_for_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex((host, port)) == 0:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f'gunicorn não respondeu em {host}:{port}')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_gunicorn(database_url, scenarios, requests, concurrency, workers, credentials):
+    """Sobe um gunicorn com a aplicação e executa os cenários com várias threads."""
+    port = _free_port()
+    env = {**os.environ, 'DATABASE_URL': database_url, 'INSTRUMENTATION_SERVER_TIMING': '1'}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', '2',
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'app:create_app()'],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_port('127.0.0.1', port)
+        base_url = f'http://127.0.0.1:{port}'
+        sessions = []
+        for _ in range(concurrency):
+            session = HttpSession(base_url)
+            session.login(*credentials)
+            session.contact_token = session.csrf_token('/contato')
+            sessions.append(session)
+
+        results = []
+        for scenario in scenarios:
+            total = max(concurrency, int(requests * scenario.weight))
+            jobs = []
+            for index in range(total):
+                data = None
+                if scenario.data:
+                    data = {**scenario.data(index), 'csrf_token': sessions[index % concurrency].contact_token}
+                jobs.append((sessions[index % concurrency], scenario.next_path(), data))
+
+            def timed(job):
+                session, path, data = job
+                start = time.perf_counter()
+                status, headers = session.request(scenario.method, path, data)
+                return time.perf_counter() - start, status, headers.get('Server-Timing')
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(pool.map(timed, jobs))
+            elapsed = time.perf_counter() - started
+
+            queries = [q for q in (_queries_from_header(h) for _, _, h in outcomes) if q is not None]
+            errors = sum(1 for _, status, _ in outcomes if _is_error(scenario, status))
+            results.append(summarize(scenario.name, [latency for latency, _, _ in outcomes],
+                                     queries, elapsed, errors))
+        return results
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+# --- Linha de base ---
+
+def baseline_path(label):
+    return os.path.join(BASELINE_DIR, f'{label}.json')
+
+
+def dataset_size():
+    """Volume do banco medido, gravado junto da linha de base (requer app context)."""
+    from sqlalchemy import func, select
+    from app.extensions import db
+    from app.models import Client, ClientService, Lead, Post, LandingPage
+
+    return {
+        model.__tablename__: db.session.scalar(select(func.count()).select_from(model))
+        for model in (Client, ClientService, Lead, Post, LandingPage)
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Retorna as regressões de p95 e de consultas por requisição."""
+    previous = {row['scenario']: row for row in baseline.get('results', [])}
+    regressions = []
+    for row in results:
+        before = previous.get(row['scenario'])
+        if not before:
+            continue
+        if before['p95_ms'] and row['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{row['scenario']}: p95 {before['p95_ms']}ms -> {row['p95_ms']}ms")
+        if (before.get('queries_per_request') is not None and row['queries_per_request'] is not None
+                and row['queries_per_request'] > before['queries_per_request']):
+            regressions.append(f"{row['scenario']}: consultas/req {before['queries_per_request']} -> {row['queries_per_request']}")
+    return regressions
+
+
+def print_table(title, results):
+    print(f'\n{title}')
+    header = f"{'cenário':<22}{'req':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'SQL/req':>9}"
+    print(header)
+    print('-' * len(header))
+    for row in results:
+        queries = '-' if row['queries_per_request'] is None else row['queries_per_request']
+        print(f"{row['scenario']:<22}{row['requests']:>6}{row['errors']:>5}{row['p50_ms']:>10}"
+              f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['throughput_rps']:>10}{queries:>9}")
+
+
+# --- Linha de comando ---
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark dos endpoints da aplicação.')
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL', 'sqlite:////tmp/planeta_bench.db'))
+    parser.add_argument('--seed', action='store_true', help='Recria e popula o banco antes de medir.')
+    parser.add_argument('--scale', action='append', default=[], metavar='CHAVE=VALOR',
+                        help='Sobrescreve a escala padrão (ex: clients=100000).')
+    parser.add_argument('--random-seed', type=int, default=42)
+    parser.add_argument('--mode', choices=('wsgi', 'gunicorn', 'both'), default='wsgi')
+    parser.add_argument('--requests', type=int, default=200, help='Requisições por cenário.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Threads de cliente (gunicorn).')
+    parser.add_argument('--workers', type=int, default=4, help='Workers do gunicorn.')
+    parser.add_argument('--only', action='append', default=[], help='Executa apenas os cenários informados.')
+    parser.add_argument('--label', help='Nome da linha de base (padrão: <modo>-<banco>).')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.20, help='Folga de p95 antes de acusar regressão.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ['DATABASE_URL'] = args.database_url
+    sys.path.insert(0, BASE_DIR)
+
+    from app import create_app
+    from app.models import User
+    from benchmarks.scenarios import build_scenarios, remove_contact_leads
+    from benchmarks.seed import seed_database, BENCH_USER_EMAIL, BENCH_USER_PASSWORD
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['INSTRUMENTATION_LOG'] = False
+    app.config['INSTRUMENTATION_SERVER_TIMING'] = True
+    # Erros viram respostas 500 contadas no relatório, em vez de interromper a medição
+    app.config['PROPAGATE_EXCEPTIONS'] = False
+
+    with app.app_context():
+        if args.seed:
+            scale = dict(item.split('=', 1) for item in args.scale)
+            scale = {key: int(value) for key, value in scale.items()}
+            print('🌱 Populando o banco de benchmark...')
+            started = time.perf_counter()
+            seed_database(scale, seed=args.random_seed)
+            print(f'   concluído em {time.perf_counter() - started:.1f}s')
+
+        user = User.query.filter_by(email=BENCH_USER_EMAIL).first()
+        if user is None:
+            sys.exit('Banco sem o usuário de benchmark; execute com --seed.')
+        user_id = user.id
+        dialect = app.extensions['sqlalchemy'].engine.dialect.name
+        # Sobras de uma execução interrompida também entrariam no volume
+        remove_contact_leads()
+        dataset = dataset_size()
+
+        modes = ('wsgi', 'gunicorn') if args.mode == 'both' else (args.mode,)
+        regressions = []
+        for mode in modes:
+            scenarios = build_scenarios()
+            if args.only:
+                scenarios = [scenario for scenario in scenarios if scenario.name in args.only]
+
+            if mode == 'wsgi':
+                results = run_wsgi(app, scenarios, args.requests, user_id)
+            else:
+                results = run_gunicorn(args.database_url, scenarios, args.requests, args.concurrency,
+                                       args.workers, (BENCH_USER_EMAIL, BENCH_USER_PASSWORD))
+            remove_contact_leads()
+
+            label = args.label or f'{mode}-{dialect}'
+            print_table(f'📊 {label}', results)
+
+            path = baseline_path(label)
+            if args.save_baseline:
+                os.makedirs(BASELINE_DIR, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as baseline_file:
+                    json.dump({'label': label, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                               'requests': args.requests, 'dataset': dataset, 'results': results},
+                              baseline_file, indent=2, ensure_ascii=False)
+                print(f'💾 Linha de base gravada em {path}')
+            elif os.path.exists(path):
+                with open(path, encoding='utf-8') as baseline_file:
+                    baseline = json.load(baseline_file)
+                if baseline.get('dataset') != dataset:
+                    print(f"⚠️  Linha de base {label} foi medida com outro volume ({baseline.get('dataset')}); comparação ignorada.")
+                else:
+                    regressions += compare(results, baseline, args.tolerance)
+
+    if regressions:
+        print('\n❌ Regressões em relação à linha de base:')
+        for line in regressions:
+            print(f'   {line}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/scenarios.py
+"""
+Cenários medidos pelo benchmark. Cada cenário monta a requisição a partir de
+um contexto com slugs e termos de busca reais do banco semeado, rodando em
+rodízio para não medir sempre a mesma linha.
+"""
+from itertools import cycle
+from urllib.parse import urlencode
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Post, LandingPage, Client, Lead
+
+# E-mails dos leads criados pelo cenário contact_post (removidos após a medição)
+CONTACT_EMAIL_PATTERN = 'bench%@example.com'
+
+
+class Scenario:
+    def __init__(self, name, method, paths, data=None, auth=False, weight=1.0):
+        self.name = name
+        self.method = method
+        self._paths = cycle(paths)
+        self.data = data
+        self.auth = auth
+        # Fração do número de requisições padrão (cenários pesados rodam menos)
+        self.weight = weight
+
+    def next_path(self):
+        return next(self._paths)
+
+
+def contact_form_data(index):
+    return {
+        'parent_name': f'Benchmark {index}',
+        'email': CONTACT_EMAIL_PATTERN.replace('%', str(index)),
+        'whatsapp': '11999990000',
+        'child_name': 'Criança',
+        'child_age': '5',
+        'service_of_interest': 'Festa de Aniversário',
+        'message': 'Mensagem gerada pelo benchmark.',
+    }
+
+
+def remove_contact_leads(batch_size=500):
+    """
+    Apaga os leads criados pelo cenário contact_post, para que o volume do
+    banco (comparado com o da linha de base) não cresça a cada execução. A
+    exclusão passa pelo ORM para manter os contadores (app/stats.py).
+    """
+    removed = 0
+    while True:
+        leads = Lead.query.filter(Lead.email.like(CONTACT_EMAIL_PATTERN), Lead.parent_name.like('Benchmark %'))\
+            .limit(batch_size).all()
+        if not leads:
+            return removed
+        for lead in leads:
+            db.session.delete(lead)
+        db.session.commit()
+        removed += len(leads)
+
+
+def build_scenarios(sample_size=50):
+    """Monta os cenários com amostras do banco atual (requer app context)."""
+    post_slugs = db.session.scalars(
+        select(Post.slug).where(Post.is_published.is_(True)).order_by(Post.id).limit(sample_size)
+    ).all() or ['inexistente']
+    landing_slugs = db.session.scalars(
+        select(LandingPage.slug).where(LandingPage.is_published.is_(True)).order_by(LandingPage.id).limit(sample_size)
+    ).all() or ['inexistente']
+    client_names = db.session.scalars(
+        select(Client.child_name).order_by(Client.id).limit(sample_size)
+    ).all() or ['Ana']
+    client_phones = db.session.scalars(
+        select(Client.contact_phone).order_by(Client.id).limit(sample_size)
+    ).all()
+
+    blog_pages = [f'/blog?page={page}' for page in range(1, 6)]
+    search_terms = [name.split()[0] for name in client_names] + client_phones
+    client_searches = [f"/dashboard/clients?{urlencode({'search': term})}" for term in search_terms]
+
+    return [
+        Scenario('index', 'GET', ['/']),
+        Scenario('blog_archive', 'GET', blog_pages),
+        Scenario('post_detail', 'GET', [f'/post/{slug}' for slug in post_slugs]),
+        Scenario('view_landing_page', 'GET', [f'/lp/{slug}' for slug in landing_slugs]),
+        Scenario('api_posts', 'GET', ['/api/v1/posts', '/api/v1/posts?limit=50']),
+        Scenario('api_post', 'GET', [f'/api/v1/posts/{slug}' for slug in post_slugs]),
+        Scenario('api_site', 'GET', ['/api/v1/settings', '/api/v1/popup', '/api/v1/landing-pages']),
+        Scenario('contact_post', 'POST', ['/contato'], data=contact_form_data),
+        Scenario('list_clients_search', 'GET', client_searches, auth=True),
+        Scenario('leads', 'GET', ['/dashboard/leads', '/dashboard/leads?status=Novo',
+                                  '/dashboard/leads?page=3'], auth=True),
+        Scenario('reports', 'GET', ['/dashboard/reports',
+                                    '/dashboard/reports?frequency=week&by=service_of_interest&days=365'], auth=True),
+        # A exportação em si roda no 'flask worker'; aqui, a central e a consulta de progresso
+        Scenario('exports', 'GET', ['/dashboard/exports', '/dashboard/exports/progress?ids=1,2,3'], auth=True),
+    ]
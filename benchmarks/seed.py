@@ -0,0 +1,35 @@
+# benchmarks/seed.py
+"""
+Recria o banco de benchmark (SQLite ou Postgres) e o popula com o gerador de
+dados sintéticos da aplicação (app/synthetic.py), com semente fixa.
+"""
+from app.extensions import db
+from app.models import User, Settings, HomePageContent
+from app.homepage import apply_form_data, get_section
+from app.synthetic import DEFAULT_SCALE, generate
+
+BENCH_USER_EMAIL = 'bench@example.com'
+BENCH_USER_PASSWORD = 'bench-password'
+
+
+def seed_database(scale=None, seed=42, batch_size=5000, echo=print):
+    """
+    Recria as tabelas e popula o banco da aplicação atual (requer app context).
+    Retorna o dicionário de escala efetivamente usado.
+    """
+    scale = {**DEFAULT_SCALE, **(scale or {})}
+
+    db.drop_all()
+    db.create_all()
+
+    user = User(username='bench', email=BENCH_USER_EMAIL, role='admin', is_approved=True)
+    user.set_password(BENCH_USER_PASSWORD)
+    db.session.add(user)
+    db.session.add(Settings())
+    db.session.add(HomePageContent())
+    db.session.commit()
+    apply_form_data(get_section('location'), {'location_address_text': 'Jundiaí Shopping'})
+    db.session.commit()
+
+    generate(scale, seed=seed, batch_size=batch_size, echo=echo)
+    return scale
@@ -50,6 +50,73 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     UPLOAD_FOLDER = '/app/media'
 
+    # Cache-Control das páginas públicas com GET condicional (app/http_cache.py).
+    # O navegador/proxy usa a cópia por max-age e, até stale-while-revalidate,
+    # serve a cópia antiga enquanto revalida com ETag/If-Modified-Since.
+    CACHE_CONTROL = {
+        'main.index': 'public, max-age=60, stale-while-revalidate=300',
+        'main.blog_archive': 'public, max-age=60, stale-while-revalidate=300',
+        'main.post_detail': 'public, max-age=300, stale-while-revalidate=3600',
+        'main.view_landing_page': 'public, max-age=300, stale-while-revalidate=3600',
+        'main.sitemap': 'public, max-age=3600',
+        'main.sitemap_part': 'public, max-age=3600',
+        'main.feed': 'public, max-age=900',
+        'api.list_posts': 'public, max-age=60, stale-while-revalidate=300',
+        'api.get_post': 'public, max-age=300, stale-while-revalidate=3600',
+        'api.list_landing_pages': 'public, max-age=300, stale-while-revalidate=3600',
+        'api.get_landing_page': 'public, max-age=300, stale-while-revalidate=3600',
+        'api.get_settings': 'public, max-age=300, stale-while-revalidate=3600',
+        'api.get_popup': 'public, max-age=60, stale-while-revalidate=300',
+    }
+
+    # API pública (/api/v1, app/api): segundos que uma resposta fica no cache
+    # do processo e origem liberada para chamadas de outros sites (CORS)
+    API_CACHE_SECONDS = int(os.environ.get('API_CACHE_SECONDS', 300))
+    API_CORS_ORIGIN = os.environ.get('API_CORS_ORIGIN', '*')
+
+    # Pasta dos arquivos gerados por app/feeds.py (padrão: instance/feeds) e
+    # endereço público usado nos links absolutos do sitemap/feed, da API
+    # pública e por 'flask feeds build'. Sem SITE_URL, o sitemap/feed só são
+    # gerados se TRUSTED_HOSTS (hosts aceitos, separados por vírgula) estiver
+    # definido.
+    FEEDS_FOLDER = os.environ.get('FEEDS_FOLDER')
+    SITE_URL = os.environ.get('SITE_URL')
+    TRUSTED_HOSTS = [host.strip() for host in os.environ.get('TRUSTED_HOSTS', '').split(',') if host.strip()] or None
+
+    # Páginas públicas congeladas por 'flask freeze' (app/freeze.py; padrão:
+    # instance/static_site). Com FREEZE_SERVE a própria aplicação serve os
+    # arquivos aos visitantes anônimos; sem ele, fica a cargo do proxy.
+    FREEZE_FOLDER = os.environ.get('FREEZE_FOLDER')
+    FREEZE_SERVE = os.environ.get('FREEZE_SERVE', '').lower() in ('1', 'true', 'yes')
+
+    # Arquivos da central de exportações (app/exports.py; padrão: instance/exports)
+    # e por quantas horas ficam disponíveis para download
+    EXPORT_FOLDER = os.environ.get('EXPORT_FOLDER')
+    EXPORT_RETENTION_HOURS = int(os.environ.get('EXPORT_RETENTION_HOURS', 72))
+
+    # Idade máxima (segundos) dos relatórios em cache (app/reports.py); antes
+    # disso, só são recalculados quando leads, clientes ou serviços mudam
+    REPORTS_CACHE_SECONDS = int(os.environ.get('REPORTS_CACHE_SECONDS', 300))
+
+    # Método do hash de senhas do werkzeug (ex: 'scrypt', 'scrypt:65536:8:1',
+    # 'pbkdf2:sha256:1000000'). Hashes antigos são refeitos no próximo login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+
+    # Limite de tentativas de login (app/login_throttle.py): falhas por conta e
+    # por IP dentro de LOGIN_WINDOW_SECONDS
+    LOGIN_MAX_ATTEMPTS_ACCOUNT = int(os.environ.get('LOGIN_MAX_ATTEMPTS_ACCOUNT', 5))
+    LOGIN_MAX_ATTEMPTS_IP = int(os.environ.get('LOGIN_MAX_ATTEMPTS_IP', 20))
+    LOGIN_WINDOW_SECONDS = int(os.environ.get('LOGIN_WINDOW_SECONDS', 900))
+
+    # Cabeçalho Server-Timing com tempos e número de consultas SQL de cada
+    # resposta (app/instrumentation.py). Desligado por padrão: as respostas
+    # públicas ficam em cache nos CDNs; em debug o cabeçalho sai sempre.
+    INSTRUMENTATION_SERVER_TIMING = os.environ.get('INSTRUMENTATION_SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
+
+    # Quantidade de proxies reversos à frente da aplicação; com 1 ou mais, o
+    # IP do visitante vem do X-Forwarded-For (ProxyFix)
+    PROXY_COUNT = int(os.environ.get('PROXY_COUNT', 0))
+
 # --- CONFIGURAÇÃO DE DESENVOLVIMENTO ---
 class DevelopmentConfig(Config):
     DEBUG = True
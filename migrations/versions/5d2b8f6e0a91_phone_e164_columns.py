@@ -0,0 +1,118 @@
+"""Phone E.164 columns for client and lead
+
+Revision ID: 5d2b8f6e0a91
+Revises: a4c9e1f3b2d7
+Create Date: 2026-10-19 12:48:13.204517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2b8f6e0a91'
+down_revision = 'a4c9e1f3b2d7'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+client = sa.table('client',
+    sa.column('id', sa.Integer),
+    sa.column('contact_phone', sa.String), sa.column('contact_phone_e164', sa.String),
+    sa.column('parent1_phone', sa.String), sa.column('parent1_phone_e164', sa.String),
+    sa.column('parent2_phone', sa.String), sa.column('parent2_phone_e164', sa.String),
+)
+lead = sa.table('lead',
+    sa.column('id', sa.Integer),
+    sa.column('whatsapp', sa.String), sa.column('whatsapp_e164', sa.String),
+)
+
+
+def _normalize_phone(phone, default_country='55'):
+    # Cópia de app.utils.normalize_phone na data desta migração, para que ela
+    # não mude de comportamento se a função da aplicação mudar depois
+    if not phone:
+        return None
+    digits = ''.join(filter(str.isdigit, phone))
+    stripped = phone.strip()
+    if stripped.startswith('+'):
+        number = digits
+    elif stripped.startswith('00'):
+        number = digits[2:]
+    else:
+        national = digits.lstrip('0')
+        if len(national) in (10, 11):
+            number = default_country + national
+        elif len(national) in (12, 13) and national.startswith(default_country):
+            number = national
+        else:
+            return None
+    if not 10 <= len(number) <= 15:
+        return None
+    return f'+{number}'
+
+
+def _backfill(bind, table, columns):
+    """Preenche as colunas E.164 a partir do texto livre, em lotes por id."""
+    stmt = table.update().where(table.c.id == sa.bindparam('row_id')).values(
+        {e164: sa.bindparam(e164) for _, e164 in columns}
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, *[table.c[raw] for raw, _ in columns])
+            .where(table.c.id > last_id).order_by(table.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        changes = []
+        for row in rows:
+            values = {e164: _normalize_phone(getattr(row, raw)) for raw, e164 in columns}
+            if any(values.values()):
+                changes.append({'row_id': row.id, **values})
+        if changes:
+            bind.execute(stmt, changes)
+        last_id = rows[-1].id
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('client', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('contact_phone_e164', sa.String(length=16), nullable=True))
+        batch_op.add_column(sa.Column('parent1_phone_e164', sa.String(length=16), nullable=True))
+        batch_op.add_column(sa.Column('parent2_phone_e164', sa.String(length=16), nullable=True))
+        batch_op.create_index(batch_op.f('ix_client_contact_phone_e164'), ['contact_phone_e164'], unique=False)
+        batch_op.create_index(batch_op.f('ix_client_parent1_phone_e164'), ['parent1_phone_e164'], unique=False)
+        batch_op.create_index(batch_op.f('ix_client_parent2_phone_e164'), ['parent2_phone_e164'], unique=False)
+
+    with op.batch_alter_table('lead', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('whatsapp_e164', sa.String(length=16), nullable=True))
+        batch_op.create_index(batch_op.f('ix_lead_whatsapp_e164'), ['whatsapp_e164'], unique=False)
+
+    # ### end Alembic commands ###
+
+    # Preenche as linhas existentes ('flask phones backfill' faz o mesmo e
+    # corrige divergências depois)
+    bind = op.get_bind()
+    _backfill(bind, client, (('contact_phone', 'contact_phone_e164'),
+                             ('parent1_phone', 'parent1_phone_e164'),
+                             ('parent2_phone', 'parent2_phone_e164')))
+    _backfill(bind, lead, (('whatsapp', 'whatsapp_e164'),))
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('lead', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_lead_whatsapp_e164'))
+        batch_op.drop_column('whatsapp_e164')
+
+    with op.batch_alter_table('client', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_client_parent2_phone_e164'))
+        batch_op.drop_index(batch_op.f('ix_client_parent1_phone_e164'))
+        batch_op.drop_index(batch_op.f('ix_client_contact_phone_e164'))
+        batch_op.drop_column('parent2_phone_e164')
+        batch_op.drop_column('parent1_phone_e164')
+        batch_op.drop_column('contact_phone_e164')
+
+    # ### end Alembic commands ###
@@ -0,0 +1,56 @@
+"""Seed content and client counters
+
+Revision ID: c52e8b0d7a13
+Revises: 3f1a9c7d2b64
+Create Date: 2026-10-19 10:03:17.552908
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52e8b0d7a13'
+down_revision = '3f1a9c7d2b64'
+branch_labels = None
+depends_on = None
+
+
+stat_counter = sa.table('stat_counter',
+    sa.column('key', sa.String),
+    sa.column('value', sa.Integer)
+)
+client = sa.table('client', sa.column('id', sa.Integer), sa.column('child_date_of_birth', sa.Date))
+post = sa.table('post', sa.column('id', sa.Integer), sa.column('is_published', sa.Boolean))
+landing_page = sa.table('landing_page', sa.column('id', sa.Integer), sa.column('is_published', sa.Boolean))
+
+
+def upgrade():
+    # Migração apenas de dados: popula os contadores mantidos pelos eventos
+    # da sessão (app/stats.py). Equivale a rodar 'flask stats rebuild'.
+    bind = op.get_bind()
+    counters = {}
+
+    counters['client:total'] = bind.execute(sa.select(sa.func.count(client.c.id))).scalar()
+    month = sa.extract('month', client.c.child_date_of_birth)
+    day = sa.extract('day', client.c.child_date_of_birth)
+    for m, d, count in bind.execute(
+        sa.select(month, day, sa.func.count(client.c.id)).group_by(month, day)
+    ):
+        counters[f'client_birthday:{int(m):02d}-{int(d):02d}'] = count
+
+    for name, table in (('post', post), ('landing_page', landing_page)):
+        counters[f'{name}:total'] = bind.execute(sa.select(sa.func.count(table.c.id))).scalar()
+        counters[f'{name}:published'] = bind.execute(
+            sa.select(sa.func.count(table.c.id)).where(table.c.is_published == sa.true())
+        ).scalar()
+
+    rows = [{'key': key, 'value': value} for key, value in counters.items() if value]
+    if rows:
+        op.bulk_insert(stat_counter, rows)
+
+
+def downgrade():
+    op.execute(
+        stat_counter.delete().where(sa.not_(stat_counter.c.key.startswith('lead_status:')))
+    )
@@ -0,0 +1,321 @@
+"""Homepage sections as JSON documents
+
+Revision ID: d6a3f08c41b7
+Revises: b81f3d5c9e24
+Create Date: 2026-10-19 16:42:18.204519
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6a3f08c41b7'
+down_revision = 'b81f3d5c9e24'
+branch_labels = None
+depends_on = None
+
+
+# Cópia congelada do formato v1 dos documentos (app/homepage.py), para que a
+# migração não dependa do código da aplicação. Listas: (padrão, quantidade, item).
+_HEADER = {'tagline': 'section_tagline', 'title': 'section_title', 'subtitle': 'section_subtitle'}
+SECTIONS = {
+    'hero': ('hero_', {
+        'background_color_from': 'background_color_from', 'background_color_to': 'background_color_to',
+        'badge_text': 'badge_text', 'title': 'title', 'subtitle': 'subtitle',
+        'whatsapp_button_text': 'whatsapp_button_text', 'whatsapp_button_link': 'whatsapp_button_link',
+        'highlight_text': 'highlight_text',
+    }),
+    'services': ('services_', {**_HEADER, 'cards': ('card{n}_', 3, {
+        'icon': 'icon', 'title': 'title', 'text': 'text', 'items': ('item{n}', 3, None),
+        'cta_text': 'cta_text', 'cta_link': 'cta_link',
+    })}),
+    'values': ('values_', {**_HEADER, 'cards': ('card{n}_', 3, {'icon': 'icon', 'title': 'title', 'text': 'text'})}),
+    'structure': ('structure_', {**_HEADER, 'features': ('feature{n}_', 2, {'title': 'title', 'text': 'text'})}),
+    'videos': ('videos_section_', {'title': 'title', 'videos': ('video{n}', 3, None)}),
+    'blog': ('blog_', {**_HEADER, 'cta_text': 'cta_text'}),
+    'cta': ('cta_', {
+        'title': 'title', 'subtitle': 'subtitle',
+        'whatsapp_button_text': 'whatsapp_button_text', 'form_button_text': 'form_button_text',
+    }),
+    'location': ('location_', {
+        **_HEADER, 'card_title': 'card_title', 'address_title': 'address_title', 'address_text': 'address_text',
+        'phone_title': 'phone_title', 'phone_text': 'phone_text', 'hours_title': 'hours_title',
+        'hours_text': 'hours_text', 'gmaps_button_text': 'gmaps_button_text', 'gmaps_link': 'gmaps_link',
+        'image_alt': 'image_alt',
+    }),
+}
+
+
+def _to_document(fields, row, prefix):
+    document = {}
+    for key, node in fields.items():
+        if isinstance(node, tuple):
+            pattern, count, item = node
+            names = [prefix + pattern.format(n=n) for n in range(1, count + 1)]
+            document[key] = [row.get(name) if item is None else _to_document(item, row, name) for name in names]
+        else:
+            document[key] = row.get(prefix + node)
+    return document
+
+
+def _to_columns(fields, document, prefix, row):
+    document = document or {}
+    for key, node in fields.items():
+        if isinstance(node, tuple):
+            pattern, count, item = node
+            values = document.get(key) or []
+            for n in range(1, count + 1):
+                value = values[n - 1] if n <= len(values) else None
+                name = prefix + pattern.format(n=n)
+                if item is None:
+                    row[name] = value
+                else:
+                    _to_columns(item, value, name, row)
+        else:
+            row[prefix + node] = document.get(key)
+    return row
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    home_page_section = op.create_table('home_page_section',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=30), nullable=False),
+    sa.Column('is_visible', sa.Boolean(), server_default=sa.true(), nullable=False),
+    sa.Column('schema_version', sa.Integer(), server_default='1', nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    # ### end Alembic commands ###
+
+    # Converte as colunas da (única) linha de home_page_content em documentos
+    connection = op.get_bind()
+    content = connection.execute(sa.text('SELECT * FROM home_page_content ORDER BY id LIMIT 1')).mappings().first()
+    if content is not None:
+        now = datetime.utcnow()
+        op.bulk_insert(home_page_section, [
+            {
+                'name': name,
+                'is_visible': content[f'show_{name}_section'] is not False,
+                'schema_version': 1,
+                'data': _to_document(fields, content, prefix),
+                'version': 1,
+                'updated_at': now,
+            }
+            for name, (prefix, fields) in SECTIONS.items()
+        ])
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('home_page_content', schema=None) as batch_op:
+        batch_op.drop_column('show_hero_section')
+        batch_op.drop_column('hero_background_color_from')
+        batch_op.drop_column('hero_background_color_to')
+        batch_op.drop_column('hero_badge_text')
+        batch_op.drop_column('hero_title')
+        batch_op.drop_column('hero_subtitle')
+        batch_op.drop_column('hero_whatsapp_button_text')
+        batch_op.drop_column('hero_whatsapp_button_link')
+        batch_op.drop_column('hero_highlight_text')
+        batch_op.drop_column('show_services_section')
+        batch_op.drop_column('services_section_tagline')
+        batch_op.drop_column('services_section_title')
+        batch_op.drop_column('services_section_subtitle')
+        batch_op.drop_column('services_card1_icon')
+        batch_op.drop_column('services_card1_title')
+        batch_op.drop_column('services_card1_text')
+        batch_op.drop_column('services_card1_item1')
+        batch_op.drop_column('services_card1_item2')
+        batch_op.drop_column('services_card1_item3')
+        batch_op.drop_column('services_card1_cta_text')
+        batch_op.drop_column('services_card1_cta_link')
+        batch_op.drop_column('services_card2_icon')
+        batch_op.drop_column('services_card2_title')
+        batch_op.drop_column('services_card2_text')
+        batch_op.drop_column('services_card2_item1')
+        batch_op.drop_column('services_card2_item2')
+        batch_op.drop_column('services_card2_item3')
+        batch_op.drop_column('services_card2_cta_text')
+        batch_op.drop_column('services_card2_cta_link')
+        batch_op.drop_column('services_card3_icon')
+        batch_op.drop_column('services_card3_title')
+        batch_op.drop_column('services_card3_text')
+        batch_op.drop_column('services_card3_item1')
+        batch_op.drop_column('services_card3_item2')
+        batch_op.drop_column('services_card3_item3')
+        batch_op.drop_column('services_card3_cta_text')
+        batch_op.drop_column('services_card3_cta_link')
+        batch_op.drop_column('show_values_section')
+        batch_op.drop_column('values_section_tagline')
+        batch_op.drop_column('values_section_title')
+        batch_op.drop_column('values_section_subtitle')
+        batch_op.drop_column('values_card1_icon')
+        batch_op.drop_column('values_card1_title')
+        batch_op.drop_column('values_card1_text')
+        batch_op.drop_column('values_card2_icon')
+        batch_op.drop_column('values_card2_title')
+        batch_op.drop_column('values_card2_text')
+        batch_op.drop_column('values_card3_icon')
+        batch_op.drop_column('values_card3_title')
+        batch_op.drop_column('values_card3_text')
+        batch_op.drop_column('show_structure_section')
+        batch_op.drop_column('structure_section_tagline')
+        batch_op.drop_column('structure_section_title')
+        batch_op.drop_column('structure_section_subtitle')
+        batch_op.drop_column('structure_feature1_title')
+        batch_op.drop_column('structure_feature1_text')
+        batch_op.drop_column('structure_feature2_title')
+        batch_op.drop_column('structure_feature2_text')
+        batch_op.drop_column('show_blog_section')
+        batch_op.drop_column('blog_section_tagline')
+        batch_op.drop_column('blog_section_title')
+        batch_op.drop_column('blog_section_subtitle')
+        batch_op.drop_column('blog_cta_text')
+        batch_op.drop_column('show_cta_section')
+        batch_op.drop_column('cta_title')
+        batch_op.drop_column('cta_subtitle')
+        batch_op.drop_column('cta_whatsapp_button_text')
+        batch_op.drop_column('cta_form_button_text')
+        batch_op.drop_column('show_location_section')
+        batch_op.drop_column('location_section_tagline')
+        batch_op.drop_column('location_section_title')
+        batch_op.drop_column('location_section_subtitle')
+        batch_op.drop_column('location_card_title')
+        batch_op.drop_column('location_address_title')
+        batch_op.drop_column('location_address_text')
+        batch_op.drop_column('location_phone_title')
+        batch_op.drop_column('location_phone_text')
+        batch_op.drop_column('location_hours_title')
+        batch_op.drop_column('location_hours_text')
+        batch_op.drop_column('location_gmaps_button_text')
+        batch_op.drop_column('location_gmaps_link')
+        batch_op.drop_column('location_image_alt')
+        batch_op.drop_column('show_videos_section')
+        batch_op.drop_column('videos_section_title')
+        batch_op.drop_column('videos_section_video1')
+        batch_op.drop_column('videos_section_video2')
+        batch_op.drop_column('videos_section_video3')
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('home_page_content', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('show_hero_section', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('hero_background_color_from', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('hero_background_color_to', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('hero_badge_text', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('hero_title', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('hero_subtitle', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('hero_whatsapp_button_text', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('hero_whatsapp_button_link', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('hero_highlight_text', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('show_services_section', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('services_section_tagline', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_section_title', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('services_section_subtitle', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('services_card1_icon', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('services_card1_title', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card1_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('services_card1_item1', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card1_item2', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card1_item3', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card1_cta_text', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('services_card1_cta_link', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('services_card2_icon', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('services_card2_title', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card2_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('services_card2_item1', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card2_item2', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card2_item3', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card2_cta_text', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('services_card2_cta_link', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('services_card3_icon', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('services_card3_title', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card3_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('services_card3_item1', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card3_item2', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card3_item3', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('services_card3_cta_text', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('services_card3_cta_link', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('show_values_section', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('values_section_tagline', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('values_section_title', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('values_section_subtitle', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('values_card1_icon', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('values_card1_title', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('values_card1_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('values_card2_icon', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('values_card2_title', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('values_card2_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('values_card3_icon', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('values_card3_title', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('values_card3_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('show_structure_section', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('structure_section_tagline', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('structure_section_title', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('structure_section_subtitle', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('structure_feature1_title', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('structure_feature1_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('structure_feature2_title', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('structure_feature2_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('show_blog_section', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('blog_section_tagline', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('blog_section_title', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('blog_section_subtitle', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('blog_cta_text', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('show_cta_section', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('cta_title', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('cta_subtitle', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('cta_whatsapp_button_text', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('cta_form_button_text', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('show_location_section', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('location_section_tagline', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('location_section_title', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('location_section_subtitle', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('location_card_title', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('location_address_title', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('location_address_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('location_phone_title', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('location_phone_text', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('location_hours_title', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('location_hours_text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('location_gmaps_button_text', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('location_gmaps_link', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('location_image_alt', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('show_videos_section', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('videos_section_title', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('videos_section_video1', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('videos_section_video2', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('videos_section_video3', sa.String(length=100), nullable=True))
+
+    # ### end Alembic commands ###
+
+    connection = op.get_bind()
+    content_id = connection.execute(sa.text('SELECT id FROM home_page_content ORDER BY id LIMIT 1')).scalar()
+    home_page_section = sa.table('home_page_section',
+        sa.column('name', sa.String), sa.column('is_visible', sa.Boolean), sa.column('data', sa.JSON))
+    if content_id is not None:
+        row = {}
+        for name, is_visible, data in connection.execute(sa.select(
+                home_page_section.c.name, home_page_section.c.is_visible, home_page_section.c.data)):
+            if name not in SECTIONS:
+                continue
+            prefix, fields = SECTIONS[name]
+            _to_columns(fields, data, prefix, row)
+            row[f'show_{name}_section'] = is_visible
+        if row:
+            home_page_content = sa.table('home_page_content', sa.column('id', sa.Integer),
+                                         *(sa.column(name) for name in row))
+            connection.execute(home_page_content.update()
+                               .where(home_page_content.c.id == content_id).values(**row))
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('home_page_section')
+    # ### end Alembic commands ###